@@ -0,0 +1,237 @@
+"""Measure the memory allocated by the socket events, against budgets.
+
+Every event is handled `number` times by a `MainNamespace` whose emitter is
+a stub, after a warm-up, while tracemalloc traces the allocations. Per call,
+`bytes` and `objects` are the memory and the gc-tracked objects still
+allocated once the calls returned, and `peak` is the median of the largest
+transient allocation of each call. A game lifecycle, login to end with every
+player disconnected, must leave nothing behind: its `retained` rooms, players
+and open rooms are counted once the games are over.
+
+`run --save` stores the results with some headroom as the budgets checked by
+`timebomb/allocations_test.py`. Figures depend on the Python version: refresh
+the budgets on the version running the tests.
+
+Usage:
+    python -m benchmarks.allocations run [--save] [--number N]
+    python -m benchmarks.allocations compare [--number N]
+
+"""
+
+import argparse
+import array
+import gc
+import json
+import os
+import statistics
+import sys
+import tracemalloc
+
+from benchmarks.suite import make_namespace
+from timebomb.player.service import PLAYERS
+from timebomb.room.service import OPEN_ROOMS, ROOMS
+
+BUDGETS = os.path.join(os.path.dirname(__file__), "allocations.json")
+EVENTS = ("login", "start", "cut", "chat", "disconnect", "lifecycle")
+FIGURES = ("bytes", "objects", "peak")
+
+
+def clear():
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+
+
+def login_room(namespace, name: str, nb_players: int = 4) -> list:
+    sids = [f"{name}-{i}" for i in range(nb_players)]
+    for sid in sids:
+        namespace.trigger_event("login", sid, {"username": "p", "roomname": name})
+    return sids
+
+
+def play(namespace, name: str) -> list:
+    """Play a game of 4 players until it ends, and return their sids."""
+    sids = login_room(namespace, name)
+    namespace.trigger_event("start", sids[0])
+    cutter = 0
+    while ROOMS.get(PLAYERS.get(sids[0]).room_id).status == "PLAYING":
+        target = (cutter + 1) % len(sids)
+        namespace.trigger_event("cut", sids[cutter], {"target": sids[target]})
+        cutter = target
+    return sids
+
+
+def setup_login(namespace, number: int) -> list:
+    return [("login", f"sid-{i}", {"username": "p"}) for i in range(number)]
+
+
+def setup_start(namespace, number: int) -> list:
+    return [("start", login_room(namespace, f"s{i}")[0]) for i in range(number)]
+
+
+def setup_cut(namespace, number: int) -> list:
+    calls = []
+    for i in range(number):
+        sids = login_room(namespace, f"c{i}")
+        namespace.trigger_event("start", sids[0])
+        calls.append(("cut", sids[0], {"target": sids[1]}))
+    return calls
+
+
+def setup_chat(namespace, number: int) -> list:
+    sid = login_room(namespace, "chat", 1)[0]
+    return [("chat", sid, {"message": "hello"})] * number
+
+
+def setup_disconnect(namespace, number: int) -> list:
+    calls = []
+    for i in range(number):
+        sids = login_room(namespace, f"d{i}")
+        namespace.trigger_event("start", sids[0])
+        calls.extend(("disconnect", sid) for sid in sids)
+    return calls[:number]
+
+
+SETUPS = {
+    "login": setup_login,
+    "start": setup_start,
+    "cut": setup_cut,
+    "chat": setup_chat,
+    "disconnect": setup_disconnect,
+}
+
+
+def settle():
+    """Free the garbage, and the names held by the attribute cache of types.
+
+    Handlers are looked up by names built per event, which the cache keeps
+    until other lookups evict them: they are not retained by the server.
+
+    """
+    gc.collect()
+    sys._clear_type_cache()
+
+
+def trace(calls) -> dict:
+    """Return the figures per call of `calls`, callables run while traced."""
+    settle()
+    objects = len(gc.get_objects())
+    tracemalloc.start()
+    # Preallocated, so that the peaks are not traced themselves.
+    peaks = array.array("q", bytes(8 * len(calls)))
+    before = tracemalloc.get_traced_memory()[0]
+    for i, call in enumerate(calls):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        call()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - start
+
+    settle()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "bytes": (after - before) / len(calls),
+        "objects": (len(gc.get_objects()) - objects) / len(calls),
+        "peak": statistics.median(peaks),
+    }
+
+
+def measure(event: str, number: int = 50) -> dict:
+    """Return the figures per call of an event, or per game of `lifecycle`.
+
+    The figures of `lifecycle` also hold the models it `retained`.
+
+    """
+    clear()
+    namespace = make_namespace()
+
+    if event == "lifecycle":
+        for name in ("warm-a", "warm-b"):
+            for sid in play(namespace, name):
+                namespace.trigger_event("disconnect", sid)
+
+        def lifecycle(name):
+            for sid in play(namespace, name):
+                namespace.trigger_event("disconnect", sid)
+
+        calls = [lambda i=i: lifecycle(f"game-{i}") for i in range(number)]
+        results = trace(calls)
+        results["retained"] = {
+            "rooms": len(ROOMS),
+            "players": len(PLAYERS),
+            "open_rooms": len(OPEN_ROOMS),
+        }
+    else:
+        warm_up = SETUPS[event](namespace, 2)
+        for args in warm_up:
+            namespace.trigger_event(*args)
+        args = SETUPS[event](namespace, number)
+        results = trace([lambda a=a: namespace.trigger_event(*a) for a in args])
+
+    clear()
+    return results
+
+
+def run(number: int = 50) -> dict:
+    results = {}
+    for event in EVENTS:
+        results[event] = measure(event, number)
+        figures = "".join(f" {results[event][f]:>10.1f}" for f in FIGURES)
+        print(f"{event:<12}{figures}", file=sys.stderr)
+    return results
+
+
+def with_headroom(figure: str, value: float) -> int:
+    """Return the budget of a measure: 10% more, and 1 object or 64 bytes."""
+    return round(value + abs(value) * 0.1 + (1 if figure == "objects" else 64))
+
+
+def over_budget(results: dict, budgets: dict) -> list:
+    """Return the (event, figure, budget, measured) over their budget."""
+    return [
+        (event, figure, budget, results[event][figure])
+        for event, figures in budgets.items()
+        for figure, budget in figures.items()
+        if event in results and results[event][figure] > budget
+    ]
+
+
+def load_budgets(path: str = BUDGETS) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("run", "compare"))
+    parser.add_argument("--budgets", default=BUDGETS)
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--save", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'event':<12}" + "".join(f" {f:>10}" for f in FIGURES), file=sys.stderr)
+    results = run(args.number)
+
+    if args.command == "run":
+        if args.save:
+            budgets = {
+                event: {f: with_headroom(f, figures[f]) for f in FIGURES}
+                for event, figures in results.items()
+            }
+            with open(args.budgets, "w") as file:
+                json.dump(budgets, file, indent=2, sort_keys=True)
+                file.write("\n")
+        return
+
+    over = over_budget(results, load_budgets(args.budgets))
+    for event, figure, budget, measured in over:
+        print(f"{event} {figure}: {measured:.1f} over its budget of {budget}")
+    retained = {k: v for k, v in results["lifecycle"]["retained"].items() if v}
+    for kind, count in retained.items():
+        print(f"lifecycle retained {count} {kind}")
+    if over or retained:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Count the packets written to the clients per game.
+
+Plays games of 6 players through `MainNamespace.trigger_event` on a real
+`socketio.Server` whose transport counts the Engine.IO packets it is given,
+one per recipient and event, as written to the sockets. Games are played
+without deduplication of the batches, with it, and with room updates sent
+on ticks, one tick per handler call as a lower bound.
+
+Usage:
+    python -m benchmarks.batching [--games N]
+
+"""
+
+import argparse
+import random
+import time
+
+import socketio
+
+from timebomb.batching import Ticker
+from timebomb.metrics import METRICS
+from timebomb.player.service import PLAYERS
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+from timebomb.socket_app import MainNamespace
+
+
+class UnbatchedNamespace(MainNamespace):
+    """Send every emit of a batch, as before deduplication."""
+
+    def send(self, batch: list):
+        for event, data, to in batch:
+            self.emit(event, data, to=to)
+
+
+def play(sio: socketio.Server, game: int, nb_players: int = 6) -> int:
+    """Play a game from login to disconnect, return the number of requests."""
+    namespace = sio.namespace_handlers["/"]
+    RoomService.create(f"room-{game}", seed=game)
+    sids = [sio.manager.connect(f"{game}-{i}", "/") for i in range(nb_players)]
+    for sid in sids:
+        data = {"username": "bench", "roomname": f"room-{game}"}
+        namespace.trigger_event("login", sid, data)
+    namespace.trigger_event("start", sids[0])
+    requests = nb_players + 1
+
+    cutter = sids[0]
+    while True:
+        room = ROOMS.first("name", f"room-{game}")
+        targets = [p.id for p in room.players if p.id != cutter and sum(p.cards)]
+        target = random.choice(targets)
+        res = namespace.trigger_event("cut", cutter, {"target": target})
+        if namespace.ticker:
+            namespace.tick()
+        requests += 1
+        if res["status"] != "SUCCESS" or "winning_team" in res["data"]:
+            break
+        cutter = target
+
+    namespace.trigger_event("disconnect", sids[0])
+    for sid in sids:
+        sio.manager.disconnect(sid, "/")
+    return requests + 1
+
+
+def run(namespace: MainNamespace, nb_games: int) -> dict:
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+    random.seed(0)
+
+    packets = 0
+
+    def send_packet(eio_sid, pkt):
+        nonlocal packets
+        packets += 1
+
+    sio = socketio.Server(async_mode="threading")
+    sio.register_namespace(namespace)
+    sio.eio.send_packet = send_packet
+
+    requests = 0
+    start = time.perf_counter()
+    for game in range(nb_games):
+        requests += play(sio, game)
+    seconds = time.perf_counter() - start
+    return {"packets": packets / requests, "time": seconds / requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=500)
+    args = parser.parse_args()
+    METRICS.enabled = False
+
+    ticked = MainNamespace("/")
+    ticked.ticker = Ticker(0.05)
+    modes = {
+        "unbatched": UnbatchedNamespace("/"),
+        "batched": MainNamespace("/"),
+        "ticked": ticked,
+    }
+
+    print(f"{'':<10} {'packets/request':>16} {'time/request':>14}")
+    for name, namespace in modes.items():
+        results = run(namespace, args.games)
+        print(
+            f"{name:<10} {results['packets']:>16.2f}"
+            f" {results['time'] * 1e6:>11.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Measure game throughput of a sharded cluster by number of workers.
+
+Starts a `Cluster` for every number of workers and plays full 4 players
+games from client processes over Socket.IO: route, connect, login, start,
+cut until the end. Reports the handled requests per second.
+
+Usage:
+    python -m benchmarks.cluster [--workers N ...] [--clients N]
+        [--games N] [--port PORT]
+
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+
+import requests
+import socketio
+
+from timebomb.cluster.supervisor import Cluster
+
+NB_PLAYERS = 4
+
+
+def play(url: str, name: str) -> int:
+    """Play a game in room `name`, return the number of requests."""
+    worker = requests.get(f"{url}/route", params={"roomname": name}).json()["url"]
+
+    clients = {}
+    for i in range(NB_PLAYERS):
+        client = socketio.Client()
+        client.connect(worker, transports=["websocket"])
+        res = client.call("login", {"username": f"p{i}", "roomname": name})
+        assert res["status"] == "SUCCESS", res
+        clients[client.get_sid()] = client
+
+    room = next(iter(clients.values())).call("start")["data"]
+    requests_count = NB_PLAYERS + 2
+    cutter = room["cutter"]["id"]
+
+    while True:
+        target = random.choice([sid for sid in clients if sid != cutter])
+        res = clients[cutter].call("cut", {"target": target})
+        requests_count += 1
+        if res["status"] != "SUCCESS":
+            continue
+        if "winning_team" in res["data"]:
+            break
+        cutter = res["data"]["cutter"]["id"]
+
+    for client in clients.values():
+        client.disconnect()
+    return requests_count
+
+
+def run_client(url: str, index: int, nb_games: int, ready, go, queue):
+    ready.put(index)
+    go.wait()
+
+    count = 0
+    for game in range(nb_games):
+        count += play(url, f"bench-{index}-{game}")
+    queue.put(count)
+
+
+def run(nb_workers: int, nb_clients: int, nb_games: int, port: int) -> tuple:
+    with Cluster(nb_workers, port=port) as cluster:
+        time.sleep(0.5)
+        context = multiprocessing.get_context("spawn")
+        ready, go, queue = context.Queue(), context.Event(), context.Queue()
+        clients = [
+            context.Process(
+                target=run_client,
+                args=(cluster.urls[i % nb_workers], i, nb_games, ready, go, queue),
+            )
+            for i in range(nb_clients)
+        ]
+
+        for client in clients:
+            client.start()
+        for client in clients:
+            ready.get()
+
+        start = time.perf_counter()
+        go.set()
+        count = sum(queue.get() for _ in clients)
+        elapsed = time.perf_counter() - start
+
+        for client in clients:
+            client.join()
+
+    return count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--port", type=int, default=5100)
+    args = parser.parse_args()
+
+    print(f"{multiprocessing.cpu_count()} cpus")
+    print(f"{'workers':<8} {'requests':>9} {'seconds':>8} {'req/s':>8}")
+    for nb_workers in args.workers:
+        count, elapsed = run(nb_workers, args.clients, args.games, args.port)
+        print(f"{nb_workers:<8} {count:>9} {elapsed:>8.2f} {count / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
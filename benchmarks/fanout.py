@@ -0,0 +1,97 @@
+"""Measure a room broadcast to thousands of spectators.
+
+Emits the `room` event of a playing room to its players and spectators on a
+real `socketio.Server` whose transport drops the packets, once for every
+recipient, as a per-recipient loop would, and once to the Socket.IO rooms
+of the players and the spectators, which encodes the packet a single time.
+Metrics are disabled so only the emits are timed.
+
+Usage:
+    python -m benchmarks.fanout [--spectators N ...] [--repeat N]
+
+"""
+
+import argparse
+import time
+
+import socketio
+
+from timebomb.metrics import METRICS
+from timebomb.player.model import Player
+from timebomb.room.serializer import dump_room
+from timebomb.room.service import RoomService
+from timebomb.socket_app import MainNamespace, audience, spectators
+
+
+def make_room(sio: socketio.Server, nb_spectators: int):
+    """Return a playing room of 6 players watched by `nb_spectators`."""
+    room = RoomService.create(f"fanout-{nb_spectators}")
+    for i in range(6):
+        sid = sio.manager.connect(f"{room.id}-player-{i}", "/")
+        RoomService.add_player(room, Player("bench", sid))
+        sio.manager.enter_room(sid, "/", room.id)
+    RoomService.start(room)
+
+    for i in range(nb_spectators):
+        sid = sio.manager.connect(f"{room.id}-spectator-{i}", "/")
+        sio.manager.enter_room(sid, "/", spectators(room.id))
+    return room
+
+
+def measure(nb_spectators: int, repeat: int) -> dict:
+    sio = socketio.Server(async_mode="threading")
+    namespace = MainNamespace("/")
+    sio.register_namespace(namespace)
+    sio.eio.send_packet = lambda *args: None
+    room = make_room(sio, nb_spectators)
+    json = dump_room(room)
+
+    encodes = 0
+    encode = sio.packet_class.encode
+
+    def counting_encode(self):
+        nonlocal encodes
+        encodes += 1
+        return encode(self)
+
+    sio.packet_class.encode = counting_encode
+    recipients = [sid for sid, _ in sio.manager.get_participants("/", audience(room))]
+    results = {}
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for sid in recipients:
+                namespace.emit("room", json, to=sid)
+        results["per recipient"] = ((time.perf_counter() - start) / repeat, encodes)
+
+        encodes = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            namespace.emit("room", json, to=audience(room))
+        results["broadcast"] = ((time.perf_counter() - start) / repeat, encodes)
+    finally:
+        sio.packet_class.encode = encode
+
+    return {
+        name: (seconds, count / repeat) for name, (seconds, count) in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spectators", type=int, nargs="+", default=[10, 1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    METRICS.enabled = False
+
+    print(f"{'spectators':>10} {'mode':<14} {'per emit':>12} {'encodes':>8}")
+    for nb_spectators in args.spectators:
+        for mode, (seconds, encodes) in measure(nb_spectators, args.repeat).items():
+            print(
+                f"{nb_spectators:>10} {mode:<14} {seconds * 1e3:>9.3f} ms"
+                f" {encodes:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
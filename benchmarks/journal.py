@@ -0,0 +1,116 @@
+"""Measure the journal snapshot and restore times.
+
+Fills the registry with started games, then times the snapshot, with the
+longest chunk the event loop was blocked by, the restore from a snapshot
+plus a log tail, and the restore from a snapshot alone.
+
+Usage:
+    python -m benchmarks.journal [--rooms N] [--path DIR]
+
+"""
+
+import argparse
+import tempfile
+import time
+
+import timebomb.room.service as room_service
+from timebomb.player.model import Player
+from timebomb.player.service import PLAYERS
+from timebomb.room.journal import Journal
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+
+
+def make_rooms(nb_rooms: int, nb_players: int = 4):
+    for i in range(nb_rooms):
+        room = RoomService.create(f"room-{i}")
+        for j in range(nb_players):
+            player = Player(f"user_{j}", f"id_{i}_{j}")
+            PLAYERS.append(player)
+            RoomService.add_player(room, player)
+        RoomService.start(room)
+
+        target = room.players[1]
+        RoomService.cut_card(room, room.cutter, target)
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+
+def snapshot(journal: Journal) -> tuple:
+    """Snapshot the rooms, return the total time and the longest chunk."""
+    longest = 0
+    start = last = time.perf_counter()
+    for _ in journal.snapshot_chunks(ROOMS):
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+    return time.perf_counter() - start, longest
+
+
+def clear():
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+
+
+def run(nb_rooms: int, path: str) -> list:
+    results = []
+
+    journal = Journal(path)
+    journal.start()
+
+    start = time.perf_counter()
+    make_rooms(nb_rooms // 2)
+    results.append(("build (no journal)", time.perf_counter() - start))
+
+    elapsed, longest = snapshot(journal)
+    results.append(("snapshot", elapsed))
+    results.append(("snapshot longest chunk", longest))
+    journal.flush()
+
+    room_service.JOURNAL = journal
+    start = time.perf_counter()
+    make_rooms(nb_rooms - nb_rooms // 2)
+    results.append(("build (journal)", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    journal.flush()
+    journal.close()
+    results.append(("flush", time.perf_counter() - start))
+
+    room_service.JOURNAL = None
+    clear()
+    start = time.perf_counter()
+    restored = Journal(path).restore()
+    results.append((f"restore ({restored} records)", time.perf_counter() - start))
+    assert len(ROOMS) == nb_rooms
+
+    journal = Journal(path)
+    journal.seq = restored
+    journal.start()
+    elapsed, longest = snapshot(journal)
+    results.append((f"snapshot ({nb_rooms})", elapsed))
+    results.append((f"snapshot longest chunk ({nb_rooms})", longest))
+    journal.close()
+
+    clear()
+    start = time.perf_counter()
+    Journal(path).restore()
+    results.append(("restore (snapshot only)", time.perf_counter() - start))
+    assert len(ROOMS) == nb_rooms
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.path) as path:
+        for name, elapsed in run(args.rooms, path):
+            print(f"{name:<36} {elapsed:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
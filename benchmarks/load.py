@@ -0,0 +1,317 @@
+"""Drive a server with simulated players over real Socket.IO connections.
+
+Every simulated player connects, logs into an open room, starts the game
+once the room is full, cuts when notified it is its turn, chats now and
+then, and reconnects for a new game when the game ends. Players run as
+asyncio clients, spread over several processes.
+
+Each interval reports the acknowledged requests and received events per
+second, the acknowledgement latency percentiles, the events received per
+request (the server fan-out) and the server RSS.
+
+Profiles:
+    ramp: the number of players grows linearly up to `--clients`, in
+        `--steps` steps.
+    soak: `--clients` players for the whole `--duration`, to watch the
+        latency and the RSS drift.
+
+Usage:
+    python -m benchmarks.load [--mode eventlet|asgi] [--url URL --pid PID]
+        [--profile ramp|soak] [--clients N] [--duration S] [--interval S]
+        [--players N] [--think S] [--chat P] [--processes N]
+
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import queue
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import socketio
+
+from benchmarks.modes import MODES
+
+
+@dataclass
+class Stats:
+    """Counters of an interval, merged from every client process."""
+
+    clients: int = 0
+    requests: int = 0
+    errors: int = 0
+    events: int = 0
+    games: int = 0
+    latencies: list = field(default_factory=list)
+
+    def merge(self, other: "Stats"):
+        self.clients += other.clients
+        self.requests += other.requests
+        self.errors += other.errors
+        self.events += other.events
+        self.games += other.games
+        self.latencies.extend(other.latencies)
+
+
+def rss(pid: int) -> float:
+    """Return the resident memory of a process in MB, 0 if unknown."""
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, TypeError):
+        pass
+    return 0.0
+
+
+class Bot:
+    """A simulated player, playing games until stopped.
+
+    Errors count the requests which timed out, lost connections and failed
+    logins. Cuts refused because the target has no card left are retried
+    on another player and not counted.
+
+    """
+
+    def __init__(self, url: str, stats: Stats, args, rng: random.Random):
+        self.url = url
+        self.stats = stats
+        self.args = args
+        self.rng = rng
+
+        self.stopped = False
+        self.sio = None
+        self.events = None
+        self.room = None
+
+    async def run(self):
+        while not self.stopped:
+            try:
+                await self.play()
+            except (socketio.exceptions.SocketIOError, asyncio.TimeoutError):
+                self.stats.errors += 1
+            finally:
+                if self.sio:
+                    await self.sio.disconnect()
+                    self.sio = None
+
+    async def call(self, event: str, data=None) -> dict:
+        start = time.perf_counter()
+        res = await self.sio.call(event, data, timeout=self.args.timeout)
+        self.stats.latencies.append(time.perf_counter() - start)
+        self.stats.requests += 1
+        return res
+
+    async def think(self):
+        if self.args.think:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think))
+
+    async def play(self):
+        self.events = asyncio.Queue()
+        self.sio = socketio.AsyncClient(reconnection=False)
+        for event in ("room", "room_delta", "player", "notify", "chat", "end"):
+            self.sio.on(event, self.handler(event))
+
+        await self.sio.connect(self.url, transports=["websocket"])
+        res = await self.call("login", {"username": "bot"})
+        if res["status"] != "SUCCESS":
+            self.stats.errors += 1
+            return
+        self.room = res["data"]
+
+        while not self.stopped:
+            event, data = await asyncio.wait_for(self.events.get(), self.args.timeout)
+            if event == "room":
+                self.room = data
+                if await self.maybe_start():
+                    await self.cut()
+            elif event == "notify" and data["message"].startswith("Your turn"):
+                await self.cut()
+            elif event == "end":
+                self.stats.games += 1
+                return
+
+    def handler(self, event: str):
+        async def handle(data):
+            self.stats.events += 1
+            self.events.put_nowait((event, data))
+
+        return handle
+
+    async def maybe_start(self) -> bool:
+        players = self.room["players"]
+        if self.room["status"] != "READY" or len(players) < self.args.players:
+            return False
+        if players[0]["id"] != self.sio.get_sid():
+            return False
+
+        await self.think()
+        res = await self.call("start")
+        return res["status"] == "SUCCESS"
+
+    async def cut(self):
+        await self.think()
+
+        sid = self.sio.get_sid()
+        targets = [p["id"] for p in self.room["players"] if p["id"] != sid]
+        self.rng.shuffle(targets)
+        for target in targets:
+            res = await self.call("cut", {"target": target})
+            if res["status"] == "SUCCESS":
+                break
+
+        if self.rng.random() < self.args.chat:
+            await self.call("chat", {"message": "Cut!"})
+
+
+def target_clients(args, elapsed: float) -> int:
+    if args.profile == "soak":
+        return args.clients
+
+    step = min(int(elapsed / args.duration * args.steps) + 1, args.steps)
+    return args.clients * step // args.steps
+
+
+async def drive(url: str, args, index: int, results):
+    rng = random.Random(index)
+    stats = Stats()
+    bots = {}
+
+    start = time.monotonic()
+    report = start + args.interval
+    reports = int(args.duration / args.interval)
+    while reports:
+        elapsed = time.monotonic() - start
+        target = target_clients(args, elapsed) // args.processes
+        if index < target_clients(args, elapsed) % args.processes:
+            target += 1
+
+        spawn = max(1, int(args.spawn_rate * 0.1 / args.processes))
+        while len(bots) < target and spawn:
+            bot = Bot(url, stats, args, random.Random(rng.random()))
+            bots[bot] = asyncio.ensure_future(bot.run())
+            spawn -= 1
+        while len(bots) > target:
+            bot, task = bots.popitem()
+            bot.stopped = True
+            task.cancel()
+
+        if time.monotonic() >= report:
+            stats.clients = len(bots)
+            results.put(stats)
+            stats = Stats()
+            for bot in bots:
+                bot.stats = stats
+            report += args.interval
+            reports -= 1
+
+        await asyncio.sleep(0.1)
+
+    for bot, task in bots.items():
+        bot.stopped = True
+        task.cancel()
+    await asyncio.gather(*bots.values(), return_exceptions=True)
+
+
+def run_process(url: str, args, index: int, results):
+    asyncio.run(drive(url, args, index, results))
+
+
+def start_server(mode: str, port: int):
+    context = multiprocessing.get_context("spawn")
+    server = context.Process(target=MODES[mode], args=(port,), daemon=True)
+    server.start()
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+
+
+def row(elapsed: float, stats: Stats, interval: float, pid: int) -> str:
+    p50, p90, p99 = (
+        np.percentile(stats.latencies, [50, 90, 99]) * 1e3
+        if stats.latencies
+        else (0, 0, 0)
+    )
+    fan_out = stats.events / stats.requests if stats.requests else 0
+    return (
+        f"{elapsed:>6.0f} {stats.clients:>7} {stats.requests / interval:>8.0f}"
+        f" {stats.events / interval:>8.0f} {fan_out:>7.2f} {p50:>8.1f}"
+        f" {p90:>8.1f} {p99:>8.1f} {stats.errors:>6} {stats.games:>6}"
+        f" {rss(pid):>8.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES, default="eventlet")
+    parser.add_argument("--url", help="Drive a running server instead.")
+    parser.add_argument("--pid", type=int, help="Pid of the running server.")
+    parser.add_argument("--port", type=int, default=5300)
+    parser.add_argument("--profile", choices=("ramp", "soak"), default="ramp")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--interval", type=float, default=5)
+    parser.add_argument("--spawn-rate", type=float, default=200)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--think", type=float, default=0.5)
+    parser.add_argument("--chat", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    server, url, pid = None, args.url, args.pid
+    if not url:
+        server = start_server(args.mode, args.port)
+        url, pid = f"http://localhost:{args.port}", server.pid
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_process, args=(url, args, i, results))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    print(
+        f"{'time':>6} {'clients':>7} {'req/s':>8} {'events/s':>8} {'ev/req':>7}"
+        f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>6} {'games':>6}"
+        f" {'rss MB':>8}"
+    )
+    total = Stats()
+    start = time.monotonic()
+    intervals = int(args.duration / args.interval)
+    for _ in range(intervals):
+        stats = Stats()
+        for _ in processes:
+            try:
+                stats.merge(results.get(timeout=args.interval + args.timeout))
+            except queue.Empty:
+                break
+        print(row(time.monotonic() - start, stats, args.interval, pid), flush=True)
+        clients, stats.clients = stats.clients, 0
+        total.merge(stats)
+
+    total.clients = clients
+    print("total")
+    print(row(time.monotonic() - start, total, time.monotonic() - start, pid))
+
+    for process in processes:
+        process.join()
+    if server:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure the memory of idle players and of playing rooms.
+
+Registers players logged in but waiting, then rooms of 6 players after
+their first cut, the players included, in the stores of the services, and
+reports the memory traced by tracemalloc per object. Names and socket ids
+come from the clients, so they are allocated before tracing starts.
+
+Usage:
+    python -m benchmarks.memory [--players N] [--rooms N]
+
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from timebomb.player.service import PLAYERS, PlayerService
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+
+
+def sid(i: int) -> str:
+    return f"{i:020X}"
+
+
+def traced(build, count: int) -> float:
+    """Return the bytes allocated by `build()` per object, still alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def idle_players(nb_players: int) -> float:
+    ids = [sid(i) for i in range(nb_players)]
+    names = [f"player-{i % 1000}" for i in range(nb_players)]
+
+    def build():
+        for id, name in zip(ids, names):
+            PlayerService.create({"name": name, "id": id})
+
+    return traced(build, nb_players)
+
+
+def playing_rooms(nb_rooms: int, nb_players: int = 6) -> float:
+    seats = [
+        [sid(i * nb_players + j) for j in range(nb_players)] for i in range(nb_rooms)
+    ]
+    names = [f"room-{i}" for i in range(nb_rooms)]
+
+    def build():
+        for name, ids in zip(names, seats):
+            room = RoomService.create(name)
+            players = []
+            for id in ids:
+                player = PlayerService.create({"name": "player", "id": id})
+                RoomService.add_player(room, player)
+                players.append(player)
+            RoomService.start(room)
+            RoomService.cut_card(room, room.cutter, players[1])
+
+    return traced(build, nb_rooms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--rooms", type=int, default=10_000)
+    args = parser.parse_args()
+
+    player = idle_players(args.players)
+    PLAYERS.clear()
+    room = playing_rooms(args.rooms)
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+
+    print(f"idle player   {player:>8.0f} B")
+    print(f"playing room  {room:>8.0f} B  (6 players included)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure the cost of the handler and emit metrics.
+
+Plays whole games through `MainNamespace.trigger_event`, as the server
+dispatches events, on a real `socketio.Server` whose transport drops the
+encoded packets. The same games are timed with `METRICS.enabled` on and
+off, so the difference is the recording overhead on the server side of a
+request, network excluded.
+
+Usage:
+    python -m benchmarks.metrics [--games N] [--repeat N]
+
+"""
+
+import argparse
+import time
+
+import socketio
+
+from timebomb.metrics import METRICS
+from timebomb.player.service import PLAYERS
+from timebomb.room.service import OPEN_ROOMS, ROOMS
+from timebomb.socket_app import MainNamespace
+
+
+def make_server() -> socketio.Server:
+    """Return a server whose Engine.IO transport drops the packets."""
+    sio = socketio.Server(async_mode="threading")
+    sio.register_namespace(MainNamespace("/"))
+    sio.eio.send = lambda *args, **kwargs: None
+    return sio
+
+
+def play(sio: socketio.Server, game: int, nb_players: int = 4) -> int:
+    """Play a game from login to disconnect, return the number of events."""
+    namespace = sio.namespace_handlers["/"]
+    sids = [sio.manager.connect(f"{game}-{i}", "/") for i in range(nb_players)]
+    for sid in sids:
+        data = {"username": "bench", "roomname": f"room-{game}"}
+        namespace.trigger_event("login", sid, data)
+    namespace.trigger_event("start", sids[0])
+    events = nb_players + 1
+
+    cutter = sids[0]
+    while True:
+        target = next(sid for sid in sids if sid != cutter)
+        res = namespace.trigger_event("cut", cutter, {"target": target})
+        namespace.trigger_event("sync", target)
+        events += 2
+        if res["status"] != "SUCCESS" or "winning_team" in res["data"]:
+            break
+        cutter = target
+
+    namespace.trigger_event("disconnect", sids[0])
+    for sid in sids:
+        sio.manager.disconnect(sid, "/")
+    return events + 1
+
+
+def run(nb_games: int, enabled: bool) -> tuple:
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+    METRICS.clear()
+    METRICS.enabled = enabled
+
+    sio = make_server()
+    events = 0
+    start = time.perf_counter()
+    for game in range(nb_games):
+        events += play(sio, game)
+    return time.perf_counter() - start, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Games are randomly seeded, so runs are compared per event.
+    best = {True: float("inf"), False: float("inf")}
+    for _ in range(args.repeat):
+        for enabled in (False, True):
+            seconds, events = run(args.games, enabled)
+            best[enabled] = min(best[enabled], seconds / events)
+
+    render = time.perf_counter()
+    METRICS.render()
+    render = time.perf_counter() - render
+
+    off, on = best[False] * 1e6, best[True] * 1e6
+    print(f"metrics off       {off:>10.2f} us/event")
+    print(f"metrics on        {on:>10.2f} us/event")
+    print(f"overhead          {on - off:>10.2f} us/event ({on / off - 1:.1%})")
+    print(f"render            {render * 1e3:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Compare the eventlet and asyncio server modes.
+
+Serves `timebomb.main:app` with eventlet and `timebomb.asgi:app` with
+uvicorn, plays full 4 players games from client processes against each,
+and reports the acknowledged requests per second and their latency.
+
+Usage:
+    python -m benchmarks.modes [--clients N] [--games N] [--port PORT]
+
+"""
+
+import argparse
+import multiprocessing
+import random
+import socket
+import time
+
+import numpy as np
+import socketio
+
+NB_PLAYERS = 4
+
+
+def serve_eventlet(port: int):
+    import eventlet
+    import eventlet.wsgi
+
+    eventlet.monkey_patch()
+    from timebomb.main import app
+
+    eventlet.wsgi.server(eventlet.listen(("localhost", port)), app, log_output=False)
+
+
+def serve_asgi(port: int):
+    import uvicorn
+
+    uvicorn.run("timebomb.asgi:app", port=port, log_level="error")
+
+
+MODES = {"eventlet": serve_eventlet, "asgi": serve_asgi}
+
+
+def play(url: str, name: str, latencies: list):
+    def call(client, *args):
+        start = time.perf_counter()
+        res = client.call(*args)
+        latencies.append(time.perf_counter() - start)
+        return res
+
+    clients = {}
+    for i in range(NB_PLAYERS):
+        client = socketio.Client()
+        client.connect(url, transports=["websocket"])
+        res = call(client, "login", {"username": f"p{i}", "roomname": name})
+        assert res["status"] == "SUCCESS", res
+        clients[client.get_sid()] = client
+
+    room = call(next(iter(clients.values())), "start")["data"]
+    cutter = room["cutter"]["id"]
+
+    while True:
+        target = random.choice([sid for sid in clients if sid != cutter])
+        res = call(clients[cutter], "cut", {"target": target})
+        if res["status"] != "SUCCESS":
+            continue
+        if "winning_team" in res["data"]:
+            break
+        cutter = res["data"]["cutter"]["id"]
+
+    for client in clients.values():
+        client.disconnect()
+
+
+def run_client(url: str, index: int, nb_games: int, ready, go, queue):
+    ready.put(index)
+    go.wait()
+
+    latencies = []
+    for game in range(nb_games):
+        play(url, f"bench-{index}-{game}", latencies)
+    queue.put(latencies)
+
+
+def run(mode: str, nb_clients: int, nb_games: int, port: int) -> tuple:
+    context = multiprocessing.get_context("spawn")
+    server = context.Process(target=MODES[mode], args=(port,), daemon=True)
+    server.start()
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    url = f"http://localhost:{port}"
+    ready, go, queue = context.Queue(), context.Event(), context.Queue()
+    clients = [
+        context.Process(target=run_client, args=(url, i, nb_games, ready, go, queue))
+        for i in range(nb_clients)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        ready.get()
+
+    start = time.perf_counter()
+    go.set()
+    latencies = np.concatenate([queue.get() for _ in clients])
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        client.join()
+    server.terminate()
+    server.join()
+
+    return len(latencies) / elapsed, np.percentile(latencies, [50, 99]) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5200)
+    args = parser.parse_args()
+
+    print(f"{'mode':<9} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for mode in args.modes:
+        throughput, (p50, p99) = run(mode, args.clients, args.games, args.port)
+        print(f"{mode:<9} {throughput:>8.0f} {p50:>9.2f} {p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare the JSON and msgpack wire protocols.
+
+Builds the Socket.IO packets of the `room`, `player` and `end` events of a
+game of 6 players, as the server sends them, and reports the bytes per
+event and the encode time of the default JSON protocol, up to UTF-8 bytes,
+and of msgpack with packed cards.
+
+Usage:
+    python -m benchmarks.protocol [--repeat N]
+
+"""
+
+import argparse
+import time
+
+from timebomb.player.model import Player
+from timebomb.player.serializer import dump_player
+from timebomb.protocol import Packet, encode_msgpack
+from timebomb.room.serializer import dump_ended_room, dump_room
+from timebomb.room.service import RoomService
+
+
+def make_events() -> dict:
+    """Return the payload of each event, mid-game and at the end."""
+    room = RoomService.create("protocol")
+    for i in range(6):
+        RoomService.add_player(room, Player(f"player_{i}", f"{i:020X}"))
+    RoomService.start(room)
+    RoomService.cut_card(room, room.cutter, room.players[1])
+    events = {"room": dump_room(room), "player": dump_player(room.players[1])}
+
+    while room.status == "PLAYING":
+        target = next(p for p in room.players if p is not room.cutter and len(p.hand))
+        RoomService.cut_card(room, room.cutter, target)
+        RoomService.distribute_cards(room)
+    events["end"] = dump_ended_room(room)
+    return events
+
+
+def measure(encode, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'event':<8} {'json':>8} {'msgpack':>8} {'json':>10} {'msgpack':>10}")
+    for event, data in make_events().items():
+        packet = Packet(data=[event, data], namespace="/")
+        encoders = {
+            "json": lambda: packet.encode().encode(),
+            "msgpack": lambda: encode_msgpack(packet),
+        }
+        sizes = {name: len(encode()) for name, encode in encoders.items()}
+        times = {
+            name: measure(encode, args.repeat) for name, encode in encoders.items()
+        }
+        print(
+            f"{event:<8} {sizes['json']:>6} B {sizes['msgpack']:>6} B"
+            f" {times['json'] * 1e6:>7.2f} us {times['msgpack'] * 1e6:>7.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the marshmallow schemas with the precompiled serializers.
+
+Usage:
+    python -m benchmarks.serializers [--number N]
+
+"""
+
+import argparse
+import timeit
+
+from timebomb.player.model import Player
+from timebomb.player.schema import PlayerSchema
+from timebomb.player.serializer import dump_player
+from timebomb.room.schema import RoomSchema, EndedRoomSchema
+from timebomb.room.serializer import dump_room, dump_ended_room
+from timebomb.room.service import RoomService
+
+
+def make_room(nb_players: int = 8):
+    room = RoomService.create("benchmark")
+    for i in range(nb_players):
+        RoomService.add_player(room, Player(f"user_{i}", f"id_{i}"))
+    RoomService.start(room)
+    return room
+
+
+def run(number: int) -> list:
+    room = make_room()
+    player = room.players[0]
+
+    cases = [
+        ("room", lambda: RoomSchema().dump(room), lambda: dump_room(room)),
+        ("player", lambda: PlayerSchema().dump(player), lambda: dump_player(player)),
+        (
+            "end",
+            lambda: EndedRoomSchema().dump(room),
+            lambda: dump_ended_room(room),
+        ),
+    ]
+
+    results = []
+    for name, schema_dump, fast_dump in cases:
+        assert schema_dump() == fast_dump()
+        schema_time = min(timeit.repeat(schema_dump, number=number, repeat=5))
+        fast_time = min(timeit.repeat(fast_dump, number=number, repeat=5))
+        results.append((name, schema_time / number, fast_time / number))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'payload':<8} {'schema (us)':>12} {'fast (us)':>10} {'speedup':>8}")
+    for name, schema_time, fast_time in run(args.number):
+        print(
+            f"{name:<8} {schema_time * 1e6:>12.2f} {fast_time * 1e6:>10.2f}"
+            f" {schema_time / fast_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
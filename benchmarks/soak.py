@@ -0,0 +1,207 @@
+"""Drive the handlers through millions of random events, to find leaks.
+
+Simulated clients log into a named room or any open one, start games, cut,
+chat and disconnect at random, in the middle of games too, on a
+`MainNamespace` whose emitter only counts the emits. Each disconnected
+client is replaced by a new one, so `--clients` stay connected.
+
+Every `--sample` events, the RSS, the rooms, players and open rooms and the
+objects tracked by the gc are sampled, and the registries are checked for
+orphans: players without a room, or missing from their room, and open rooms
+which were deleted. A figure is flagged as leaking when it grew at each of
+the last `--window` samples, by more than `--tolerance` in total. At the
+end every client disconnects, which must leave the registries empty. The
+exit code is 1 if a figure leaked or orphans were found.
+
+Usage:
+    python -m benchmarks.soak [--events N] [--clients N] [--rooms N]
+        [--sample N] [--window N] [--tolerance RATIO] [--seed N]
+
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from benchmarks.allocations import clear
+from benchmarks.load import rss
+from benchmarks.suite import make_namespace
+from timebomb.player.service import PLAYERS, PlayerService
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+
+FIGURES = ("rss MB", "rooms", "players", "open", "objects", "orphans")
+LEAKS = ("rss MB", "rooms", "players", "open", "objects")
+
+
+class Soak:
+    """Random clients of a namespace, and the counts of what they did.
+
+    Attributes:
+        clients (list): The sids of the connected clients.
+        results (Counter): Handler calls by (event, status or message).
+        emits (Counter): Emits by event.
+
+    """
+
+    def __init__(self, nb_clients: int, nb_rooms: int, rng: random.Random):
+        self.rng = rng
+        self.nb_rooms = nb_rooms
+        self.namespace = make_namespace()
+        self.namespace.emit = self.count_emit
+        self.results = Counter()
+        self.emits = Counter()
+
+        self.next_sid = 0
+        self.clients = [self.connect() for _ in range(nb_clients)]
+
+    def count_emit(self, event: str, data=None, **kwargs):
+        self.emits[event] += 1
+
+    def connect(self) -> str:
+        self.next_sid += 1
+        return f"soak-{self.next_sid}"
+
+    def call(self, event: str, *args):
+        res = self.namespace.trigger_event(event, *args)
+        if res["status"] == "ERROR":
+            self.results[(event, res["data"]["message"])] += 1
+        else:
+            self.results[(event, "SUCCESS")] += 1
+
+    def step(self):
+        """Make a random client send an event fitting its state, mostly."""
+        index = self.rng.randrange(len(self.clients))
+        sid = self.clients[index]
+        player = PlayerService.get_by_id(sid)
+        room = RoomService.get_by_id(player.room_id) if player else None
+        pick = self.rng.random()
+
+        if pick < 0.02 or (room and room.status == "ENDED" and pick < 0.5):
+            self.call("disconnect", sid)
+            self.clients[index] = self.connect()
+        elif not player or pick < 0.05:
+            data = {"username": "soak"}
+            if self.rng.random() < 0.3:
+                data["roomname"] = f"soak-{self.rng.randrange(self.nb_rooms)}"
+            self.call("login", sid, data)
+        elif pick < 0.15:
+            self.call("chat", sid, {"message": "hello"})
+        elif not room or room.status != "PLAYING":
+            self.call("start", sid)
+        else:
+            targets = (
+                room.players
+                if pick < 0.2
+                else [p for p in room.players if p is not room.cutter and sum(p.cards)]
+            )
+            cutter = room.cutter.id if room.cutter and pick >= 0.2 else sid
+            target = self.rng.choice(targets).id if targets else sid
+            self.call("cut", cutter, {"target": target})
+
+    def teardown(self):
+        for sid in self.clients:
+            self.call("disconnect", sid)
+        self.clients = []
+
+
+def orphans() -> int:
+    """Count the players and open rooms left behind by a partial teardown."""
+    count = 0
+    for player in PLAYERS:
+        room = ROOMS.get(player.room_id) if player.room_id else None
+        if room is None or room.get_player(player.id) is not player:
+            count += 1
+
+    return count + sum(1 for room in OPEN_ROOMS if ROOMS.get(room.id) is not room)
+
+
+def sample() -> dict:
+    gc.collect()
+    return {
+        "rss MB": rss(os.getpid()),
+        "rooms": len(ROOMS),
+        "players": len(PLAYERS),
+        "open": len(OPEN_ROOMS),
+        "objects": len(gc.get_objects()),
+        "orphans": orphans(),
+    }
+
+
+def growing(values: list, window: int, tolerance: float) -> bool:
+    """Whether the last `window` values all grew, by `tolerance` in total."""
+    if len(values) <= window:
+        return False
+
+    start = len(values) - window - 1
+    last = values[start:]
+    increasing = all(a < b for a, b in zip(last, last[1:]))
+    return increasing and last[-1] > last[0] * (1 + tolerance)
+
+
+def leaks(samples: list, window: int, tolerance: float) -> list:
+    """Return the figures which grew monotonically, first sample excluded."""
+    return [
+        figure
+        for figure in LEAKS
+        if growing([s[figure] for s in samples[1:]], window, tolerance)
+    ]
+
+
+def row(events: int, elapsed: float, figures: dict) -> str:
+    values = "".join(f" {figures[f]:>9.1f}" for f in FIGURES[:1])
+    values += "".join(f" {figures[f]:>9}" for f in FIGURES[1:])
+    return f"{events:>10} {elapsed:>7.1f}{values}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--sample", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    clear()
+    soak = Soak(args.clients, args.rooms, random.Random(args.seed))
+    samples = []
+
+    print(f"{'events':>10} {'time':>7}" + "".join(f" {f:>9}" for f in FIGURES))
+    start = time.monotonic()
+    for events in range(1, args.events + 1):
+        soak.step()
+        if events % args.sample == 0:
+            samples.append(sample())
+            print(row(events, time.monotonic() - start, samples[-1]), flush=True)
+
+    soak.teardown()
+    final = sample()
+    print(row(args.events, time.monotonic() - start, final))
+
+    print()
+    for (event, result), count in sorted(soak.results.items()):
+        print(f"{event:<12} {result:<40} {count:>10}")
+    print(f"{'emits':<12} {sum(soak.emits.values()):>51}")
+
+    failures = [
+        f"{figure} grew" for figure in leaks(samples, args.window, args.tolerance)
+    ]
+    if any(s["orphans"] for s in samples) or final["orphans"]:
+        failures.append("orphans found")
+    if final["rooms"] or final["players"] or final["open"]:
+        failures.append("registries not empty after every client disconnected")
+
+    for failure in failures:
+        print(f"LEAK: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
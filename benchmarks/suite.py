@@ -0,0 +1,471 @@
+"""Micro-benchmarks of the service, serializer and handler hot paths.
+
+Every case times one call, with its setup excluded, and keeps the best of 7
+repeats. Lookups are timed over registries of 10, 1k and 100k rooms.
+Handlers run on a `MainNamespace` whose emitter is a stub, so only the
+handler and service work is measured.
+
+`run --save` stores the results as the baseline, the median of 3 rounds of
+the suite by default. With `--filter`, only the cases run are replaced in
+the baseline. `compare` runs the suite again and exits with an error if a
+case got slower than the baseline by more than the threshold, and by more
+than `--min-delta` microseconds: a case of a microsecond varies by more
+than the threshold from run to run. Cases faster than `--min-delta` only
+need to get slower by their own baseline time, twice slower.
+
+Usage:
+    python -m benchmarks.suite run [--save] [--rounds N] [--filter TEXT]
+    python -m benchmarks.suite compare [--threshold RATIO] [--min-delta US]
+        [--filter TEXT]
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from timebomb.player.model import Player
+from timebomb.player.schema import PlayerSchema
+from timebomb.player.serializer import dump_player
+from timebomb.player.service import PLAYERS, PlayerService
+from timebomb.room.model import Room
+from timebomb.room.schema import RoomSchema, EndedRoomSchema
+from timebomb.room.serializer import dump_room, dump_ended_room
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+from timebomb.socket_app import MainNamespace
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = (10, 1_000, 100_000)
+
+CASES = {}
+POPULATION = []
+
+
+def case(name: str, sizes: tuple = (None,)):
+    """Register a case factory called as `factory(size)`.
+
+    Factories return `(setup, fn)`: `setup(number)` returns the arguments of
+    `number` calls of `fn`, only the calls are timed.
+
+    """
+
+    def register(factory):
+        for size in sizes:
+            key = name if size is None else f"{name}[{size}]"
+            CASES[key] = (factory, size)
+        return factory
+
+    return register
+
+
+def clear():
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+    POPULATION.clear()
+
+
+def populate(nb_rooms: int):
+    """Fill the registries with `nb_rooms` rooms of one player, once."""
+    if POPULATION == [nb_rooms]:
+        return
+
+    clear()
+    for i in range(nb_rooms):
+        room = RoomService.create(f"room-{i}")
+        RoomService.add_player(room, PlayerService.create({"name": "p", "id": f"{i}"}))
+    POPULATION.append(nb_rooms)
+
+
+def make_room(nb_players: int = 4, started: bool = False) -> Room:
+    room = Room(name="bench", id="bench")
+    for i in range(nb_players):
+        RoomService.add_player(room, Player(f"user_{i}", f"id_{i}"))
+    if started:
+        RoomService.start(room)
+    return room
+
+
+@case("RoomService.start")
+def bench_start(size):
+    return lambda number: [(make_room(),) for _ in range(number)], RoomService.start
+
+
+@case("RoomService.distribute_cards")
+def bench_distribute_cards(size):
+    def setup(number):
+        return [(make_room(started=True),) for _ in range(number)]
+
+    return setup, RoomService.distribute_cards
+
+
+@case("RoomService.cut_card")
+def bench_cut_card(size):
+    def setup(number):
+        args = []
+        for _ in range(number):
+            room = make_room(started=True)
+            args.append((room, room.cutter, room.players[1]))
+        return args
+
+    return setup, RoomService.cut_card
+
+
+@case("RoomService.add_player")
+def bench_add_player(size):
+    def setup(number):
+        return [(make_room(3), Player("user", "id")) for _ in range(number)]
+
+    return setup, RoomService.add_player
+
+
+@case("RoomService.get_open_rooms", SIZES)
+def bench_get_open_rooms(size):
+    populate(size)
+    return lambda number: [()] * number, RoomService.get_open_rooms
+
+
+@case("RoomService.get_open_room", SIZES)
+def bench_get_open_room(size):
+    populate(size)
+    return lambda number: [()] * number, RoomService.get_open_room
+
+
+@case("RoomService.get_by_id", SIZES)
+def bench_get_by_id(size):
+    populate(size)
+    ids = [room.id for room in ROOMS]
+    return (
+        lambda number: [(ids[i % size],) for i in range(number)],
+        RoomService.get_by_id,
+    )
+
+
+@case("RoomService.get_by_name", SIZES)
+def bench_get_by_name(size):
+    populate(size)
+    return (
+        lambda number: [(f"room-{i % size}",) for i in range(number)],
+        RoomService.get_by_name,
+    )
+
+
+@case("PlayerService.get_by_id", SIZES)
+def bench_player_get_by_id(size):
+    populate(size)
+    return (
+        lambda number: [(f"{i % size}",) for i in range(number)],
+        PlayerService.get_by_id,
+    )
+
+
+@case("PlayerService.get_by_room_id", SIZES)
+def bench_player_get_by_room_id(size):
+    populate(size)
+    ids = [room.id for room in ROOMS]
+    return (
+        lambda number: [(ids[i % size],) for i in range(number)],
+        PlayerService.get_by_room_id,
+    )
+
+
+def dump_case(dump, make):
+    def factory(size):
+        model = make()
+        return lambda number: [(model,)] * number, dump
+
+    return factory
+
+
+case("RoomSchema.dump")(
+    dump_case(lambda room: RoomSchema().dump(room), lambda: make_room(started=True))
+)
+case("dump_room")(dump_case(dump_room, lambda: make_room(started=True)))
+case("EndedRoomSchema.dump")(
+    dump_case(
+        lambda room: EndedRoomSchema().dump(room), lambda: make_room(started=True)
+    )
+)
+case("dump_ended_room")(dump_case(dump_ended_room, lambda: make_room(started=True)))
+case("PlayerSchema.dump")(
+    dump_case(
+        lambda player: PlayerSchema().dump(player),
+        lambda: make_room(started=True).players[0],
+    )
+)
+case("dump_player")(dump_case(dump_player, lambda: make_room(started=True).players[0]))
+
+
+def make_namespace() -> MainNamespace:
+    """Return a namespace whose emits and room changes do nothing."""
+    namespace = MainNamespace("/")
+    namespace.emit = lambda *args, **kwargs: None
+    namespace.enter_room = lambda *args, **kwargs: None
+    namespace.leave_room = lambda *args, **kwargs: None
+    namespace.close_room = lambda *args, **kwargs: None
+    namespace.rooms = lambda sid, namespace=None: [sid]
+    namespace.server = SimpleNamespace(
+        manager=SimpleNamespace(is_connected=lambda *args: False)
+    )
+    return namespace
+
+
+def login_room(namespace, name: str, nb_players: int = 4) -> list:
+    sids = [f"{name}-{i}" for i in range(nb_players)]
+    for sid in sids:
+        namespace.on_login(sid, {"username": "bench", "roomname": name})
+    return sids
+
+
+@case("MainNamespace.on_login")
+def bench_on_login(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        return [(f"sid-{i}", {"username": "bench"}) for i in range(number)]
+
+    return setup, namespace.on_login
+
+
+@case("MainNamespace.on_start")
+def bench_on_start(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        return [(login_room(namespace, f"r{i}")[0],) for i in range(number)]
+
+    return setup, namespace.on_start
+
+
+@case("MainNamespace.on_cut")
+def bench_on_cut(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        args = []
+        for i in range(number):
+            sids = login_room(namespace, f"r{i}")
+            namespace.on_start(sids[0])
+            args.append((sids[0], {"target": sids[1]}))
+        return args
+
+    return setup, namespace.on_cut
+
+
+@case("MainNamespace.on_chat")
+def bench_on_chat(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        sid = login_room(namespace, "chat", 1)[0]
+        return [(sid, {"message": "hello"})] * number
+
+    return setup, namespace.on_chat
+
+
+@case("MainNamespace.on_sync")
+def bench_on_sync(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        return [(login_room(namespace, "sync")[0],)] * number
+
+    return setup, namespace.on_sync
+
+
+@case("MainNamespace.on_resume")
+def bench_on_resume(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        calls = []
+        for i in range(number):
+            res = namespace.on_login(f"old-{i}", {"username": "bench"})
+            calls.append((f"new-{i}", {"id": f"old-{i}", "token": res["token"]}))
+        return calls
+
+    return setup, namespace.on_resume
+
+
+@case("MainNamespace.on_watch")
+def bench_on_watch(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        login_room(namespace, "watch", 1)
+        return [(f"spectator-{i}", {"roomname": "watch"}) for i in range(number)]
+
+    return setup, namespace.on_watch
+
+
+@case("MainNamespace.on_unwatch")
+def bench_on_unwatch(size):
+    namespace = make_namespace()
+    namespace.rooms = lambda sid, namespace=None: [sid, "watch:spectators"]
+
+    def setup(number):
+        return [(f"spectator-{i}",) for i in range(number)]
+
+    return setup, namespace.on_unwatch
+
+
+@case("MainNamespace.on_disconnect")
+def bench_on_disconnect(size):
+    namespace = make_namespace()
+
+    def setup(number):
+        return [
+            (sid,) for i in range(number) for sid in login_room(namespace, f"r{i}", 1)
+        ]
+
+    return setup, namespace.on_disconnect
+
+
+def measure(factory, size, min_time: float = 0.05, repeat: int = 7) -> float:
+    """Return the best time per call of a case, in seconds."""
+    number, best = 1, None
+    while True:
+        times = []
+        for _ in range(repeat if best is not None else 1):
+            if size is None:
+                clear()
+            setup, fn = factory(size)
+            args = setup(number)
+
+            start = time.perf_counter()
+            for arg in args:
+                fn(*arg)
+            times.append(time.perf_counter() - start)
+
+        if best is not None:
+            return min(times) / number
+
+        if times[0] >= min_time or number >= 100_000:
+            best = times[0]
+        else:
+            number = max(number * 2, int(number * min_time / max(times[0], 1e-6)))
+            number = min(number, 100_000)
+
+
+def run(filter: str = None, names: list = None, rounds: int = 1) -> dict:
+    """Run the cases, or only `names`, and return their time per call.
+
+    With several `rounds`, the whole suite runs once per round and each case
+    keeps its median time, so a slow spell of the machine does not skew it.
+
+    """
+    times = {}
+    # Sized cases are grouped by size, so each population is built once.
+    cases = sorted(CASES.items(), key=lambda item: item[1][1] or 0)
+    for _ in range(rounds):
+        for name, (factory, size) in cases:
+            if (filter and filter not in name) or (names and name not in names):
+                continue
+            times.setdefault(name, []).append(measure(factory, size))
+            print(f"{name:<40} {times[name][-1] * 1e6:>10.2f} us", file=sys.stderr)
+        clear()
+    return {name: statistics.median(values) for name, values in times.items()}
+
+
+def regressed(current: float, baseline: float, threshold: float, min_delta: float):
+    """Whether `current` is slower than `baseline` by both margins.
+
+    The absolute margin is at most the baseline time, so that sub-`min_delta`
+    cases still regress when they get several times slower.
+
+    """
+    delta = min(min_delta, baseline)
+    return current > baseline * (1 + threshold) and current - baseline > delta
+
+
+def save(results: dict, path: str, merge: bool = False):
+    """Store `results` as the baseline, over the saved one if `merge` is set."""
+    baseline = {}
+    if merge and os.path.exists(path):
+        with open(path) as file:
+            baseline = json.load(file)
+    baseline.update(results)
+
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    threshold: float,
+    min_delta: float = 1e-6,
+    retries: int = 3,
+):
+    """Return the (name, baseline, current, ratio) of the regressed cases.
+
+    Regressed cases are measured again up to `retries` times, keeping their
+    best time, so a noisy neighbour alone does not fail the comparison.
+
+    """
+    for _ in range(retries):
+        slower = [
+            name
+            for name, current in results.items()
+            if name in baseline
+            and regressed(current, baseline[name], threshold, min_delta)
+        ]
+        if not slower:
+            break
+        for name, current in run(names=slower).items():
+            results[name] = min(results[name], current)
+
+    print(f"{'case (us)':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:<40} {'-':>10} {current * 1e6:>10.2f}")
+            continue
+
+        ratio = current / baseline[name]
+        slower = regressed(current, baseline[name], threshold, min_delta)
+        flag = " REGRESSION" if slower else ""
+        print(
+            f"{name:<40} {baseline[name] * 1e6:>10.2f} {current * 1e6:>10.2f}"
+            f" {ratio:>6.2f}x{flag}"
+        )
+        if flag:
+            regressions.append((name, baseline[name], current, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("run", "compare"))
+    parser.add_argument("--filter")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=1.0)
+    parser.add_argument("--rounds", type=int)
+    args = parser.parse_args()
+
+    rounds = args.rounds or (3 if args.save else 1)
+    results = run(args.filter, rounds=rounds)
+
+    if args.command == "run":
+        if args.save:
+            save(results, args.baseline, merge=bool(args.filter))
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta * 1e-6)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
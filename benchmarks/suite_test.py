@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.suite import compare, regressed, save
+
+
+def test_regressed():
+    # 25% and 1 us slower.
+    assert regressed(10e-6, 5e-6, 0.25, 1e-6)
+    assert not regressed(6e-6, 5e-6, 0.25, 1e-6)
+    assert not regressed(120e-6, 100e-6, 0.25, 1e-6)
+    # Cases faster than the min delta regress once twice slower.
+    assert regressed(0.56e-6, 0.14e-6, 0.25, 1e-6)
+    assert not regressed(0.25e-6, 0.14e-6, 0.25, 1e-6)
+
+
+def test_compare():
+    baseline = {"fast": 0.2e-6, "slow": 10e-6, "same": 5e-6}
+    results = {"fast": 0.8e-6, "slow": 12e-6, "same": 5e-6, "new": 1e-6}
+
+    assert compare(results, baseline, 0.25, 1e-6) == [("fast", 0.2e-6, 0.8e-6, 4.0)]
+    assert compare(results, baseline, 0.05, 1e-6) == [
+        ("fast", 0.2e-6, 0.8e-6, 4.0),
+        ("slow", 10e-6, 12e-6, 1.2),
+    ]
+
+
+def test_save(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    save({"a": 1.0, "b": 2.0}, path)
+    save({"b": 3.0}, path, merge=True)
+
+    with open(path) as file:
+        assert json.load(file) == {"a": 1.0, "b": 3.0}
+
+    save({"c": 4.0}, path)
+    with open(path) as file:
+        assert json.load(file) == {"c": 4.0}
@@ -0,0 +1,19 @@
+from pytest import mark
+
+from benchmarks.allocations import EVENTS, load_budgets, measure, over_budget
+
+BUDGETS = load_budgets()
+
+
+@mark.parametrize("event", EVENTS)
+def test_allocations_within_budget(event: str):
+    results = {event: measure(event)}
+
+    assert not over_budget(results, {event: BUDGETS[event]})
+
+
+def test_lifecycle_retains_no_model():
+    results = measure("lifecycle", 10)
+
+    assert results["retained"] == {"rooms": 0, "players": 0, "open_rooms": 0}
+    assert results["objects"] < 1
@@ -0,0 +1,65 @@
+"""Asyncio entry point, an alternative to the eventlet `timebomb.main`.
+
+Usage:
+    uvicorn timebomb.asgi:app
+
+"""
+
+import socketio
+from timebomb import metrics, protocol
+from timebomb.async_socket_app import AsyncMainNamespace
+from timebomb.batching import Ticker
+from timebomb.config import load_config
+from timebomb.outbound import Outbound
+from timebomb.room.reaper import start_reaper
+from timebomb.room.turns import start_turn_timers
+from timebomb.timers import TimingWheel
+
+
+async def on_startup():
+    if config.journal:
+        import timebomb.room.service as room_service
+        from timebomb.room.journal import open_journal
+
+        journal = open_journal(config.journal)
+        sio.start_background_task(
+            journal.run_snapshots_async,
+            room_service.ROOMS,
+            config.snapshot_interval,
+            sio.sleep,
+        )
+
+    wheel = TimingWheel()
+    start_reaper(
+        wheel,
+        ended_ttl=config.ended_ttl,
+        idle_ttl=config.idle_ttl,
+        close=lambda room, reason: sio.start_background_task(
+            namespace.close, room, reason
+        ),
+    )
+    if config.turn_timeout:
+        start_turn_timers(
+            wheel,
+            config.turn_timeout,
+            cut=lambda room_id, version: sio.start_background_task(
+                namespace.auto_cut, room_id, version
+            ),
+        )
+    sio.start_background_task(wheel.run_async, sio.sleep)
+
+    if config.emit_tick:
+        namespace.ticker = Ticker(config.emit_tick / 1000)
+        sio.start_background_task(namespace.ticker.run_async, namespace.tick, sio.sleep)
+
+
+config = load_config()
+
+outbound = None
+if config.max_pending:
+    outbound = Outbound(config.max_pending, config.pending_grace)
+
+sio = protocol.AsyncServer(async_mode="asgi", outbound=outbound)
+namespace = AsyncMainNamespace("/")
+sio.register_namespace(namespace)
+app = socketio.ASGIApp(sio, other_asgi_app=metrics.asgi_app, on_startup=on_startup)
@@ -0,0 +1,227 @@
+import time
+
+import socketio
+
+from timebomb import handlers
+from timebomb.batching import TICKED, dedup
+from timebomb.handlers import Outbox, audience, spectators
+from timebomb.metrics import METRICS
+from timebomb.player.async_service import AsyncPlayerService
+
+from timebomb.room.async_service import AsyncRoomService
+from timebomb.room.service import RoomService
+from timebomb.room.serializer import dump_room
+
+
+class AsyncMainNamespace(socketio.AsyncNamespace):
+    """Asyncio variant of `MainNamespace`, for `socketio.AsyncServer`.
+
+    Handlers await the stores through `AsyncRoomService` and
+    `AsyncPlayerService`. Room changes run in a transaction function which
+    fills an `Outbox`, and events are emitted after the transaction, so
+    emitting never holds a room lock.
+
+    """
+
+    ticker = None
+
+    async def trigger_event(self, event: str, *args):
+        if not METRICS.enabled or not hasattr(self, f"on_{event}"):
+            return await super().trigger_event(event, *args)
+
+        start = time.perf_counter()
+        try:
+            res = await super().trigger_event(event, *args)
+        except Exception as error:
+            METRICS.exception(event, time.perf_counter() - start, error)
+            raise
+
+        METRICS.handler(event, time.perf_counter() - start, res)
+        return res
+
+    async def emit(self, event: str, data=None, **kwargs):
+        if not METRICS.enabled:
+            return await super().emit(event, data, **kwargs)
+
+        start = time.perf_counter()
+        res = await super().emit(event, data, **kwargs)
+        METRICS.emit(event, time.perf_counter() - start, data)
+        return res
+
+    async def send(self, outbox: Outbox):
+        for event, data, to in dedup(outbox):
+            if self.ticker and event in TICKED:
+                self.ticker.defer(data["id"])
+                continue
+            if self.ticker and event == "end":
+                self.ticker.discard(data["id"])
+            await self.emit(event, data, to=to)
+
+    async def tick(self):
+        """Send the rooms updated since the previous tick."""
+        for room_id in self.ticker.flush():
+            room = await AsyncRoomService.get_by_id(room_id)
+            if room:
+                await self.emit("room", dump_room(room), to=audience(room))
+
+    async def close(self, room, reason: str):
+        """Tell the clients of a deleted room and close its Socket.IO rooms."""
+        await self.emit("notify", handlers.closed_message(reason), to=audience(room))
+        await self.close_room(room.id)
+        await self.close_room(spectators(room.id))
+
+    async def auto_cut(self, room_id: str, version: int) -> dict:
+        """Cut a random card for a cutter who let their turn time out."""
+        room = await AsyncRoomService.get_by_id(room_id)
+        turn = handlers.auto_cut_target(room, version)
+        if not turn:
+            return
+
+        cutter, target = turn
+        METRICS.inc("timebomb_auto_cuts_total", ())
+        message = f"{cutter.name} ran out of time."
+        await self.emit("notify", {"message": message}, to=audience(room))
+        return await self.on_cut(cutter.id, {"target": target.id})
+
+    async def on_login(self, sid: str, data: dict) -> dict:
+        error = handlers.check_login(await AsyncPlayerService.get_by_id(sid), data)
+        if error:
+            return error
+
+        player = await AsyncPlayerService.create(handlers.new_player(sid, data))
+
+        room_name = data.get("roomname")
+        if room_name:
+            room = await AsyncRoomService.get_by_name(room_name)
+            if not room:
+                room = await AsyncRoomService.create(room_name)
+            json = await self.join(sid, room.id, player)
+        else:
+            room = await AsyncRoomService.get_open_room()
+            json = await self.join(sid, room.id, player) if room else None
+            if not json:
+                # The open room was deleted or filled by another worker.
+                if room:
+                    RoomService.discard_open_room(room)
+                room = await AsyncRoomService.create_random()
+                json = await self.join(sid, room.id, player)
+
+        if not json:
+            await AsyncPlayerService.delete(player)
+        return handlers.logged_in(player, json)
+
+    async def join(self, sid: str, room_id: str, player) -> dict:
+        """Add a player to a room, None if it is gone or not open anymore."""
+        outbox = Outbox()
+        json = await AsyncRoomService.transaction(
+            room_id, lambda room: handlers.join(room, player, outbox)
+        )
+        if json:
+            await self.enter_room(sid, room_id)
+            await self.send(outbox)
+        return json
+
+    async def on_resume(self, sid: str, data: dict) -> dict:
+        player = await AsyncPlayerService.get_by_id(data.get("id"))
+        connected = player and self.server.manager.is_connected(
+            player.id, self.namespace
+        )
+        error = handlers.check_resume(
+            await AsyncPlayerService.get_by_id(sid), player, data, connected
+        )
+        if error:
+            return error
+
+        outbox = Outbox()
+        res = await AsyncRoomService.transaction(
+            player.room_id, lambda room: handlers.resume(room, player, sid, outbox)
+        )
+        if res["status"] == "SUCCESS":
+            await self.enter_room(sid, player.room_id)
+            await self.send(outbox)
+        return res
+
+    async def on_watch(self, sid: str, data: dict) -> dict:
+        error = handlers.check_watch(await AsyncPlayerService.get_by_id(sid), data)
+        if error:
+            return error
+
+        room_name = data.get("roomname")
+        room = await AsyncRoomService.get_by_name(room_name) if room_name else None
+        res = handlers.watch(room)
+        if room:
+            await self.enter_room(sid, spectators(room.id))
+        return res
+
+    async def on_unwatch(self, sid: str) -> dict:
+        for room_id in handlers.unwatch(self.rooms(sid)):
+            await self.leave_room(sid, room_id)
+
+        return {"status": "SUCCESS", "data": {"message": "Spectator left."}}
+
+    async def on_cut(self, sid: str, data: dict) -> dict:
+        target_player = await AsyncPlayerService.get_by_id(data.get("target"))
+        src_player = await AsyncPlayerService.get_by_id(sid)
+        error = handlers.check_cut(src_player, target_player)
+        if error:
+            return error
+
+        outbox = Outbox()
+        res = await AsyncRoomService.transaction(
+            target_player.room_id,
+            lambda room: handlers.cut(room, src_player, target_player, outbox),
+        )
+        await self.send(outbox)
+        return res
+
+    async def on_start(self, sid: str) -> dict:
+        player = await AsyncPlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
+
+        outbox = Outbox()
+        res = await AsyncRoomService.transaction(
+            player.room_id, lambda room: handlers.start(room, outbox)
+        )
+        await self.send(outbox)
+        return res
+
+    async def on_chat(self, sid: str, data: dict) -> dict:
+        player = await AsyncPlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
+
+        outbox = Outbox()
+        room = await AsyncRoomService.get_by_id(player.room_id)
+        res = handlers.chat(room, player, data, outbox)
+        await self.send(outbox)
+        return res
+
+    async def on_sync(self, sid: str) -> dict:
+        player = await AsyncPlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
+
+        return handlers.sync(await AsyncRoomService.get_by_id(player.room_id))
+
+    async def on_disconnect(self, sid: str) -> dict:
+        player = await AsyncPlayerService.get_by_id(sid)
+        if not player:
+            return handlers.disconnected()
+
+        outbox = Outbox()
+        deleted = []
+        leaving = await AsyncRoomService.transaction(
+            player.room_id,
+            lambda room: handlers.disconnect(room, player, outbox, deleted),
+        )
+        await self.send(outbox)
+        for r_player in leaving:
+            await self.leave_room(r_player.id, player.room_id)
+        for room in deleted:
+            await self.close(room, "empty")
+
+        return handlers.disconnected()
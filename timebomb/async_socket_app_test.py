@@ -0,0 +1,136 @@
+import multiprocessing
+import socket
+import time
+
+import socketio
+from pytest import fixture
+
+URL = "http://localhost:5002"
+
+
+def serve():
+    import uvicorn
+
+    uvicorn.run("timebomb.asgi:app", port=5002, log_level="error")
+
+
+@fixture(scope="module", autouse=True)
+def server():
+    process = multiprocessing.get_context("spawn").Process(target=serve, daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("localhost", 5002), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    yield
+    process.terminate()
+    process.join()
+
+
+def connect() -> socketio.Client:
+    client = socketio.Client()
+    client.connect(URL, namespaces=["/"])
+    return client
+
+
+def test_AsyncMainNamespace_login():
+    client = connect()
+
+    res = client.call("login", {})
+    assert res == {"status": "ERROR", "data": {"message": "Invalid username."}}
+
+    res = client.call("login", {"username": "player1", "roomname": "async_room"})
+    assert res["status"] == "SUCCESS"
+    room = res["data"]
+    assert room["name"] == "async_room" and room["status"] == "WAITING"
+    assert len(room["players"]) == 1 and room["players"][0]["name"] == "player1"
+
+    res = client.call("login", {"username": "player1"})
+    assert res["data"] == {"message": "Player already logged in."}
+
+    other = connect()
+    res = other.call("login", {"username": "player2", "roomname": "async_room"})
+    assert [player["name"] for player in res["data"]["players"]] == [
+        "player1",
+        "player2",
+    ]
+
+    res = client.call("sync")
+    assert res["status"] == "SUCCESS" and len(res["data"]["players"]) == 2
+
+    client.disconnect()
+    other.disconnect()
+
+
+def test_AsyncMainNamespace_game():
+    clients = [connect() for i in range(4)]
+    for i, client in enumerate(clients):
+        client.call("login", {"username": f"player{i}", "roomname": "async_game"})
+
+    deltas = []
+    clients[1].on("room_delta", deltas.append)
+
+    res = clients[0].call("start")
+    assert res["status"] == "SUCCESS"
+    assert res["data"]["cutter"]["id"] == clients[0].get_sid()
+
+    res = clients[3].call("cut", {"target": clients[0].get_sid()})
+    assert res["data"] == {"message": "Error while cutting."}
+
+    ended = []
+    clients[1].on("end", ended.append)
+    res = clients[0].call("cut", {"target": clients[1].get_sid()})
+    assert res["status"] == "SUCCESS"
+    clients[1].sleep(0.1)
+
+    if "winning_team" in res["data"]:
+        # The bomb was drawn on the first cut.
+        assert ended == [res["data"]]
+    else:
+        assert res["data"]["cutter"]["id"] == clients[1].get_sid()
+        assert deltas[-1] == res["data"]
+
+        res = clients[1].call("chat", {"message": "hello"})
+        assert res["data"] == {"player": "player1", "message": "hello"}
+
+        clients[0].disconnect()
+        clients[1].sleep(0.2)
+        assert ended and ended[0]["name"] == "async_game"
+
+        res = clients[1].call("sync")
+        assert res["data"] == {"message": "Player not logged in."}
+
+    for client in clients:
+        client.disconnect()
+
+
+def test_AsyncMainNamespace_watch():
+    clients = [connect() for i in range(4)]
+    for i, client in enumerate(clients):
+        client.call("login", {"username": f"player{i}", "roomname": "async_watch"})
+
+    spectator = connect()
+    received = []
+    for event in ("room", "player", "end", "notify"):
+        spectator.on(event, lambda data, event=event: received.append((event, data)))
+
+    res = spectator.call("watch", {"roomname": "async_watch"})
+    assert res["status"] == "SUCCESS" and len(res["data"]["players"]) == 4
+
+    clients[0].call("start")
+    for client in clients:
+        client.disconnect()
+    spectator.sleep(0.2)
+
+    events = [event for event, _ in received]
+    assert events[0] == "room" and "player" not in events
+    end = next(data for event, data in received if event == "end")
+    assert all(set(player) == {"name", "id"} for player in end["players"])
+    assert received[-1] == ("notify", {"message": "Room closed."})
+
+    spectator.disconnect()
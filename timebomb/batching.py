@@ -0,0 +1,89 @@
+"""Emit batches of the handlers and tick of the room updates.
+
+The emits of a handler are collected in a batch, as (event, data, to)
+tuples, and sent once it returns. `dedup` keeps the last of the `room` and
+`player` snapshots sent to the same recipients, so a player whose hand is
+dealt then updated in one cut gets a single `player` event.
+
+With a `Ticker`, the `room` and `room_delta` events of a room are not sent
+by the handlers: the room is marked, and a snapshot of its latest state is
+sent at the next tick, so a room is updated at most once per tick.
+
+"""
+
+import contextvars
+import time
+import traceback
+
+from timebomb.outbound import SNAPSHOTS
+
+BATCH = contextvars.ContextVar("batch", default=None)
+TICKED = ("room", "room_delta")
+
+
+def recipients(to) -> tuple:
+    return (to,) if isinstance(to, str) else tuple(to)
+
+
+def dedup(batch: list) -> list:
+    """Drop the snapshots followed by another one to the same recipients."""
+    if len(batch) < 2:
+        return batch
+
+    last = {}
+    for i, (event, _, to) in enumerate(batch):
+        if event in SNAPSHOTS:
+            last[(event, recipients(to))] = i
+
+    return [
+        item
+        for i, item in enumerate(batch)
+        if item[0] not in SNAPSHOTS or last[(item[0], recipients(item[2]))] == i
+    ]
+
+
+class Ticker:
+    """Rooms waiting for their update of the next tick.
+
+    Usage:
+        namespace.ticker = Ticker(0.05)
+        sio.start_background_task(namespace.ticker.run, namespace.tick, sio.sleep)
+
+    Attributes:
+        interval (float): Seconds between two ticks.
+        rooms (dict): Ids of the rooms to update, in order of first change.
+
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.rooms = {}
+
+    def defer(self, room_id: str):
+        self.rooms[room_id] = None
+
+    def discard(self, room_id: str):
+        self.rooms.pop(room_id, None)
+
+    def flush(self) -> list:
+        """Return the ids of the rooms to update, and forget them."""
+        rooms, self.rooms = list(self.rooms), {}
+        return rooms
+
+    def run(self, tick, sleep=time.sleep):
+        """Call `tick()` every `interval` seconds, forever."""
+        while True:
+            sleep(self.interval)
+            try:
+                tick()
+            except Exception:
+                traceback.print_exc()
+
+    async def run_async(self, tick, sleep):
+        """Await `tick()` every `interval` seconds, forever."""
+        while True:
+            await sleep(self.interval)
+            try:
+                await tick()
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,79 @@
+from timebomb.batching import Ticker, dedup
+from timebomb.room.service import ROOMS, RoomService
+from timebomb.socket_app import MainNamespace
+
+
+def play(namespace: MainNamespace, nb_players: int = 4) -> list:
+    RoomService.create("batch_room", seed=7)
+    sids = [f"sid_{i}" for i in range(nb_players)]
+    for sid in sids:
+        namespace.trigger_event(
+            "login", sid, {"username": sid, "roomname": "batch_room"}
+        )
+    namespace.trigger_event("start", sids[0])
+    return sids
+
+
+def test_dedup():
+    batch = [
+        ("player", {"id": "a", "hand": ["B"]}, "a"),
+        ("notify", {"message": "1"}, "a"),
+        ("player", {"id": "b"}, "b"),
+        ("notify", {"message": "2"}, "a"),
+        ("player", {"id": "a", "hand": []}, "a"),
+        ("room", {"id": "r"}, ["r", "r:spectators"]),
+    ]
+
+    assert dedup(batch) == batch[1:]
+    assert dedup(batch[:1]) == batch[:1]
+
+
+def test_MainNamespace_sends_one_player_event_per_cut(namespace: MainNamespace):
+    sids = play(namespace)
+    cutter = sids[0]
+    reshuffled = False
+
+    while True:
+        namespace.emitted.clear()
+        room = ROOMS.first("name", "batch_room")
+        target = next(p.id for p in room.players if p.id != cutter and sum(p.cards))
+        res = namespace.trigger_event("cut", cutter, {"target": target})
+        if "winning_team" in res["data"]:
+            break
+
+        players = [to for event, _, to in namespace.emitted if event == "player"]
+        assert len(players) == len(set(players))
+        assert namespace.emitted[-1][0] == "room_delta"
+        reshuffled = reshuffled or len(players) == len(sids)
+        cutter = target
+
+    assert reshuffled
+
+
+def test_MainNamespace_flushes_before_leaving_rooms(namespace: MainNamespace):
+    sids = play(namespace)
+    namespace.emitted.clear()
+
+    namespace.trigger_event("disconnect", sids[1])
+
+    events = [event for event, _, _ in namespace.emitted]
+    assert events[:3] == ["end", "end", "notify"]
+    assert events[3:7] == ["leave"] * 4
+
+
+def test_MainNamespace_ticks_room_updates(namespace: MainNamespace):
+    namespace.ticker = Ticker(0.05)
+    sids = play(namespace)
+    room = ROOMS.first("name", "batch_room")
+
+    assert not [event for event, _, _ in namespace.emitted if event == "room"]
+    assert list(namespace.ticker.rooms) == [room.id]
+
+    namespace.emitted.clear()
+    namespace.trigger_event("cut", sids[0], {"target": sids[1]})
+    namespace.tick()
+    namespace.tick()
+
+    assert [
+        (event, to) for event, _, to in namespace.emitted if event.startswith("room")
+    ] == [("room", [room.id, f"{room.id}:spectators"])]
@@ -0,0 +1,15 @@
+"""Sharded multi-process deployment.
+
+Each worker process owns the rooms whose id hashes to it on a consistent
+hashing ring and keeps them in memory. Players are routed to the owner of
+their room before connecting, so a room is only ever modified by one
+process, and Socket.IO emits are relayed between workers by a local
+message queue.
+
+"""
+
+from timebomb.cluster.broker import Broker, QueueManager
+from timebomb.cluster.ring import HashRing
+from timebomb.cluster.shard import Shard
+
+__all__ = ["Broker", "HashRing", "QueueManager", "Shard"]
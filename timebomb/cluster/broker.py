@@ -0,0 +1,132 @@
+import json
+import socket
+import socketserver
+import threading
+
+import socketio
+
+
+class Broker(socketserver.ThreadingTCPServer):
+    """Local message queue relaying every message to every connection.
+
+    Messages are newline-delimited JSON documents. The broker does not parse
+    them, it only fans each line out to all connected clients, including
+    the sender.
+
+    Usage:
+        broker = Broker(("localhost", 0))
+        broker.start()
+
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple = ("localhost", 0)):
+        super().__init__(address, BrokerHandler)
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def publish(self, line: bytes):
+        with self.lock:
+            clients = list(self.clients)
+
+        for client in clients:
+            try:
+                client.sendall(line)
+            except OSError:
+                with self.lock:
+                    self.clients.discard(client)
+
+
+class BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.clients.add(self.request)
+
+        try:
+            for line in self.rfile:
+                self.server.publish(line)
+        except OSError:
+            pass
+        finally:
+            with self.server.lock:
+                self.server.clients.discard(self.request)
+
+
+class QueueManager(socketio.PubSubManager):
+    """Socket.IO client manager backed by a local `Broker`.
+
+    Lets the worker processes of a cluster emit to clients connected to
+    any of them. Messages with a method unknown to Socket.IO are handed to
+    the `on_message` callback instead, so workers can share their own
+    state, like their load, over the same queue.
+
+    Attributes:
+        address (tuple): The broker address.
+        on_message (callable): Called with the other messages.
+
+    """
+
+    name = "queue"
+
+    def __init__(
+        self,
+        address: tuple,
+        channel: str = "socketio",
+        write_only: bool = False,
+        logger=None,
+        on_message=None,
+    ):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.address = tuple(address)
+        self.on_message = on_message
+
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict):
+        self._publish(message)
+
+    def _connect(self) -> socket.socket:
+        if self._socket is None:
+            self._socket = socket.create_connection(self.address)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self._socket
+
+    def _publish(self, data: dict):
+        line = json.dumps({"channel": self.channel, **data}).encode() + b"\n"
+        with self._lock:
+            self._connect().sendall(line)
+
+    def _listen(self):
+        with self._lock:
+            stream = self._connect().makefile("rb")
+
+        for line in stream:
+            message = json.loads(line)
+            if message.pop("channel", None) != self.channel:
+                continue
+
+            if message.get("method") in self.METHODS:
+                yield message
+            elif self.on_message:
+                self.on_message(message)
+
+    METHODS = (
+        "emit",
+        "callback",
+        "disconnect",
+        "enter_room",
+        "leave_room",
+        "close_room",
+    )
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from timebomb.cluster.broker import Broker, QueueManager
+
+
+def test_QueueManager():
+    broker = Broker()
+    broker.start()
+
+    received = []
+    loaded = threading.Event()
+
+    def on_message(message):
+        received.append(message)
+        loaded.set()
+
+    publisher = QueueManager(broker.server_address)
+    listener = QueueManager(broker.server_address, on_message=on_message)
+    messages = listener._listen()
+
+    publisher._connect()
+    listener._connect()
+    while len(broker.clients) < 2:
+        time.sleep(0.01)
+
+    try:
+        publisher.publish({"method": "load", "worker": "a", "players": 2})
+        publisher.publish({"method": "emit", "event": "room", "data": {}})
+
+        assert next(messages) == {"method": "emit", "event": "room", "data": {}}
+        assert loaded.wait(1)
+        assert received == [{"method": "load", "worker": "a", "players": 2}]
+
+        other = QueueManager(broker.server_address, channel="other")
+        other._connect()
+        while len(broker.clients) < 3:
+            time.sleep(0.01)
+        other.publish({"method": "emit", "event": "other", "data": {}})
+        publisher.publish({"method": "close_room", "room": "id"})
+        assert next(messages) == {"method": "close_room", "room": "id"}
+    finally:
+        broker.stop()
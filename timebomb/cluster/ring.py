@@ -0,0 +1,55 @@
+import bisect
+import hashlib
+
+
+def hash_key(key: str) -> int:
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    """Consistent hashing ring mapping keys to nodes.
+
+    Every node is placed at `replicas` points of the ring and a key belongs
+    to the node of the first point after its hash. Adding or removing a node
+    only moves the keys of that node.
+
+    Attributes:
+        replicas (int): Number of points per node.
+
+    """
+
+    def __init__(self, nodes: tuple = (), replicas: int = 100):
+        self.replicas = replicas
+        self._points = []
+        self._nodes = {}
+
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(set(self._nodes.values()))
+
+    def __iter__(self):
+        return iter(sorted(set(self._nodes.values())))
+
+    def add(self, node: str):
+        for replica in range(self.replicas):
+            point = hash_key(f"{node}#{replica}")
+            if point not in self._nodes:
+                bisect.insort(self._points, point)
+            self._nodes[point] = node
+
+    def remove(self, node: str):
+        for replica in range(self.replicas):
+            point = hash_key(f"{node}#{replica}")
+            if self._nodes.get(point) == node:
+                del self._nodes[point]
+                self._points.remove(point)
+
+    def node(self, key: str) -> str:
+        if not self._points:
+            return
+
+        index = bisect.bisect(self._points, hash_key(key)) % len(self._points)
+        return self._nodes[self._points[index]]
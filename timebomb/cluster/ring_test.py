@@ -0,0 +1,37 @@
+from collections import Counter
+
+from timebomb.cluster.ring import HashRing
+
+
+def test_HashRing_node():
+    ring = HashRing()
+    assert ring.node("key") is None
+
+    ring = HashRing(("a", "b", "c"))
+    assert len(ring) == 3 and list(ring) == ["a", "b", "c"]
+    assert ring.node("key") == ring.node("key")
+    assert ring.node("key") in ("a", "b", "c")
+
+
+def test_HashRing_balance():
+    ring = HashRing(("a", "b", "c", "d"))
+    counts = Counter(ring.node(f"{i:032X}") for i in range(10000))
+
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert all(1500 < count < 3500 for count in counts.values())
+
+
+def test_HashRing_stability():
+    keys = [f"room-{i}" for i in range(2000)]
+    ring = HashRing(("a", "b", "c"))
+    before = {key: ring.node(key) for key in keys}
+
+    ring.add("d")
+    after = {key: ring.node(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert len(moved) < len(keys) / 2
+
+    ring.remove("d")
+    assert len(ring) == 3
+    assert {key: ring.node(key) for key in keys} == before
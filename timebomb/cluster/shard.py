@@ -0,0 +1,53 @@
+from timebomb.cluster.ring import HashRing
+
+
+class Shard:
+    """A worker's view of the cluster.
+
+    Rooms are owned by the worker their id hashes to on the ring, and named
+    rooms are created by the worker their name hashes to, which then picks
+    an id it owns. Players must connect to the owner of their room: `route`
+    gives the worker to connect to before logging in.
+
+    Attributes:
+        url (str): The url of this worker.
+        ring (HashRing): The workers ring.
+        loads (dict): Last reported number of players per worker.
+
+    """
+
+    def __init__(self, url: str, workers: tuple, replicas: int = 100):
+        self.url = url
+        self.ring = HashRing(workers, replicas)
+        self.loads = {worker: 0 for worker in workers}
+
+    def owner(self, key: str) -> str:
+        return self.ring.node(key)
+
+    def owns(self, key: str) -> bool:
+        return self.ring.node(key) == self.url
+
+    def least_loaded(self) -> str:
+        return min(self.loads, key=lambda worker: (self.loads[worker], worker))
+
+    def route(self, roomname: str = None, room_id: str = None) -> str:
+        """Return the worker to connect to.
+
+        Args:
+            roomname (str): The room to join by name.
+            room_id (str): The room to join by id, takes precedence.
+
+        Returns:
+            str: The owner of the room, or the least loaded worker to join
+                any open room if no room is given.
+
+        """
+        if room_id:
+            return self.owner(room_id)
+        if roomname:
+            return self.owner(roomname)
+        return self.least_loaded()
+
+    def on_message(self, message: dict):
+        if message.get("method") == "load" and message.get("worker") in self.loads:
+            self.loads[message["worker"]] = message["players"]
@@ -0,0 +1,39 @@
+from timebomb.cluster.shard import Shard
+import timebomb.room.service as room_service
+from timebomb.room.service import RoomService
+
+WORKERS = ("http://localhost:5001", "http://localhost:5002")
+
+
+def test_Shard_route():
+    shard = Shard(WORKERS[0], WORKERS)
+
+    assert shard.route(roomname="room") == shard.owner("room")
+    assert shard.route(roomname="room", room_id="ID") == shard.owner("ID")
+    assert shard.owns("room") == (shard.owner("room") == WORKERS[0])
+
+    shard.on_message({"method": "load", "worker": WORKERS[0], "players": 3})
+    shard.on_message({"method": "load", "worker": "unknown", "players": 0})
+    assert shard.loads == {WORKERS[0]: 3, WORKERS[1]: 0}
+    assert shard.route() == WORKERS[1]
+
+
+def test_RoomService_create_sharded(monkeypatch):
+    shard = Shard(WORKERS[1], WORKERS)
+    monkeypatch.setattr(room_service, "SHARD", shard)
+
+    for _ in range(20):
+        room = RoomService.create("sharded")
+        assert shard.owns(room.id)
+        RoomService.delete(room)
+
+
+def test_RoomService_create_random_sharded(monkeypatch):
+    shard = Shard(WORKERS[1], WORKERS)
+    monkeypatch.setattr(room_service, "SHARD", shard)
+
+    for _ in range(20):
+        room = RoomService.create_random()
+        assert shard.owns(room.name) and shard.owns(room.id)
+        assert shard.route(roomname=room.name) == WORKERS[1]
+        RoomService.delete(room)
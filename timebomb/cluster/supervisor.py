@@ -0,0 +1,100 @@
+"""Run a sharded cluster of workers on one machine.
+
+Starts a `Broker` and one worker process per port. Clients ask any worker
+`GET /route?roomname=NAME` for the worker owning their room, or without
+room name for the least loaded worker, then connect there.
+
+Usage:
+    python -m timebomb.cluster.supervisor [--workers N] [--host HOST]
+        [--port PORT]
+
+"""
+
+import argparse
+import multiprocessing
+import socket
+import time
+
+from timebomb.cluster.broker import Broker
+from timebomb.cluster.worker import run_worker
+
+
+class Cluster:
+    """Broker and worker processes listening on consecutive ports.
+
+    Usage:
+        with Cluster(4, port=5100) as cluster:
+            cluster.urls
+
+    """
+
+    def __init__(self, nb_workers: int, host: str = "localhost", port: int = 5000):
+        self.urls = tuple(f"http://{host}:{port + i}" for i in range(nb_workers))
+        self.broker = None
+        self.processes = []
+
+    def __enter__(self) -> "Cluster":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, timeout: float = 10):
+        self.broker = Broker()
+        self.broker.start()
+
+        context = multiprocessing.get_context("spawn")
+        for url in self.urls:
+            process = context.Process(
+                target=run_worker,
+                args=(url, self.urls, self.broker.server_address),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        for url in self.urls:
+            host, port = url.rsplit("/", 1)[-1].rsplit(":", 1)
+            while True:
+                try:
+                    socket.create_connection((host, int(port)), timeout=1).close()
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        self.stop()
+                        raise RuntimeError(f"Worker {url} did not start.")
+                    time.sleep(0.05)
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        self.processes = []
+
+        if self.broker:
+            self.broker.stop()
+            self.broker = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    with Cluster(args.workers, args.host, args.port) as cluster:
+        for url in cluster.urls:
+            print(f"worker {url}")
+        try:
+            for process in cluster.processes:
+                process.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import requests
+import socketio
+
+from timebomb.cluster.shard import Shard
+from timebomb.cluster.supervisor import Cluster
+
+
+def test_Cluster():
+    with Cluster(2, port=5300) as cluster:
+        shard = Shard(None, cluster.urls)
+        url = requests.get(f"{cluster.urls[0]}/route?roomname=room").json()["url"]
+        assert url == shard.owner("room")
+
+        other = next(worker for worker in cluster.urls if worker != url)
+        client = socketio.Client()
+        client.connect(other, transports=["websocket"])
+        res = client.call("login", {"username": "player1", "roomname": "room"})
+        assert res["status"] == "ERROR"
+        assert res["data"] == {"message": "Room served by another worker.", "url": url}
+        client.disconnect()
+
+        client = socketio.Client()
+        client.connect(url, transports=["websocket"])
+        res = client.call("login", {"username": "player1", "roomname": "room"})
+        assert res["status"] == "SUCCESS"
+        assert shard.owner(res["data"]["id"]) == url
+        client.disconnect()
@@ -0,0 +1,87 @@
+import json
+from urllib.parse import parse_qs
+
+import socketio
+
+import timebomb.room.service as room_service
+from timebomb import metrics, protocol
+from timebomb.cluster.broker import QueueManager
+from timebomb.cluster.shard import Shard
+from timebomb.config import load_config
+from timebomb.player.service import PLAYERS
+from timebomb.room.reaper import start_reaper
+from timebomb.socket_app import MainNamespace
+from timebomb.timers import TimingWheel
+
+
+def route_app(shard: Shard):
+    """WSGI app answering `GET /route?roomname=...&room=...` with a worker url.
+
+    Other paths are served by `metrics.wsgi_app`.
+
+    """
+
+    def app(environ: dict, start_response):
+        if environ.get("PATH_INFO") != "/route":
+            return metrics.wsgi_app(environ, start_response)
+
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        url = shard.route(
+            roomname=query.get("roomname", [None])[0],
+            room_id=query.get("room", [None])[0],
+        )
+
+        body = json.dumps({"url": url}).encode()
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [body]
+
+    return app
+
+
+def report_load(sio: socketio.Server, shard: Shard, interval: float):
+    while True:
+        sio.sleep(interval)
+        sio.manager.publish(
+            {"method": "load", "worker": shard.url, "players": len(PLAYERS)}
+        )
+
+
+def create_app(shard: Shard, broker_address: tuple, interval: float = 1.0):
+    """Create the WSGI app of a worker.
+
+    Rooms created by this worker get ids it owns, emits go through the
+    broker so they reach clients connected to any worker, and the number
+    of players is published every `interval` seconds for routing. Finished
+    and idle rooms are reaped like in `timebomb.main`.
+
+    """
+    room_service.SHARD = shard
+    config = load_config()
+
+    manager = QueueManager(broker_address, on_message=shard.on_message)
+    sio = protocol.Server(async_mode="eventlet", client_manager=manager)
+    namespace = MainNamespace("/")
+    sio.register_namespace(namespace)
+    sio.start_background_task(report_load, sio, shard, interval)
+
+    wheel = TimingWheel()
+    start_reaper(
+        wheel,
+        ended_ttl=config.ended_ttl,
+        idle_ttl=config.idle_ttl,
+        close=namespace.close,
+    )
+    sio.start_background_task(wheel.run, sio.sleep)
+
+    return socketio.WSGIApp(sio, wsgi_app=route_app(shard))
+
+
+def run_worker(url: str, workers: tuple, broker_address: tuple):
+    import eventlet
+    import eventlet.wsgi
+
+    eventlet.monkey_patch()
+
+    host, port = url.rsplit("/", 1)[-1].rsplit(":", 1)
+    app = create_app(Shard(url, workers), broker_address)
+    eventlet.wsgi.server(eventlet.listen((host, int(port))), app, log_output=False)
@@ -0,0 +1,43 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Config:
+    """Server settings, read from the `TIMEBOMB_*` environment variables.
+
+    `TIMEBOMB_STORE` is read by the stores themselves, when the services
+    are imported. See the README for the meaning of each setting.
+
+    """
+
+    admin_token: str = None
+    journal: str = None
+    snapshot_interval: float = 60
+    ended_ttl: float = 60
+    idle_ttl: float = 1800
+    turn_timeout: float = 0
+    max_pending: int = 64
+    pending_grace: float = 5
+    emit_tick: float = 0
+
+
+def load_config(environ: dict = os.environ) -> Config:
+    """Parse the settings of `environ`, the defaults for the missing ones."""
+    defaults = Config()
+
+    def get(name: str, cast=str):
+        value = environ.get(f"TIMEBOMB_{name.upper()}")
+        return getattr(defaults, name) if value in (None, "") else cast(value)
+
+    return Config(
+        admin_token=get("admin_token"),
+        journal=get("journal"),
+        snapshot_interval=get("snapshot_interval", float),
+        ended_ttl=get("ended_ttl", float),
+        idle_ttl=get("idle_ttl", float),
+        turn_timeout=get("turn_timeout", float),
+        max_pending=get("max_pending", int),
+        pending_grace=get("pending_grace", float),
+        emit_tick=get("emit_tick", float),
+    )
@@ -0,0 +1,25 @@
+from timebomb.config import Config, load_config
+
+
+def test_load_config_defaults():
+    assert load_config({}) == Config()
+    assert load_config({"TIMEBOMB_JOURNAL": ""}).journal is None
+
+
+def test_load_config():
+    config = load_config(
+        {
+            "TIMEBOMB_JOURNAL": "/var/lib/timebomb",
+            "TIMEBOMB_TURN_TIMEOUT": "30",
+            "TIMEBOMB_MAX_PENDING": "16",
+            "TIMEBOMB_EMIT_TICK": "50",
+        }
+    )
+
+    assert config.journal == "/var/lib/timebomb"
+    assert config.turn_timeout == 30.0 and config.max_pending == 16
+    assert config.emit_tick == 50.0 and config.idle_ttl == Config.idle_ttl
+
+
+def test_load_config_turn_timeout_off():
+    assert load_config({}).turn_timeout == 0
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from pytest import fixture
+
+from timebomb.player.service import PLAYERS
+from timebomb.room.service import OPEN_ROOMS, ROOMS
+from timebomb.socket_app import MainNamespace
+
+
+class Clock:
+    """A clock for the timing wheels, which only moves when `now` is set."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@fixture
+def clock() -> Clock:
+    return Clock()
+
+
+def clear():
+    ROOMS.clear()
+    PLAYERS.clear()
+    OPEN_ROOMS.clear()
+
+
+@fixture
+def models():
+    """Empty the rooms, players and open rooms after the test.
+
+    Yields the function emptying them, for tests which start over.
+
+    """
+    yield clear
+    clear()
+
+
+@fixture
+def namespace(models) -> MainNamespace:
+    """A `MainNamespace` whose server records what it sends in `emitted`.
+
+    Emits are recorded as (event, data, to), and rooms left as
+    ("leave", room, sid).
+
+    """
+    emitted = []
+    namespace = MainNamespace("/")
+    namespace.server = SimpleNamespace(
+        emit=lambda event, data=None, to=None, **kwargs: emitted.append(
+            (event, data, to)
+        ),
+        enter_room=lambda *args, **kwargs: None,
+        leave_room=lambda sid, room, **kwargs: emitted.append(("leave", room, sid)),
+        close_room=lambda *args, **kwargs: None,
+    )
+    namespace.emitted = emitted
+    return namespace
@@ -0,0 +1,297 @@
+"""Logic of the socket events, shared by `MainNamespace` and `AsyncMainNamespace`.
+
+The checks take the players and rooms the namespace read from its stores,
+and return the error response of the event, or None. The room changes run
+inside the transaction of the room: they add the events to emit to an
+`Outbox` and return the response. Namespaces only read the stores, run the
+transactions and send the outbox, the eventlet one through its batch and
+the asyncio one once the transaction is over.
+
+"""
+
+import random
+import secrets
+
+import timebomb.room.service as room_service
+from timebomb.player.serializer import dump_player
+from timebomb.player.service import PlayerService
+from timebomb.room.model import Room
+from timebomb.room.serializer import (
+    dump_room,
+    dump_ended_room,
+    dump_public_ended_room,
+    dump_room_delta,
+)
+from timebomb.room.service import RoomService
+
+
+def spectators(room_id: str) -> str:
+    """Return the Socket.IO room of the spectators of a room."""
+    return f"{room_id}:spectators"
+
+
+def audience(room: Room) -> list:
+    """Return the Socket.IO rooms of the players and the spectators of a room.
+
+    Emitting to both rooms at once encodes the packet a single time for all
+    the recipients.
+
+    """
+    return [room.id, spectators(room.id)]
+
+
+class Outbox(list):
+    """Events to emit once a transaction is over, as (event, data, to) tuples.
+
+    Payloads are serialized when they are added, so they describe the room
+    as it was inside the transaction.
+
+    """
+
+    def room(self, room):
+        json = dump_room(room)
+        self.append(("room", json, audience(room)))
+        return json
+
+    def room_delta(self, room, cards=(), previous_status=None):
+        json = dump_room_delta(room, cards, previous_status)
+        self.append(("room_delta", json, audience(room)))
+        return json
+
+    def player(self, player):
+        json = dump_player(player)
+        self.append(("player", json, player.id))
+        return json
+
+    def end(self, room):
+        json = dump_ended_room(room)
+        self.append(("end", json, room.id))
+        self.append(("end", dump_public_ended_room(room), spectators(room.id)))
+        return json
+
+    def chat(self, room, data):
+        self.append(("chat", data, audience(room)))
+        return data
+
+    def notify(self, to, data):
+        """Notify a player, or the players and spectators of a room."""
+        self.append(("notify", data, audience(to) if isinstance(to, Room) else to.id))
+        return data
+
+
+def error(message: str) -> dict:
+    return {"status": "ERROR", "data": {"message": message}}
+
+
+def check_shard(room_name: str) -> dict:
+    """Redirect to the worker serving `room_name`, when it is not this one."""
+    shard = room_service.SHARD
+    if room_name and shard and not shard.owns(room_name):
+        return {
+            "status": "ERROR",
+            "data": {
+                "message": "Room served by another worker.",
+                "url": shard.owner(room_name),
+            },
+        }
+
+
+def check_login(player, data: dict) -> dict:
+    if player:
+        return error("Player already logged in.")
+
+    if not data.get("username"):
+        return error("Invalid username.")
+
+    return check_shard(data.get("roomname"))
+
+
+def new_player(sid: str, data: dict) -> dict:
+    """Return the attributes of the player logging in with `data`."""
+    return {"name": data["username"][:11], "id": sid}
+
+
+def logged_in(player, json: dict) -> dict:
+    if not json:
+        return error("Impossible to join this room.")
+
+    # The ack only reaches this client: the token is its proof to resume.
+    return {"status": "SUCCESS", "data": json, "token": player.token}
+
+
+def join(room, player, outbox: Outbox) -> dict:
+    """Add a player to a room, None if it is gone or not open anymore."""
+    if not room or not RoomService.add_player(room, player):
+        return
+    return outbox.room(room)
+
+
+def check_resume(logged, player, data: dict, connected: bool) -> dict:
+    """Check the resume token of `player`, `connected` if its id still is."""
+    if logged:
+        return error("Player already logged in.")
+
+    token = data.get("token")
+    if (
+        not player
+        or not isinstance(token, str)
+        or not secrets.compare_digest(player.token.encode(), token.encode())
+        or connected
+    ):
+        return error("Invalid player id or token.")
+
+
+def resume(room, player, sid: str, outbox: Outbox) -> dict:
+    if not room or not RoomService.rename_player(room, player, sid):
+        return error("Invalid room.")
+
+    outbox.player(room.get_player(sid))
+    json = outbox.room(room)
+    return {"status": "SUCCESS", "data": json}
+
+
+def check_watch(logged, data: dict) -> dict:
+    if logged:
+        return error("Player already logged in.")
+
+    return check_shard(data.get("roomname"))
+
+
+def watch(room) -> dict:
+    if not room:
+        return error("Invalid room.")
+
+    return {"status": "SUCCESS", "data": dump_room(room)}
+
+
+def unwatch(rooms) -> list:
+    """Return the Socket.IO rooms to leave among `rooms`, those spectated."""
+    return [room_id for room_id in rooms if room_id.endswith(":spectators")]
+
+
+def check_cut(src_player, target_player) -> dict:
+    if not target_player:
+        return error("Invalid target id.")
+
+    if not src_player:
+        return error("Player not logged in.")
+
+    if src_player.room_id != target_player.room_id:
+        return error("Can not cut player from other room.")
+
+
+def cut(room, src_player, target_player, outbox: Outbox) -> dict:
+    if not room:
+        return error("Invalid room.")
+
+    previous_status = room.status
+    card = RoomService.cut_card(room, src_player, target_player)
+    if not card:
+        return error("Error while cutting.")
+
+    if room.status == "ENDED":
+        json = outbox.end(room)
+        return {"status": "SUCCESS", "data": json}
+
+    res = RoomService.distribute_cards(room)
+    if res:
+        for player in room.players:
+            outbox.player(player)
+
+    target = room.get_player(target_player.id)
+    outbox.notify(target, {"message": "Your turn to cut a card!"})
+    outbox.player(target)
+    json = outbox.room_delta(room, (card,), previous_status)
+    return {"status": "SUCCESS", "data": json}
+
+
+def auto_cut_target(room, version: int):
+    """Return the cutter of a timed out turn and a random target, or None."""
+    if not room or room.status != "PLAYING" or room.version != version:
+        return
+
+    cutter = room.cutter
+    targets = [p for p in room.players if p is not cutter and sum(p.cards)]
+    if not cutter or not targets:
+        return
+
+    return cutter, random.choice(targets)
+
+
+def check_player(player) -> dict:
+    if not player:
+        return error("Player not logged in.")
+
+
+def start(room, outbox: Outbox) -> dict:
+    if not room:
+        return error("Invalid room.")
+
+    if not RoomService.start(room):
+        return error("Can not start game in this room.")
+
+    for player in room.players:
+        outbox.player(player)
+
+    json = outbox.room(room)
+    return {"status": "SUCCESS", "data": json}
+
+
+def chat(room, player, data: dict, outbox: Outbox) -> dict:
+    if not room:
+        return error("Invalid room.")
+
+    message = data.get("message", "").strip()
+    if not message:
+        return error("Invalid data.")
+
+    json = outbox.chat(room, {"player": player.name, "message": message})
+    return {"status": "SUCCESS", "data": json}
+
+
+def sync(room) -> dict:
+    if not room:
+        return error("Invalid room.")
+
+    return {"status": "SUCCESS", "data": dump_room(room)}
+
+
+def disconnect(room, player, outbox: Outbox, deleted: list) -> list:
+    """Remove a player, and return the players who left the room with them.
+
+    A game in progress ends for every player. A deleted room is appended to
+    `deleted`.
+
+    """
+    if not room:
+        PlayerService.delete(player)
+        return []
+
+    if room.status == "PLAYING":
+        outbox.end(room)
+        outbox.notify(room, {"message": f"{player.name} has left the game."})
+        leaving = list(room.players)
+        for r_player in leaving:
+            RoomService.remove_player(room, r_player)
+            PlayerService.delete(r_player)
+        RoomService.delete(room)
+        deleted.append(room)
+        return leaving
+
+    RoomService.remove_player(room, player)
+    if not len(room.players):
+        RoomService.delete(room)
+        deleted.append(room)
+
+    PlayerService.delete(player)
+    return [player]
+
+
+def disconnected() -> dict:
+    return {"status": "SUCCESS", "data": {"message": "Player disconnect."}}
+
+
+def closed_message(reason: str) -> dict:
+    """Return the notification of a room deleted for `reason`."""
+    message = "Room closed for inactivity." if reason == "idle" else "Room closed."
+    return {"message": message}
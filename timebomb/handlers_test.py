@@ -0,0 +1,90 @@
+from timebomb import handlers
+from timebomb.handlers import Outbox
+from timebomb.player.model import Player
+from timebomb.player.service import PLAYERS
+from timebomb.room.service import RoomService
+
+
+def make_room(name: str, nb_players: int):
+    room = RoomService.create(name, seed=nb_players)
+    for i in range(nb_players):
+        player = Player(f"user_{i}", f"{name}_{i}")
+        PLAYERS.append(player)
+        handlers.join(room, player, Outbox())
+    return room
+
+
+def test_check_login():
+    assert handlers.check_login(Player("user", "id"), {"username": "user"}) == {
+        "status": "ERROR",
+        "data": {"message": "Player already logged in."},
+    }
+    assert handlers.check_login(None, {"username": ""})["data"] == {
+        "message": "Invalid username."
+    }
+    assert handlers.check_login(None, {"username": "user"}) is None
+
+
+def test_check_resume():
+    player = Player("user", "id")
+    data = {"id": "id", "token": player.token}
+
+    assert handlers.check_resume(None, player, data, False) is None
+    for logged, player_, data_, connected in [
+        (None, None, data, False),
+        (None, player, {"id": "id"}, False),
+        (None, player, {"id": "id", "token": ["list"]}, False),
+        (None, player, {"id": "id", "token": "é"}, False),
+        (None, player, data, True),
+    ]:
+        res = handlers.check_resume(logged, player_, data_, connected)
+        assert res["data"] == {"message": "Invalid player id or token."}
+
+
+def test_check_cut(models):
+    room = make_room("check_cut", 2)
+    other = make_room("check_cut_other", 1)
+
+    assert handlers.check_cut(room.players[0], room.players[1]) is None
+    assert handlers.check_cut(room.players[0], None)["data"] == {
+        "message": "Invalid target id."
+    }
+    assert handlers.check_cut(None, room.players[1])["data"] == {
+        "message": "Player not logged in."
+    }
+    assert handlers.check_cut(room.players[0], other.players[0])["data"] == {
+        "message": "Can not cut player from other room."
+    }
+
+
+def test_start_and_cut(models):
+    room = make_room("start_cut", 4)
+    outbox = Outbox()
+
+    res = handlers.start(room, outbox)
+    assert res["status"] == "SUCCESS" and room.status == "PLAYING"
+    assert [event for event, _, _ in outbox] == ["player"] * 4 + ["room"]
+
+    outbox = Outbox()
+    target = next(p for p in room.players if p is not room.cutter)
+    res = handlers.cut(room, room.cutter, target, outbox)
+    assert res["status"] == "SUCCESS"
+    assert ("notify", {"message": "Your turn to cut a card!"}, target.id) in outbox
+    assert handlers.start(room, Outbox())["data"] == {
+        "message": "Can not start game in this room."
+    }
+
+
+def test_disconnect(models):
+    room = make_room("disconnect", 2)
+    leaving, deleted = room.players[0], []
+
+    assert handlers.disconnect(room, leaving, Outbox(), deleted) == [leaving]
+    assert not deleted and len(room.players) == 1 and not PLAYERS.get(leaving.id)
+
+    RoomService.start(make_room("disconnect_playing", 4))
+    playing = RoomService.get_by_name("disconnect_playing")
+    outbox = Outbox()
+    leaving = handlers.disconnect(playing, playing.players[0], outbox, deleted)
+    assert len(leaving) == 4 and deleted == [playing]
+    assert [event for event, _, _ in outbox] == ["end", "end", "notify"]
@@ -1,7 +1,49 @@
 import socketio
+from timebomb import metrics, protocol
+from timebomb.batching import Ticker
+from timebomb.config import load_config
+from timebomb.outbound import Outbound
+from timebomb.profiling import admin_app
+from timebomb.room.reaper import start_reaper
+from timebomb.room.turns import start_turn_timers
 from timebomb.socket_app import MainNamespace
+from timebomb.timers import TimingWheel
 
+config = load_config()
 
-sio = socketio.Server(async_mode="eventlet")
-sio.register_namespace(MainNamespace("/"))
-app = socketio.WSGIApp(sio)
+wsgi_app = metrics.wsgi_app
+if config.admin_token:
+    wsgi_app = admin_app(config.admin_token, wsgi_app)
+
+outbound = None
+if config.max_pending:
+    outbound = Outbound(config.max_pending, config.pending_grace)
+
+sio = protocol.Server(async_mode="eventlet", outbound=outbound)
+namespace = MainNamespace("/")
+sio.register_namespace(namespace)
+app = socketio.WSGIApp(sio, wsgi_app=wsgi_app)
+
+if config.journal:
+    import timebomb.room.service as room_service
+    from timebomb.room.journal import open_journal
+
+    journal = open_journal(config.journal)
+    sio.start_background_task(
+        journal.run_snapshots, room_service.ROOMS, config.snapshot_interval, sio.sleep
+    )
+
+wheel = TimingWheel()
+start_reaper(
+    wheel,
+    ended_ttl=config.ended_ttl,
+    idle_ttl=config.idle_ttl,
+    close=namespace.close,
+)
+if config.turn_timeout:
+    start_turn_timers(wheel, config.turn_timeout, cut=namespace.auto_cut)
+sio.start_background_task(wheel.run, sio.sleep)
+
+if config.emit_tick:
+    namespace.ticker = Ticker(config.emit_tick / 1000)
+    sio.start_background_task(namespace.ticker.run, namespace.tick, sio.sleep)
@@ -0,0 +1,263 @@
+"""In-process metrics, exposed in the Prometheus text format.
+
+Handlers and emits record their latency in fixed-bucket histograms, their
+errors by message and their payload sizes. Recording is a bisect and a few
+increments; payload sizes need a JSON encoding, so only one call in
+`SAMPLE_EVERY` of each event is measured. Gauges are computed when the
+metrics are scraped.
+
+"""
+
+import bisect
+import json
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+SAMPLE_EVERY = 16
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one labelled series.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, +Inf excluded.
+        counts (list): Number of values per bucket, +Inf last.
+        count (int): Number of values.
+        sum (float): Sum of the values.
+
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """Registry of the histograms, counters and gauges of the process.
+
+    Series are keyed by metric name and label items, and the series of an
+    event are looked up once, so recording does not format anything: names
+    and labels are only rendered by `render`.
+
+    Attributes:
+        enabled (bool): Record nothing when False.
+
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.help = {}
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._events = {}
+
+    def describe(self, name: str, kind: str, help: str):
+        self.help[name] = (kind, help)
+
+    def histogram(self, name: str, labels: tuple, buckets: tuple) -> Histogram:
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram(buckets)
+        return histogram
+
+    def inc(self, name: str, labels: tuple, value: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, collect):
+        """Register `collect()`, returning the {labels: value} of a gauge."""
+        self.gauges[name] = collect
+
+    def series(self, kind: str, event: str) -> tuple:
+        """Return the latency and size histograms of a handler or an emit."""
+        series = self._events.get((kind, event))
+        if series is None:
+            labels = (("event", event),)
+            series = self._events[(kind, event)] = (
+                self.histogram(f"timebomb_{kind}_seconds", labels, LATENCY_BUCKETS),
+                self.histogram(f"timebomb_{kind}_payload_bytes", labels, SIZE_BUCKETS),
+            )
+        return series
+
+    def handler(self, event: str, seconds: float, res):
+        """Record a handler call and its acknowledgement `res`."""
+        latency, size = self.series("handler", event)
+        latency.observe(seconds)
+
+        if isinstance(res, dict) and res.get("status") == "ERROR":
+            labels = (("event", event), ("message", res["data"].get("message", "")))
+            self.inc("timebomb_handler_errors_total", labels)
+
+        if res is not None and (latency.count - 1) % SAMPLE_EVERY == 0:
+            size.observe(payload_size(res))
+
+    def exception(self, event: str, seconds: float, error: Exception):
+        """Record a handler call which raised `error`."""
+        self.series("handler", event)[0].observe(seconds)
+        labels = (("event", event), ("message", type(error).__name__))
+        self.inc("timebomb_handler_errors_total", labels)
+
+    def emit(self, event: str, seconds: float, data):
+        """Record an emit of `data`."""
+        latency, size = self.series("emit", event)
+        latency.observe(seconds)
+
+        if (latency.count - 1) % SAMPLE_EVERY == 0:
+            size.observe(payload_size(data))
+
+    def clear(self):
+        self.histograms.clear()
+        self.counters.clear()
+        self._events.clear()
+
+    def render(self) -> str:
+        lines = []
+        names = sorted(
+            {name for name, _ in self.histograms}
+            | {name for name, _ in self.counters}
+            | set(self.gauges)
+        )
+        for name in names:
+            kind, help = self.help.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            if name in self.gauges:
+                for labels, value in sorted(self.gauges[name]().items()):
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (series, labels), value in sorted(self.counters.items()):
+                if series == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (series, labels), histogram in sorted(self.histograms.items()):
+                if series != name:
+                    continue
+
+                cumulative = 0
+                bounds = histogram.buckets + ("+Inf",)
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    le = format_labels(labels + (("le", str(bound)),))
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def payload_size(data) -> int:
+    return len(json.dumps(data, separators=(",", ":")).encode())
+
+
+def escape(value) -> str:
+    value = str(value)
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+
+def collect_rooms() -> dict:
+    from timebomb.room.service import ROOMS
+
+    counts = {(("status", status),): 0 for status in STATUSES}
+    for room in ROOMS:
+        counts[(("status", room.status),)] += 1
+    return counts
+
+
+def collect_players() -> dict:
+    from timebomb.player.service import PLAYERS
+
+    return {(): len(PLAYERS)}
+
+
+def collect_open_rooms() -> dict:
+    from timebomb.room.service import OPEN_ROOMS
+
+    return {(): len(OPEN_ROOMS)}
+
+
+STATUSES = ("WAITING", "READY", "PLAYING", "ENDED")
+
+METRICS = Metrics()
+METRICS.describe("timebomb_handler_seconds", "histogram", "Handler latency.")
+METRICS.describe(
+    "timebomb_handler_errors_total", "counter", "Handler errors by message."
+)
+METRICS.describe(
+    "timebomb_handler_payload_bytes",
+    "histogram",
+    "Sampled JSON size of the acknowledgements.",
+)
+METRICS.describe("timebomb_emit_seconds", "histogram", "Emit latency.")
+METRICS.describe(
+    "timebomb_emit_payload_bytes", "histogram", "Sampled JSON size of the emits."
+)
+METRICS.describe("timebomb_rooms", "gauge", "Rooms by status.")
+METRICS.describe("timebomb_players", "gauge", "Players logged in.")
+METRICS.describe("timebomb_open_rooms", "gauge", "Rooms players can join.")
+METRICS.gauge("timebomb_rooms", collect_rooms)
+METRICS.gauge("timebomb_players", collect_players)
+METRICS.gauge("timebomb_open_rooms", collect_open_rooms)
+
+
+def wsgi_app(environ: dict, start_response):
+    """Serve `METRICS` on `/metrics`, 404 elsewhere."""
+    if environ.get("PATH_INFO") != "/metrics":
+        start_response("404 Not Found", [("Content-Type", "text/plain")])
+        return [b"Not Found"]
+
+    body = METRICS.render().encode()
+    start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4")])
+    return [body]
+
+
+async def asgi_app(scope: dict, receive, send):
+    """ASGI version of `wsgi_app`."""
+    if scope["type"] != "http":
+        return
+
+    if scope.get("path") == "/metrics":
+        status, body = 200, METRICS.render().encode()
+        content_type = b"text/plain; version=0.0.4"
+    else:
+        status, body, content_type = 404, b"Not Found", b"text/plain"
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type)],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,101 @@
+from pytest import fixture, raises
+
+from timebomb.metrics import METRICS, Histogram, format_labels, wsgi_app
+from timebomb.socket_app import MainNamespace
+
+
+@fixture(autouse=True)
+def clear(models):
+    METRICS.clear()
+    models()
+    yield
+    METRICS.enabled = True
+    METRICS.clear()
+
+
+def test_Histogram_observe():
+    histogram = Histogram((1, 2))
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == 6
+
+
+def test_format_labels():
+    assert format_labels(()) == ""
+    assert (
+        format_labels((("event", "login"), ("message", 'a "b"\\\n')))
+        == '{event="login",message="a \\"b\\"\\\\\\n"}'
+    )
+
+
+def test_MainNamespace_records_handlers(namespace: MainNamespace):
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+    namespace.trigger_event("login", "sid_2", {})
+
+    assert [event for event, _, _ in namespace.emitted] == ["room"]
+    seconds = METRICS.histograms[("timebomb_handler_seconds", (("event", "login"),))]
+    assert seconds.count == 3
+    assert METRICS.counters == {
+        (
+            "timebomb_handler_errors_total",
+            (("event", "login"), ("message", "Player already logged in.")),
+        ): 1,
+        (
+            "timebomb_handler_errors_total",
+            (("event", "login"), ("message", "Invalid username.")),
+        ): 1,
+    }
+    emits = METRICS.histograms[("timebomb_emit_seconds", (("event", "room"),))]
+    assert emits.count == 1
+    sizes = METRICS.histograms[("timebomb_emit_payload_bytes", (("event", "room"),))]
+    assert sizes.count == 1 and sizes.sum > 0
+
+
+def test_MainNamespace_records_exceptions(namespace: MainNamespace):
+    with raises(AttributeError):
+        namespace.trigger_event("login", "sid_1", None)
+
+    key = (
+        "timebomb_handler_errors_total",
+        (("event", "login"), ("message", "AttributeError")),
+    )
+    assert METRICS.counters == {key: 1}
+
+
+def test_MainNamespace_disabled(namespace: MainNamespace):
+    METRICS.enabled = False
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+
+    assert [event for event, _, _ in namespace.emitted] == ["room"]
+    assert METRICS.histograms == {} and METRICS.counters == {}
+
+
+def test_metrics_wsgi_app(namespace: MainNamespace):
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+    namespace.trigger_event("login", "sid_2", {"username": "player"})
+    namespace.trigger_event("chat", "sid_1", {})
+
+    responses = []
+    body = b"".join(
+        wsgi_app({"PATH_INFO": "/metrics"}, lambda *args: responses.append(args))
+    ).decode()
+
+    assert responses[0][0] == "200 OK"
+    lines = body.splitlines()
+    assert "# TYPE timebomb_handler_seconds histogram" in lines
+    assert 'timebomb_handler_seconds_count{event="login"} 2' in lines
+    assert 'timebomb_handler_seconds_bucket{event="login",le="+Inf"} 2' in lines
+    assert (
+        'timebomb_handler_errors_total{event="chat",message="Invalid data."} 1' in lines
+    )
+    assert 'timebomb_rooms{status="WAITING"} 1' in lines
+    assert 'timebomb_rooms{status="PLAYING"} 0' in lines
+    assert "timebomb_players 2" in lines
+    assert "timebomb_open_rooms 1" in lines
+
+    wsgi_app({"PATH_INFO": "/other"}, lambda *args: responses.append(args))
+    assert responses[1][0] == "404 Not Found"
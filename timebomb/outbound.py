@@ -0,0 +1,124 @@
+"""Bounded outbound queues, keeping the latest snapshots of slow clients.
+
+Engine.IO queues the packets of every client until its transport sends
+them, so a client on a bad network piles up `room` and `player` snapshots
+that the next ones make useless. Before a snapshot is queued, the queued
+snapshot of the same room or player is removed: the newest one is sent in
+its place, after the ordered events (`chat`, `notify`, `room_delta`...)
+queued before it. Clients whose queue stays over the limit anyway are
+disconnected.
+
+"""
+
+import time
+
+from timebomb.metrics import METRICS
+
+METRICS.describe(
+    "timebomb_outbound_coalesced_total",
+    "counter",
+    "Queued snapshots replaced by a newer one, by event.",
+)
+METRICS.describe(
+    "timebomb_outbound_disconnects_total",
+    "counter",
+    "Clients disconnected for a full outbound queue.",
+)
+METRICS.describe(
+    "timebomb_outbound_dropped_total",
+    "counter",
+    "Queued packets dropped with the disconnected clients.",
+)
+METRICS.describe("timebomb_outbound_pending", "gauge", "Packets queued to clients.")
+
+SNAPSHOTS = ("room", "player")
+
+
+def snapshot_key(eio_pkt) -> tuple:
+    """Return the (event, id) a packet is a snapshot of, None if ordered."""
+    source = getattr(eio_pkt.data, "source", None)
+    if source is None or not isinstance(source.data, list) or len(source.data) < 2:
+        return None
+
+    event, payload = source.data[:2]
+    if event not in SNAPSHOTS or not isinstance(payload, dict):
+        return None
+    return event, payload.get("id")
+
+
+def pending(queue):
+    """Return the deque of the packets waiting in an Engine.IO queue."""
+    return queue._queue if hasattr(queue, "_queue") else queue.queue
+
+
+class Outbound:
+    """Limit the packets queued for each client.
+
+    Usage:
+        sio = protocol.Server(outbound=Outbound(max_pending=64, grace=5))
+
+    Attributes:
+        max_pending (int): Packets a client can have queued.
+        grace (float): Seconds a client can stay over `max_pending` before it
+            is disconnected. At twice `max_pending` it is disconnected at once.
+        clock (callable): Returns the current time in seconds.
+        latest (dict): The last snapshot queued by key, by Engine.IO id.
+        over (dict): When each client went over `max_pending`.
+
+    """
+
+    def __init__(self, max_pending: int = 64, grace: float = 5, clock=time.monotonic):
+        self.max_pending = max_pending
+        self.grace = grace
+        self.clock = clock
+        self.latest = {}
+        self.over = {}
+
+    def coalesce(self, socket, eio_sid: str, key: tuple, eio_pkt):
+        """Unqueue the snapshot `eio_pkt` replaces, before it is queued."""
+        latest = self.latest.setdefault(eio_sid, {})
+        previous = latest.get(key)
+        latest[key] = eio_pkt
+        if previous is None:
+            return
+
+        try:
+            pending(socket.queue).remove(previous)
+        except ValueError:
+            return
+        socket.queue.task_done()
+        METRICS.inc("timebomb_outbound_coalesced_total", (("event", key[0]),))
+
+    def overflows(self, socket, eio_sid: str) -> bool:
+        """Whether a client stayed over the limit, after a packet is queued."""
+        size = socket.queue.qsize()
+        if size <= self.max_pending:
+            if self.over:
+                self.over.pop(eio_sid, None)
+            return False
+
+        since = self.over.setdefault(eio_sid, self.clock())
+        return size >= 2 * self.max_pending or self.clock() - since > self.grace
+
+    def drop(self, socket, eio_sid: str):
+        """Empty the queue of a client about to be disconnected."""
+        queue = pending(socket.queue)
+        dropped = len(queue)
+        queue.clear()
+        for _ in range(dropped):
+            socket.queue.task_done()
+
+        self.forget(eio_sid)
+        METRICS.inc("timebomb_outbound_disconnects_total", ())
+        METRICS.inc("timebomb_outbound_dropped_total", (), dropped)
+
+    def forget(self, eio_sid: str):
+        self.latest.pop(eio_sid, None)
+        self.over.pop(eio_sid, None)
+
+    def watch(self, eio):
+        """Report the packets queued to the clients of an Engine.IO server."""
+        METRICS.gauge(
+            "timebomb_outbound_pending",
+            lambda: {(): sum(s.queue.qsize() for s in list(eio.sockets.values()))},
+        )
@@ -0,0 +1,98 @@
+import time
+
+import engineio
+from engineio.socket import Socket
+from pytest import fixture, mark
+
+from timebomb.conftest import Clock
+from timebomb.metrics import METRICS
+from timebomb.outbound import Outbound, pending
+from timebomb.player.service import PLAYERS
+from timebomb.protocol import Server
+from timebomb.room.service import ROOMS
+from timebomb.socket_app import MainNamespace
+
+
+@fixture
+def server(clock: Clock, models) -> Server:
+    sio = Server(async_mode="threading", outbound=Outbound(8, 5, clock=clock))
+    sio.register_namespace(MainNamespace("/"))
+    yield sio
+    METRICS.clear()
+
+
+def connect(sio: Server, eio_sid: str) -> tuple:
+    """Connect a client which never reads its queue, return its sid and socket."""
+    socket = sio.eio.sockets[eio_sid] = Socket(sio.eio, eio_sid)
+    sio._handle_eio_connect(eio_sid, {})
+    sio._handle_eio_message(eio_sid, "0")
+    sid = sio.manager.sid_from_eio_sid(eio_sid, "/")
+    sio.namespace_handlers["/"].on_login(sid, {"username": eio_sid, "roomname": "r"})
+    while not socket.queue.empty():
+        socket.queue.get()
+        socket.queue.task_done()
+    return sid, socket
+
+
+def queued(socket: Socket) -> list:
+    return [pkt.data for pkt in pending(socket.queue)]
+
+
+def test_Outbound_coalesces_snapshots(server: Server):
+    namespace = server.namespace_handlers["/"]
+    sid, socket = connect(server, "slow")
+    room = ROOMS.first("name", "r")
+    player = PLAYERS.get(sid)
+
+    namespace.emit_room(room)
+    namespace.emit_chat(room, {"player": "slow", "message": "1"})
+    namespace.emit_player(player)
+    namespace.emit_room(room)
+    namespace.emit_chat(room, {"player": "slow", "message": "2"})
+    namespace.emit_player(player)
+
+    events = [data.split('"')[1] for data in queued(socket)]
+    assert events == ["chat", "room", "chat", "player"]
+    assert socket.queue.unfinished_tasks == 4
+    assert (
+        METRICS.counters[("timebomb_outbound_coalesced_total", (("event", "room"),))]
+        == 1
+    )
+
+
+def test_Outbound_disconnects_slow_clients(server: Server, clock: Clock):
+    namespace = server.namespace_handlers["/"]
+    sid, socket = connect(server, "slow")
+    other_sid, other = connect(server, "other")
+    room = ROOMS.first("name", "r")
+
+    for i in range(9):
+        namespace.emit("chat", {"message": str(i)}, to=sid)
+    assert server.outbound.over == {"slow": 0.0}
+    assert "slow" in server.eio.sockets
+
+    clock.now += 6
+    namespace.emit_chat(room, {"player": "other", "message": "late"})
+    deadline = time.monotonic() + 2
+    while "slow" in server.eio.sockets and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert "slow" not in server.eio.sockets and socket.closed
+    assert PLAYERS.get(sid) is None and PLAYERS.get(other_sid)
+    assert queued(other) == ['2["chat",{"player":"other","message":"late"}]']
+    assert METRICS.counters[("timebomb_outbound_disconnects_total", ())] == 1
+    assert METRICS.counters[("timebomb_outbound_dropped_total", ())] == 11
+
+
+@mark.parametrize("async_mode", ["threading", "eventlet", "asgi"])
+def test_pending(async_mode: str):
+    # Reads the queue internals of engineio, pinned in the Pipfile.
+    if async_mode == "asgi":
+        queue = engineio.AsyncServer(async_mode=async_mode).create_queue()
+        queue.put_nowait("packet")
+    else:
+        queue = engineio.Server(async_mode=async_mode).create_queue()
+        queue.put("packet")
+
+    assert list(pending(queue)) == ["packet"]
+    assert Socket(engineio.Server(async_mode="threading"), "sid").closing is False
@@ -0,0 +1,28 @@
+import timebomb.player.service as player_service
+from timebomb.player.model import Player
+from timebomb.player.service import PlayerService
+from timebomb.store.aio import call
+
+
+class AsyncPlayerService:
+    """Awaitable `PlayerService`."""
+
+    @staticmethod
+    async def get_by_id(id: str) -> Player:
+        return await call(player_service.PLAYERS, PlayerService.get_by_id, id)
+
+    @staticmethod
+    async def get_by_room_id(room_id: str) -> list:
+        return await call(player_service.PLAYERS, PlayerService.get_by_room_id, room_id)
+
+    @staticmethod
+    async def update(player: Player, changes: dict) -> Player:
+        return await call(player_service.PLAYERS, PlayerService.update, player, changes)
+
+    @staticmethod
+    async def delete(player: Player) -> int:
+        return await call(player_service.PLAYERS, PlayerService.delete, player)
+
+    @staticmethod
+    async def create(new_attrs: dict) -> Player:
+        return await call(player_service.PLAYERS, PlayerService.create, new_attrs)
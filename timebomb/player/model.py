@@ -1,7 +1,10 @@
+import secrets
 from dataclasses import dataclass, field
 
+from timebomb.room.cards import to_cards, to_counts
 
-@dataclass
+
+@dataclass(slots=True)
 class Player:
     """Player Model.
 
@@ -9,15 +12,26 @@ class Player:
         name (str): The player name.
         id (str): The player ID (socket ID).
         room_id (str): Locate in which room the player is.
+        token (str): Secret given to the player at login, to resume its seat.
 
         team (str): The player team. None before the game starts.
-        hand (str): The player list of cards. None before the game starts.
+        cards (list): Number of each card of `magics.CARDS` in the hand.
+        hand (list): The player list of cards, expanded from `cards`.
 
     """
 
     name: str
     id: str
     room_id: str = None
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(16), repr=False)
 
     team: str = None
-    hand: list = field(default_factory=list)
+    cards: list = field(default_factory=lambda: to_counts(()))
+
+    @property
+    def hand(self) -> list:
+        return to_cards(self.cards)
+
+    @hand.setter
+    def hand(self, cards: list):
+        self.cards = to_counts(cards)
@@ -0,0 +1,26 @@
+from timebomb.player.model import Player
+
+
+def to_str(value) -> str:
+    if value is None:
+        return None
+    return str(value)
+
+
+def dump_player(player: Player) -> dict:
+    """Serialize a player, same output as `PlayerSchema().dump`."""
+    hand = player.hand
+    return {
+        "name": to_str(player.name),
+        "id": to_str(player.id),
+        "roomId": to_str(player.room_id),
+        "team": to_str(player.team),
+        "hand": None if hand is None else [str(card) for card in hand],
+    }
+
+
+def dump_player_ref(player: Player) -> dict:
+    """Serialize a player, same output as `PlayerSchema(only=("name", "id")).dump`."""
+    if player is None:
+        return None
+    return {"name": to_str(player.name), "id": to_str(player.id)}
@@ -0,0 +1,42 @@
+import numpy as np
+
+from timebomb.player.model import Player
+from timebomb.player.schema import PlayerSchema
+from timebomb.player.serializer import dump_player, dump_player_ref
+
+
+def make_players():
+    player1 = Player("username", "userid")
+
+    player2 = Player("username", "userid", "roomid")
+    player2.team = "Sherlock"
+    player2.hand = np.array(["B", "D", "S", "S"])
+
+    player3 = Player("username", "userid", "roomid")
+    player3.team = "Moriarty"
+    player3.hand = np.array([], dtype="<U1")
+
+    return [player1, player2, player3]
+
+
+def test_dump_player_parity():
+    schema = PlayerSchema()
+
+    for player in make_players():
+        assert dump_player(player) == schema.dump(player)
+
+
+def test_dump_player_ref_parity():
+    schema = PlayerSchema(only=("name", "id"))
+
+    for player in make_players():
+        assert dump_player_ref(player) == schema.dump(player)
+
+    assert dump_player_ref(None) is None
+
+
+def test_dump_player_native_types():
+    player = make_players()[1]
+    json = dump_player(player)
+
+    assert all(type(card) is str for card in json["hand"])
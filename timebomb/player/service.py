@@ -1,18 +1,27 @@
+import os
+
 from timebomb.player.model import Player
+from timebomb.store import create_store
 
-PLAYERS = []
+PLAYERS = create_store(
+    os.environ.get("TIMEBOMB_STORE"), "players", key="id", indexes=("room_id",)
+)
 
 
 class PlayerService:
     @staticmethod
     def get_by_id(id: str) -> Player:
-        for player in PLAYERS:
-            if player.id == id:
-                return player
+        return PLAYERS.get(id)
+
+    @staticmethod
+    def get_by_room_id(room_id: str) -> list:
+        return PLAYERS.filter("room_id", room_id)
 
     @staticmethod
     def update(player: Player, changes: dict) -> Player:
-        player.__dict__.update(changes)
+        for attr, value in changes.items():
+            setattr(player, attr, value)
+        PLAYERS.save(player)
         return player
 
     @staticmethod
@@ -2,6 +2,7 @@ from pytest import fixture
 
 from timebomb.player.model import Player
 from timebomb.player.service import PlayerService, PLAYERS
+from timebomb.registry import Registry
 
 
 def make_player(marker=None):
@@ -14,7 +15,7 @@ def player_db():
     PLAYERS.clear()
 
 
-def test_PlayerService_get_by_id(player_db: list):
+def test_PlayerService_get_by_id(player_db: Registry):
     player1: Player = make_player(1)
 
     player_db.append(player1)
@@ -24,20 +25,37 @@ def test_PlayerService_get_by_id(player_db: list):
     assert result is player1
 
 
-def test_PlayerService_update(player_db: list):
+def test_PlayerService_get_by_room_id(player_db: Registry):
+    player1: Player = make_player(1)
+    player2: Player = make_player(2)
+    player1.room_id = "room_1"
+
+    player_db.append(player1)
+    player_db.append(player2)
+
+    assert PlayerService.get_by_room_id("room_1") == [player1]
+
+    PlayerService.update(player2, {"room_id": "room_1"})
+    assert PlayerService.get_by_room_id("room_1") == [player1, player2]
+
+    PlayerService.delete(player1)
+    assert PlayerService.get_by_room_id("room_1") == [player2]
+
+
+def test_PlayerService_update(player_db: Registry):
     player1: Player = make_player(1)
 
     player_db.append(player1)
 
-    assert player_db[0].name == "user_1"
+    assert player_db.get("id_1").name == "user_1"
 
     updates = {"name": "newname"}
     PlayerService.update(player1, updates)
 
-    assert player_db[0].name == "newname"
+    assert player_db.get("id_1").name == "newname"
 
 
-def test_PlayerService_delete(player_db: list):
+def test_PlayerService_delete(player_db: Registry):
     player1: Player = make_player(1)
     player2: Player = make_player(2)
 
@@ -51,7 +69,7 @@ def test_PlayerService_delete(player_db: list):
     assert player1 not in player_db and player2 in player_db
 
 
-def test_PlayerService_create(player_db: list):
+def test_PlayerService_create(player_db: Registry):
     infos = {"name": "username", "id": "userid"}
     result = PlayerService.create(infos)
 
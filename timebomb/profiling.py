@@ -0,0 +1,227 @@
+"""On-demand profiling of a live worker, for a bounded window.
+
+Two tools, both started for a number of seconds and turned off when the
+window ends:
+
+- `PROFILER` profiles the `MainNamespace.on_*` calls with cProfile, one
+  profile per event. Handlers run on greenlets: work done by another
+  greenlet while a handler waits is counted in that handler.
+- `SAMPLER` is a native thread which samples the stack running on every
+  other thread every `interval` seconds, and counts them as collapsed
+  stacks (`outer;inner count`), the input of flamegraph.pl or speedscope.
+  With eventlet it sees the greenlet running at that moment, and the hub
+  when the worker is idle.
+
+Both are driven over HTTP by `admin_app`, which requires
+`Authorization: Bearer <token>`:
+
+    POST /admin/profile?seconds=30  start profiling the handlers
+    GET  /admin/profile             report of the last window
+    POST /admin/stacks?seconds=30&interval=0.005  start sampling stacks
+    GET  /admin/stacks              collapsed stacks of the last window
+
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import math
+import os
+import pstats
+import sys
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+from eventlet import patcher
+
+threading = patcher.original("threading")
+
+MAX_SECONDS = 300
+
+
+class Profiler:
+    """Deterministic profiling of the handlers during a window.
+
+    Attributes:
+        deadline (float): End of the window, in `time.monotonic` seconds,
+            None when not profiling.
+        report (str): pstats report of the last window, None before.
+
+    """
+
+    def __init__(self):
+        self.deadline = None
+        self.report = None
+        self.profiles = {}
+        self._running = False
+
+    @property
+    def active(self) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.finish()
+        return self.deadline is not None
+
+    def start(self, seconds: float) -> bool:
+        """Profile the handlers for `seconds`, False if already profiling."""
+        if self.active:
+            return False
+
+        self.profiles = {}
+        self.deadline = time.monotonic() + seconds
+        return True
+
+    def call(self, event: str, fn, *args):
+        """Call `fn(*args)`, profiled as `event` during a window.
+
+        Calls made while another one is profiled, by a greenlet switching
+        in the middle of a handler, are not profiled themselves.
+
+        """
+        if self.deadline is None or self._running or not self.active:
+            return fn(*args)
+
+        profile = self.profiles.get(event)
+        if profile is None:
+            profile = self.profiles[event] = cProfile.Profile()
+
+        self._running = True
+        try:
+            return profile.runcall(fn, *args)
+        finally:
+            self._running = False
+
+    def finish(self, limit: int = 30):
+        self.deadline = None
+
+        out = io.StringIO()
+        for event, profile in sorted(self.profiles.items()):
+            out.write(f"=== on_{event} ===\n")
+            stats = pstats.Stats(profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(limit)
+        self.report = out.getvalue()
+        self.profiles = {}
+
+
+class Sampler:
+    """Statistical stack sampler of the other threads of the process.
+
+    Attributes:
+        report (str): Collapsed stacks of the last window, None before.
+
+    """
+
+    def __init__(self):
+        self.report = None
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = 0.005) -> bool:
+        """Sample for `seconds`, False if already sampling."""
+        if self.active:
+            return False
+
+        self._thread = threading.Thread(
+            target=self._run, args=(seconds, interval), daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def join(self):
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, seconds: float, interval: float):
+        stacks = Counter()
+        wait = threading.Event().wait
+        deadline = time.monotonic() + seconds
+        ident = threading.get_ident()
+
+        while time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id != ident:
+                    stacks[collapse(frame)] += 1
+            frames = frame = None
+            wait(interval)
+
+        self.report = "".join(
+            f"{stack} {count}\n" for stack, count in stacks.most_common()
+        )
+
+
+def collapse(frame) -> str:
+    """Return the stack of `frame` as `outer;...;inner` function names."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+PROFILER = Profiler()
+SAMPLER = Sampler()
+
+
+def admin_app(token: str, app):
+    """Serve the `/admin/` paths with `token`, and the others with `app`."""
+    expected = f"Bearer {token}".encode()
+
+    def respond(start_response, status: str, body: str, content_type: str):
+        start_response(status, [("Content-Type", content_type)])
+        return [body.encode()]
+
+    def admin(environ: dict, start_response):
+        path = environ.get("PATH_INFO", "")
+        if not path.startswith("/admin/"):
+            return app(environ, start_response)
+
+        authorization = environ.get("HTTP_AUTHORIZATION", "").encode()
+        if not hmac.compare_digest(authorization, expected):
+            return respond(start_response, "403 Forbidden", "Forbidden", "text/plain")
+
+        tools = {"/admin/profile": PROFILER, "/admin/stacks": SAMPLER}
+        tool = tools.get(path)
+        if tool is None:
+            return respond(start_response, "404 Not Found", "Not Found", "text/plain")
+
+        if environ.get("REQUEST_METHOD") == "POST":
+            query = parse_qs(environ.get("QUERY_STRING", ""))
+            try:
+                seconds = float(query.get("seconds", ["30"])[0])
+                interval = float(query.get("interval", ["0.005"])[0])
+            except ValueError:
+                seconds = interval = math.nan
+            if not math.isfinite(seconds) or not math.isfinite(interval):
+                return respond(
+                    start_response, "400 Bad Request", "Bad Request", "text/plain"
+                )
+
+            seconds = min(max(seconds, 0), MAX_SECONDS)
+            if tool is SAMPLER:
+                started = SAMPLER.start(seconds, max(interval, 0.001))
+            else:
+                started = PROFILER.start(seconds)
+
+            if not started:
+                return respond(
+                    start_response, "409 Conflict", "Already running", "text/plain"
+                )
+            body = json.dumps({"seconds": seconds})
+            return respond(start_response, "202 Accepted", body, "application/json")
+
+        if tool.active:
+            return respond(
+                start_response, "409 Conflict", "Still running", "text/plain"
+            )
+        if tool.report is None:
+            return respond(start_response, "404 Not Found", "No report", "text/plain")
+        return respond(start_response, "200 OK", tool.report, "text/plain")
+
+    return admin
@@ -0,0 +1,108 @@
+import sys
+import time
+
+from pytest import fixture
+
+from timebomb.profiling import PROFILER, SAMPLER, admin_app, collapse
+from timebomb.socket_app import MainNamespace
+
+
+@fixture(autouse=True)
+def clear(models):
+    yield
+    PROFILER.deadline = None
+    PROFILER.report = None
+    SAMPLER.join()
+    SAMPLER.report = None
+
+
+def request(app, method: str, path: str, token: str = "secret") -> tuple:
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+    }
+    responses = []
+    body = b"".join(app(environ, lambda *args: responses.append(args)))
+    return responses[0][0], body.decode()
+
+
+def test_Profiler_window(namespace: MainNamespace):
+    assert PROFILER.start(0.2)
+    assert not PROFILER.start(0.2)
+
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+    namespace.trigger_event("sync", "sid_1")
+    namespace.trigger_event("unknown", "sid_1")
+    assert set(PROFILER.profiles) == {"login", "sync"}
+
+    time.sleep(0.2)
+    namespace.trigger_event("sync", "sid_1")
+
+    assert PROFILER.deadline is None and PROFILER.profiles == {}
+    assert "=== on_login ===" in PROFILER.report
+    assert "=== on_sync ===" in PROFILER.report
+    assert "on_login" in PROFILER.report.split("=== on_sync ===")[0]
+
+
+def test_Sampler_window():
+    def spin(seconds: float):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            pass
+
+    assert SAMPLER.start(0.2, interval=0.001)
+    assert not SAMPLER.start(0.2)
+    spin(0.3)
+    SAMPLER.join()
+
+    assert not SAMPLER.active
+    lines = SAMPLER.report.splitlines()
+    assert any("test_Sampler_window" in line and "spin" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_collapse():
+    def inner():
+        return collapse(sys._getframe())
+
+    stack = inner().split(";")
+    assert stack[-1].startswith("inner (profiling_test.py:")
+    assert stack[-2].startswith("test_collapse (profiling_test.py:")
+
+
+def test_admin_app(namespace: MainNamespace):
+    def next_app(environ: dict, start_response):
+        start_response("200 OK", [])
+        return [b"next"]
+
+    app = admin_app("secret", next_app)
+
+    assert request(app, "GET", "/metrics", token="") == ("200 OK", "next")
+    assert request(app, "GET", "/admin/profile", token="wrong")[0] == "403 Forbidden"
+    assert request(app, "GET", "/admin/other")[0] == "404 Not Found"
+    assert request(app, "GET", "/admin/profile")[0] == "404 Not Found"
+    assert request(app, "POST", "/admin/profile?seconds=x")[0] == "400 Bad Request"
+    for seconds in ("nan", "inf", "-inf"):
+        path = f"/admin/profile?seconds={seconds}"
+        assert request(app, "POST", path)[0] == "400 Bad Request"
+    path = "/admin/stacks?seconds=1&interval=nan"
+    assert request(app, "POST", path)[0] == "400 Bad Request"
+
+    assert request(app, "POST", "/admin/profile?seconds=0.1")[0] == "202 Accepted"
+    assert request(app, "POST", "/admin/profile?seconds=0.1")[0] == "409 Conflict"
+    namespace.trigger_event("login", "sid_1", {"username": "player"})
+    assert request(app, "GET", "/admin/profile")[0] == "409 Conflict"
+
+    time.sleep(0.1)
+    status, body = request(app, "GET", "/admin/profile")
+    assert status == "200 OK" and "=== on_login ===" in body
+
+    status = request(app, "POST", "/admin/stacks?seconds=0.05&interval=0.001")[0]
+    assert status == "202 Accepted"
+    SAMPLER.join()
+    status, body = request(app, "GET", "/admin/stacks")
+    assert status == "200 OK" and body.endswith("\n")
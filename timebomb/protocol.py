@@ -0,0 +1,211 @@
+"""Negotiated wire protocol: JSON by default, msgpack with packed cards.
+
+A client speaking msgpack, `socketio.Client(serializer="msgpack")`, sends
+binary packets from its CONNECT on. The server then answers it in msgpack
+while the other clients keep JSON text packets. In msgpack payloads the
+`hand`, `cards_found` and `cards_left` fields are lists of counts in the
+order of `magics.CARDS`, `None` for a card left out of a delta and empty
+before the game, instead of lists of card strings and dicts.
+
+Broadcasts are still encoded once per protocol: the JSON packet built by
+the client manager keeps its source packet, which is encoded to msgpack for
+the first msgpack recipient and reused for the next ones.
+
+msgpack is optional. Without it every client speaks JSON.
+
+"""
+
+import socketio
+from engineio import packet as eio_packet
+from socketio import packet
+
+from timebomb.outbound import Outbound, snapshot_key
+from timebomb.room.magics import CARDS
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CARD_FIELDS = ("cards_found", "cards_left")
+
+
+def pack_cards(value):
+    """Replace the cards of a payload by lists of counts, recursively."""
+    if isinstance(value, list):
+        return [pack_cards(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    packed = {}
+    for key, item in value.items():
+        if key == "hand" and item is not None:
+            packed[key] = [item.count(card) for card in CARDS]
+        elif key in CARD_FIELDS and item is not None:
+            packed[key] = [item.get(card) for card in CARDS] if item else []
+        else:
+            packed[key] = pack_cards(item)
+    return packed
+
+
+def encode_msgpack(pkt: packet.Packet) -> bytes:
+    """Encode a packet like `MsgPackPacket`, with packed cards."""
+    fields = {"type": pkt.packet_type, "data": pack_cards(pkt.data)}
+    fields["nsp"] = pkt.namespace
+    if pkt.id is not None:
+        fields["id"] = pkt.id
+    return msgpack.dumps(fields)
+
+
+class Encoded(str):
+    """A JSON encoded packet, remembering its packet for other protocols."""
+
+    source = None
+    msgpack = None
+
+
+class Packet(packet.Packet):
+    """Socket.IO packet encoded in JSON, decoding msgpack packets too."""
+
+    def encode(self):
+        encoded = super().encode()
+        if isinstance(encoded, str):
+            encoded = Encoded(encoded)
+            encoded.source = self
+        return encoded
+
+    def decode(self, encoded_packet):
+        if not isinstance(encoded_packet, bytes):
+            return super().decode(encoded_packet)
+
+        decoded = msgpack.loads(encoded_packet)
+        self.packet_type = decoded["type"]
+        self.data = decoded.get("data")
+        self.id = decoded.get("id")
+        self.namespace = decoded["nsp"]
+
+
+def to_msgpack(eio_pkt: eio_packet.Packet) -> eio_packet.Packet:
+    """Return the msgpack variant of an Engine.IO message, encoded once."""
+    encoded = eio_pkt.data
+    if not isinstance(encoded, Encoded):
+        return eio_pkt
+
+    if encoded.msgpack is None:
+        data = encode_msgpack(encoded.source)
+        encoded.msgpack = eio_packet.Packet(eio_packet.MESSAGE, data)
+    return encoded.msgpack
+
+
+def speaks_msgpack(server, eio_sid: str, data) -> bool:
+    """Whether an incoming message is the first of a msgpack client."""
+    return (
+        msgpack is not None
+        and isinstance(data, bytes)
+        and eio_sid not in server._binary_packet
+    )
+
+
+class Server(socketio.Server):
+    """`socketio.Server` answering every client in its own protocol.
+
+    Attributes:
+        msgpack_sids (set): Engine.IO ids of the msgpack clients.
+        outbound (Outbound): The limit of the queued packets of every
+            client, None for no limit.
+
+    """
+
+    def __init__(self, *args, outbound: Outbound = None, **kwargs):
+        super().__init__(*args, serializer=Packet, **kwargs)
+        self.msgpack_sids = set()
+        self.outbound = outbound
+        if outbound:
+            outbound.watch(self.eio)
+
+    def _handle_eio_message(self, eio_sid, data):
+        if speaks_msgpack(self, eio_sid, data):
+            self.msgpack_sids.add(eio_sid)
+        return super()._handle_eio_message(eio_sid, data)
+
+    def _handle_eio_disconnect(self, eio_sid, reason):
+        self.msgpack_sids.discard(eio_sid)
+        if self.outbound:
+            self.outbound.forget(eio_sid)
+        return super()._handle_eio_disconnect(eio_sid, reason)
+
+    def _send_packet(self, eio_sid, pkt):
+        if eio_sid not in self.msgpack_sids:
+            return super()._send_packet(eio_sid, pkt)
+        self.eio.send(eio_sid, encode_msgpack(pkt))
+
+    def _send_eio_packet(self, eio_sid, eio_pkt):
+        key = snapshot_key(eio_pkt) if self.outbound else None
+        if eio_sid in self.msgpack_sids:
+            eio_pkt = to_msgpack(eio_pkt)
+
+        socket = self.eio.sockets.get(eio_sid)
+        if not self.outbound or socket is None or socket.closing:
+            return super()._send_eio_packet(eio_sid, eio_pkt)
+
+        if key:
+            self.outbound.coalesce(socket, eio_sid, key, eio_pkt)
+        super()._send_eio_packet(eio_sid, eio_pkt)
+        if self.outbound.overflows(socket, eio_sid):
+            self.outbound.drop(socket, eio_sid)
+            self.start_background_task(self.close_slow, eio_sid)
+
+    def close_slow(self, eio_sid: str):
+        """Disconnect a client without waiting for its queue to be sent."""
+        socket = self.eio.sockets.pop(eio_sid, None)
+        if socket:
+            socket.close(wait=False, abort=True)
+
+
+class AsyncServer(socketio.AsyncServer):
+    """Asyncio variant of `Server`."""
+
+    def __init__(self, *args, outbound: Outbound = None, **kwargs):
+        super().__init__(*args, serializer=Packet, **kwargs)
+        self.msgpack_sids = set()
+        self.outbound = outbound
+        if outbound:
+            outbound.watch(self.eio)
+
+    async def _handle_eio_message(self, eio_sid, data):
+        if speaks_msgpack(self, eio_sid, data):
+            self.msgpack_sids.add(eio_sid)
+        return await super()._handle_eio_message(eio_sid, data)
+
+    async def _handle_eio_disconnect(self, eio_sid, reason):
+        self.msgpack_sids.discard(eio_sid)
+        if self.outbound:
+            self.outbound.forget(eio_sid)
+        return await super()._handle_eio_disconnect(eio_sid, reason)
+
+    async def _send_packet(self, eio_sid, pkt):
+        if eio_sid not in self.msgpack_sids:
+            return await super()._send_packet(eio_sid, pkt)
+        await self.eio.send(eio_sid, encode_msgpack(pkt))
+
+    async def _send_eio_packet(self, eio_sid, eio_pkt):
+        key = snapshot_key(eio_pkt) if self.outbound else None
+        if eio_sid in self.msgpack_sids:
+            eio_pkt = to_msgpack(eio_pkt)
+
+        socket = self.eio.sockets.get(eio_sid)
+        if not self.outbound or socket is None or socket.closing:
+            return await super()._send_eio_packet(eio_sid, eio_pkt)
+
+        if key:
+            self.outbound.coalesce(socket, eio_sid, key, eio_pkt)
+        await super()._send_eio_packet(eio_sid, eio_pkt)
+        if self.outbound.overflows(socket, eio_sid):
+            self.outbound.drop(socket, eio_sid)
+            self.start_background_task(self.close_slow, eio_sid)
+
+    async def close_slow(self, eio_sid: str):
+        """Disconnect a client without waiting for its queue to be sent."""
+        socket = self.eio.sockets.pop(eio_sid, None)
+        if socket:
+            await socket.close(wait=False, abort=True)
@@ -0,0 +1,112 @@
+import socketio
+from pytest import fixture, importorskip
+
+from timebomb.protocol import AsyncServer, Packet, Server, pack_cards
+from timebomb.socket_app import MainNamespace
+
+msgpack = importorskip("msgpack")
+
+
+@fixture
+def server(models) -> Server:
+    sio = Server(async_mode="threading")
+    sio.register_namespace(MainNamespace("/"))
+    sio.sent = []
+    sio.eio.send_packet = lambda eio_sid, pkt: sio.sent.append((eio_sid, pkt))
+    sio.eio.send = lambda eio_sid, data: sio.sent.append((eio_sid, data))
+    return sio
+
+
+def test_pack_cards():
+    player = {"name": "a", "hand": ["B", "S", "S"], "team": "Sherlock"}
+    room = {"cards_found": {"B": 0, "D": 1, "S": 2}, "cards_left": {}, "cutter": None}
+    delta = {"cards_found": {"D": 2}, "cards_left": None}
+
+    assert pack_cards(player) == {"name": "a", "hand": [1, 0, 2], "team": "Sherlock"}
+    assert pack_cards([room]) == [
+        {"cards_found": [0, 1, 2], "cards_left": [], "cutter": None}
+    ]
+    assert pack_cards(delta) == {"cards_found": [None, 2, None], "cards_left": None}
+    assert pack_cards({"status": "SUCCESS", "data": player})["data"]["hand"] == [
+        1,
+        0,
+        2,
+    ]
+
+
+def test_Packet_decodes_both_protocols():
+    json_packet = Packet(encoded_packet='2["login",{"username":"a"}]')
+    binary = msgpack.dumps(
+        {"type": 2, "data": ["login", {"username": "a"}], "nsp": "/"}
+    )
+    msgpack_packet = Packet(encoded_packet=binary)
+
+    assert json_packet.data == msgpack_packet.data == ["login", {"username": "a"}]
+    assert msgpack_packet.namespace == "/" and msgpack_packet.id is None
+
+
+def test_Server_answers_each_protocol(server: Server):
+    connect = msgpack.dumps({"type": 0, "nsp": "/"})
+    server._handle_eio_connect("mp", {})
+    server._handle_eio_message("mp", connect)
+    server._handle_eio_connect("js", {})
+    server._handle_eio_message("js", "0")
+    assert server.msgpack_sids == {"mp"}
+
+    sids = {
+        eio_sid: server.manager.sid_from_eio_sid(eio_sid, "/")
+        for eio_sid in ("mp", "js")
+    }
+    namespace = server.namespace_handlers["/"]
+    for sid in sids.values():
+        namespace.on_login(sid, {"username": "a", "roomname": "protocol_room"})
+
+    server.sent.clear()
+    namespace.trigger_event("chat", sids["js"], {"message": "hello"})
+    sent = dict(server.sent)
+    assert msgpack.loads(sent["mp"].encode())["data"] == [
+        "chat",
+        {"player": "a", "message": "hello"},
+    ]
+    assert sent["js"].encode().startswith('42["chat"')
+
+    server._handle_eio_disconnect("mp", "client disconnect")
+    assert server.msgpack_sids == set()
+
+
+def test_Server_encodes_once_per_protocol(server: Server):
+    namespace = server.namespace_handlers["/"]
+    for i in range(20):
+        eio_sid = f"eio_{i}"
+        server._handle_eio_connect(eio_sid, {})
+        if i % 2:
+            server._handle_eio_message(eio_sid, msgpack.dumps({"type": 0, "nsp": "/"}))
+        else:
+            server._handle_eio_message(eio_sid, "0")
+        sid = server.manager.sid_from_eio_sid(eio_sid, "/")
+        server.manager.enter_room(sid, "/", "room")
+
+    server.sent.clear()
+    namespace.emit("room", {"cards_left": {"B": 1, "D": 4, "S": 15}}, to="room")
+
+    packets = {id(pkt): pkt for _, pkt in server.sent}
+    assert len(server.sent) == 20 and len(packets) == 2
+    assert sorted(type(pkt.data).__name__ for pkt in packets.values()) == [
+        "Encoded",
+        "bytes",
+    ]
+
+
+def test_Server_overrides_socketio_internals():
+    # The private methods overridden, pinned in the Pipfile.
+    for cls, base in ((Server, socketio.Server), (AsyncServer, socketio.AsyncServer)):
+        for name in (
+            "_handle_eio_message",
+            "_handle_eio_disconnect",
+            "_send_packet",
+            "_send_eio_packet",
+        ):
+            assert callable(getattr(base, name, None)) and name in vars(cls)
+
+    assert isinstance(Server(async_mode="threading")._binary_packet, dict)
+    assert isinstance(AsyncServer(async_mode="asgi")._binary_packet, dict)
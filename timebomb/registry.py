@@ -0,0 +1,110 @@
+class Registry:
+    """In-memory collection of models indexed by key and by attributes.
+
+    Models are stored by their `key` attribute. Every attribute listed in
+    `indexes` gets a secondary index mapping its value to the models having
+    that value, in insertion order. All lookups, insertions and removals are
+    O(1).
+
+    Indexes are computed when a model is added. Call `reindex` after changing
+    an indexed attribute of a registered model.
+
+    Attributes:
+        key (str): The attribute used as primary key.
+        indexes (tuple): The attributes indexed for lookups.
+
+    """
+
+    def __init__(self, key: str = "id", indexes: tuple = ()):
+        self.key = key
+        self.indexes = tuple(indexes)
+
+        self._items = {}
+        self._index = {attr: {} for attr in self.indexes}
+        self._indexed_values = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __contains__(self, model) -> bool:
+        return self._indexed_values.get(id(model)) is not None
+
+    def get(self, key):
+        return self._items.get(key)
+
+    def first(self, attr: str, value):
+        models = self._index[attr].get(value)
+        if models:
+            return next(iter(models.values()))
+
+    def filter(self, attr: str, value) -> list:
+        return list(self._index[attr].get(value, {}).values())
+
+    def append(self, model):
+        self._insert(model)
+
+    def remove(self, model):
+        if model not in self:
+            raise ValueError("Model not in registry.")
+
+        self._discard(model)
+
+    def reindex(self, model):
+        indexed = self._indexed_values.get(id(model))
+        if indexed is None:
+            return
+
+        ident, key, *values = indexed
+        if getattr(model, self.key) != key:
+            self._discard(model)
+            self._insert(model)
+            return
+
+        new_values = tuple(getattr(model, attr) for attr in self.indexes)
+        if new_values == indexed[2:]:
+            return
+
+        for attr, value, new_value in zip(self.indexes, values, new_values):
+            if new_value == value:
+                continue
+
+            models = self._index[attr][value]
+            del models[ident]
+            if not models:
+                del self._index[attr][value]
+
+            self._index[attr].setdefault(new_value, {})[ident] = model
+        self._indexed_values[ident] = (ident, key) + new_values
+
+    def clear(self):
+        self._items.clear()
+        self._indexed_values.clear()
+        for index in self._index.values():
+            index.clear()
+
+    def _insert(self, model):
+        # The id of the model is allocated once, and shared by the indexes.
+        ident = id(model)
+        key = getattr(model, self.key)
+        values = tuple(getattr(model, attr) for attr in self.indexes)
+
+        self._items[key] = model
+        for attr, value in zip(self.indexes, values):
+            self._index[attr].setdefault(value, {})[ident] = model
+
+        self._indexed_values[ident] = (ident, key) + values
+
+    def _discard(self, model):
+        ident, key, *values = self._indexed_values.pop(id(model))
+
+        if self._items.get(key) is model:
+            del self._items[key]
+
+        for attr, value in zip(self.indexes, values):
+            models = self._index[attr][value]
+            del models[ident]
+            if not models:
+                del self._index[attr][value]
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+from pytest import fixture, raises
+
+from timebomb.registry import Registry
+
+
+@dataclass
+class Model:
+    id: str
+    name: str = None
+
+
+@fixture
+def registry() -> Registry:
+    return Registry(key="id", indexes=("name",))
+
+
+def test_Registry_append(registry: Registry):
+    model = Model("id_1", "name_1")
+    registry.append(model)
+
+    assert len(registry) == 1
+    assert model in registry
+    assert list(registry) == [model]
+    assert registry.get("id_1") is model
+    assert registry.first("name", "name_1") is model
+    assert registry.filter("name", "name_1") == [model]
+
+
+def test_Registry_missing(registry: Registry):
+    assert registry.get("unknown") is None
+    assert registry.first("name", "unknown") is None
+    assert registry.filter("name", "unknown") == []
+    assert Model("id_1") not in registry
+
+
+def test_Registry_filter_keeps_insertion_order(registry: Registry):
+    models = [Model(f"id_{i}", "same") for i in range(3)]
+    for model in models:
+        registry.append(model)
+
+    assert registry.filter("name", "same") == models
+    assert registry.first("name", "same") is models[0]
+
+    registry.remove(models[0])
+    assert registry.first("name", "same") is models[1]
+
+
+def test_Registry_remove(registry: Registry):
+    model1 = Model("id_1", "name_1")
+    model2 = Model("id_2", "name_2")
+    registry.append(model1)
+    registry.append(model2)
+
+    registry.remove(model1)
+
+    assert len(registry) == 1
+    assert model1 not in registry and model2 in registry
+    assert registry.get("id_1") is None
+    assert registry.first("name", "name_1") is None
+
+    with raises(ValueError):
+        registry.remove(model1)
+
+
+def test_Registry_reindex(registry: Registry):
+    model = Model("id_1", "name_1")
+    registry.append(model)
+
+    model.name = "name_2"
+    assert registry.first("name", "name_1") is model
+
+    registry.reindex(model)
+    assert registry.first("name", "name_1") is None
+    assert registry.first("name", "name_2") is model
+
+    unregistered = Model("id_2", "name_2")
+    registry.reindex(unregistered)
+    assert unregistered not in registry
+
+
+def test_Registry_clear(registry: Registry):
+    registry.append(Model("id_1", "name_1"))
+    registry.clear()
+
+    assert len(registry) == 0
+    assert registry.get("id_1") is None
+    assert registry.first("name", "name_1") is None
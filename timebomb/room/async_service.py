@@ -0,0 +1,66 @@
+import timebomb.room.service as room_service
+from timebomb.room.model import Room
+from timebomb.room.service import RoomService
+from timebomb.store.aio import atomic, call
+
+
+class AsyncRoomService:
+    """Awaitable lookups and transactions over `RoomService`.
+
+    Room changes are still made with `RoomService` inside the function given
+    to `transaction`, so both server modes share the game rules.
+
+    """
+
+    @staticmethod
+    async def get_by_id(id: str) -> Room:
+        return await call(room_service.ROOMS, RoomService.get_by_id, id)
+
+    @staticmethod
+    async def get_by_name(name: str) -> Room:
+        return await call(room_service.ROOMS, RoomService.get_by_name, name)
+
+    @staticmethod
+    async def get_open_room() -> Room:
+        """Return the fullest open room, see `RoomService.get_open_room`.
+
+        The index of open rooms is only used on the loop, the store is read
+        in between.
+
+        """
+        room = await AsyncRoomService.check_open_room()
+        if room is None:
+            rooms = await call(room_service.ROOMS, RoomService.read_open_rooms)
+            if rooms is not None:
+                RoomService.index_open_rooms(rooms)
+                room = await AsyncRoomService.check_open_room()
+        return room
+
+    @staticmethod
+    async def check_open_room() -> Room:
+        while True:
+            room = room_service.OPEN_ROOMS.best()
+            if room is None:
+                return
+
+            stored = await call(room_service.ROOMS, RoomService.get_by_id, room.id)
+            room = RoomService.check_indexed(room, stored)
+            if room:
+                return room
+
+    @staticmethod
+    async def transaction(id: str, fn):
+        """Return `fn(room)` run while the room is locked, see `store.aio.atomic`."""
+        return await atomic(room_service.ROOMS, id, fn)
+
+    @staticmethod
+    async def delete(room: Room) -> int:
+        return await call(room_service.ROOMS, RoomService.delete, room)
+
+    @staticmethod
+    async def create(name: str, seed: int = None) -> Room:
+        return await call(room_service.ROOMS, RoomService.create, name, seed)
+
+    @staticmethod
+    async def create_random() -> Room:
+        return await call(room_service.ROOMS, RoomService.create_random)
@@ -0,0 +1,110 @@
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+
+import timebomb.room.magics as magics
+
+
+class CardCounts(MutableMapping):
+    """Counter of the cards of `magics.CARDS`, stored in slots.
+
+    Behaves like the dict of the counts it is built from, card by card, in
+    the order of `magics.CARDS`, without the hash table of a dict. Only the
+    cards of `magics.CARDS` can be counted.
+
+    """
+
+    __slots__ = magics.CARDS
+
+    def __init__(self, counts=(), **kwargs):
+        self.update(counts, **kwargs)
+
+    def __getitem__(self, card: str) -> int:
+        if card not in magics.CARDS or not hasattr(self, card):
+            raise KeyError(card)
+        return getattr(self, card)
+
+    def __setitem__(self, card: str, count: int):
+        if card not in magics.CARDS:
+            raise KeyError(card)
+        setattr(self, card, count)
+
+    def __delitem__(self, card: str):
+        if card not in magics.CARDS or not hasattr(self, card):
+            raise KeyError(card)
+        delattr(self, card)
+
+    def __iter__(self):
+        return (card for card in magics.CARDS if hasattr(self, card))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CardCounts({dict(self)})"
+
+
+def to_counts(cards) -> list:
+    """Count each card of `magics.CARDS` in a list or mapping of cards."""
+    if isinstance(cards, Mapping):
+        return [cards.get(card, 0) for card in magics.CARDS]
+
+    cards = list(cards)
+    return [cards.count(card) for card in magics.CARDS]
+
+
+def to_cards(counts) -> list:
+    """Expand counts of `magics.CARDS` into a list of cards."""
+    return [card for card, count in zip(magics.CARDS, counts) for _ in range(count)]
+
+
+def deal(counts, nb_hands: int, rng: np.random.Generator) -> list:
+    """Split a deck into `nb_hands` random hands of the same size.
+
+    Each hand is a multivariate hypergeometric draw of the counts left by
+    the previous hands, so the deck is never expanded nor shuffled card by
+    card. A draw takes a single sample from a fixed population, hence one
+    draw per hand: at most `magics.MAX_PLAYERS - 1` calls.
+
+    Args:
+        counts (list): Number of each card of `magics.CARDS` in the deck.
+        nb_hands (int): Number of hands. Must divide the deck size.
+        rng (Generator): The random generator to draw with.
+
+    Returns:
+        list: The counts of each hand.
+
+    """
+    left = np.array(counts, dtype=np.int64)
+    hand_size = int(left.sum()) // nb_hands
+
+    hands = []
+    for _ in range(nb_hands - 1):
+        hand = rng.multivariate_hypergeometric(left, hand_size)
+        left -= hand
+        hands.append(hand.tolist())
+
+    hands.append(left.tolist())
+    return hands
+
+
+def draw(counts: list, rng: np.random.Generator) -> int:
+    """Draw a random card from a hand, weighted by the counts.
+
+    Args:
+        counts (list): Number of each card of `magics.CARDS` in the hand.
+        rng (Generator): The random generator to draw with.
+
+    Returns:
+        int: The index of the drawn card. None if the hand is empty.
+
+    """
+    total = sum(counts)
+    if not total:
+        return
+
+    pick = rng.integers(total)
+    for index, count in enumerate(counts):
+        if pick < count:
+            return index
+        pick -= count
@@ -0,0 +1,69 @@
+import pickle
+
+from pytest import raises
+
+from timebomb.room.cards import CardCounts, deal, draw, to_cards, to_counts
+from timebomb.room.seeds import make_rng
+
+
+def test_to_counts():
+    assert to_counts([]) == [0, 0, 0]
+    assert to_counts(["S", "B", "S"]) == [1, 0, 2]
+    assert to_counts({"D": 4}) == [0, 4, 0]
+    assert to_counts({"B": 1, "D": 4, "S": 15}) == [1, 4, 15]
+
+
+def test_CardCounts():
+    counts = CardCounts({"S": 15, "B": 1})
+
+    assert not CardCounts()
+    assert counts == {"B": 1, "S": 15} and list(counts) == ["B", "S"]
+    assert counts.get("D", 0) == 0 and "D" not in counts
+    assert to_counts(counts) == [1, 0, 15]
+
+    counts["D"] = 4
+    counts["B"] += 1
+    assert dict(counts) == {"B": 2, "D": 4, "S": 15}
+    assert pickle.loads(pickle.dumps(counts)) == counts
+    assert not hasattr(counts, "__dict__")
+
+    with raises(KeyError):
+        counts["get"]
+    with raises(KeyError):
+        counts["X"] = 1
+
+
+def test_to_cards():
+    assert to_cards([0, 0, 0]) == []
+    assert to_cards([1, 0, 2]) == ["B", "S", "S"]
+
+
+def test_deal():
+    hands = deal([1, 4, 15], 4, make_rng(0))
+
+    assert len(hands) == 4
+    assert all(sum(hand) == 5 for hand in hands)
+    assert [sum(column) for column in zip(*hands)] == [1, 4, 15]
+
+
+def test_deal_uniform():
+    rng = make_rng(0)
+    holders = [deal([1, 4, 15], 4, rng) for _ in range(4000)]
+    holders = [next(i for i, hand in enumerate(hands) if hand[0]) for hands in holders]
+
+    assert all(900 < holders.count(i) < 1100 for i in range(4))
+
+
+def test_deal_single_card_type():
+    assert deal([0, 4, 0], 4, make_rng(0)) == [[0, 1, 0]] * 4
+
+
+def test_draw():
+    rng = make_rng(0)
+
+    assert draw([0, 0, 0], rng) is None
+    assert draw([0, 0, 3], rng) == 2
+    assert draw([0, 1, 0], rng) == 1
+
+    drawn = {draw([1, 1, 1], rng) for _ in range(100)}
+    assert drawn == {0, 1, 2}
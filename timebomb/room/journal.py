@@ -0,0 +1,485 @@
+"""Append-only journal of room events, with snapshots.
+
+Every room event is appended to the current log segment as a record:
+
+    ("create", room_id, name, seed)
+    ("join", room_id, player_id, player_name, token)
+    ("leave", room_id, player_id)
+    ("start", room_id, seed)
+    ("cut", room_id, from_id, to_id, card)
+    ("rename", room_id, old_id, new_id)
+    ("delete", room_id)
+
+Rooms draw all their randomness from their seeded generator, so replaying
+the events of a room rebuilds it exactly. Records are marshalled and
+framed with their length and CRC32, so a record torn by a crash is detected
+and dropped on restore.
+
+Records are queued on the event loop and written by a native thread which
+fsyncs them in batches every `interval` seconds. A snapshot of all rooms
+starts a new segment: restoring loads the latest snapshot and replays the
+segments written after it. Rooms are packed on the event loop by chunks,
+which lets other events run in between, and marshalled by the writer
+thread. Each room is stored with the number of the record it was packed
+at, so its earlier records in the new segment are skipped on restore.
+
+"""
+
+import gc
+import marshal
+import os
+import struct
+import zlib
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+from eventlet import patcher
+
+from timebomb.player.model import Player
+from timebomb.player.service import PLAYERS, PlayerService
+import timebomb.room.service as room_service
+from timebomb.room.model import Room
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+
+threading = patcher.original("threading")
+
+HEADER = struct.Struct("<II")
+SNAPSHOT_VERSION = 2
+
+
+@contextmanager
+def paused_gc():
+    """Pause the garbage collector while allocating many long-lived objects.
+
+    Snapshots and restores create millions of containers, which would
+    otherwise trigger a full collection every few thousand rooms.
+
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def pack_room(room: Room) -> tuple:
+    players = tuple(
+        (
+            player.id,
+            player.name,
+            player.token,
+            str(player.team) if player.team else None,
+            [int(count) for count in player.cards],
+        )
+        for player in room.players
+    )
+    cutter = room.players.index(room.cutter) if room.cutter else -1
+
+    return (
+        room.id,
+        room.name,
+        room.seed,
+        room.status,
+        room.version,
+        room.winning_team,
+        {card: int(count) for card, count in room.cards_found.items()},
+        {card: int(count) for card, count in room.cards_left.items()},
+        cutter,
+        players,
+        room.rng.bit_generator.state,
+    )
+
+
+def unpack_room(data: tuple) -> Room:
+    (
+        id,
+        name,
+        seed,
+        status,
+        version,
+        winning_team,
+        cards_found,
+        cards_left,
+        cutter,
+        players,
+        state,
+    ) = data
+
+    rng = np.random.Generator(np.random.PCG64())
+    rng.bit_generator.state = state
+
+    room = Room(
+        name=name,
+        id=id,
+        players=[
+            Player(
+                name=name,
+                id=player_id,
+                room_id=id,
+                token=token,
+                team=team,
+                cards=cards,
+            )
+            for player_id, name, token, team, cards in players
+        ],
+        cards_found=cards_found,
+        cards_left=cards_left,
+        status=status,
+        winning_team=winning_team,
+        version=version,
+        seed=seed,
+        rng=rng,
+    )
+    if cutter >= 0:
+        room.cutter = room.players[cutter]
+
+    return room
+
+
+def frame(record: tuple) -> bytes:
+    payload = marshal.dumps(record)
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path: str) -> tuple:
+    """Read the records of a segment.
+
+    Reading stops at the first truncated or corrupted record.
+
+    Returns:
+        tuple: The list of valid records and their length in bytes.
+
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    records = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        end = start + length
+        payload = data[start:end]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+
+        records.append(marshal.loads(payload))
+        offset += HEADER.size + length
+
+    return records, offset
+
+
+def apply_record(record: tuple):
+    """Apply an event to the registered rooms, like the handlers did."""
+    event, room_id, *args = record
+    if event == "create":
+        name, seed = args
+        RoomService.create(name, seed=seed, id=room_id)
+        return
+
+    room = RoomService.get_by_id(room_id)
+    if not room:
+        return
+
+    if event == "join":
+        player_id, name, token = args
+        player = PlayerService.create({"name": name, "id": player_id, "token": token})
+        RoomService.add_player(room, player)
+
+    elif event == "leave":
+        player = room.get_player(args[0])
+        if player:
+            RoomService.remove_player(room, player)
+            if PLAYERS.get(player.id) is player:
+                PlayerService.delete(player)
+
+    elif event == "start":
+        RoomService.start(room)
+
+    elif event == "cut":
+        from_id, to_id, card = args
+        cutted = RoomService.cut_card(
+            room, room.get_player(from_id), room.get_player(to_id)
+        )
+        if cutted != card:
+            raise ValueError(f"Journal diverged in room {room_id}.")
+
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+    elif event == "rename":
+        old_id, new_id = args
+        player = room.get_player(old_id)
+        if player:
+            RoomService.rename_player(room, player, new_id)
+
+    elif event == "delete":
+        for player in room.players:
+            if PLAYERS.get(player.id) is player:
+                PlayerService.delete(player)
+        RoomService.delete(room)
+
+
+class Journal:
+    """Durable log of the room events of this process.
+
+    Usage:
+        journal = Journal("/var/lib/timebomb")
+        journal.restore()
+        journal.start()
+        room_service.JOURNAL = journal
+
+    Attributes:
+        path (str): Directory of the segments and snapshots.
+        interval (float): Maximum delay before records are fsync'd.
+        seq (int): Number of the next record.
+        chunk (int): Number of rooms packed at once by a snapshot.
+
+    """
+
+    def __init__(self, path: str, interval: float = 0.05, chunk: int = 1000):
+        self.path = path
+        self.interval = interval
+        self.seq = 0
+        self.chunk = chunk
+
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._file = None
+        self._stopped = False
+
+        os.makedirs(path, exist_ok=True)
+
+    def segment_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"journal-{seq:020d}.log")
+
+    def snapshot_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"snapshot-{seq:020d}.bin")
+
+    def files(self, prefix: str) -> list:
+        """Return the sorted (seq, path) of the files starting with `prefix`."""
+        files = []
+        for name in os.listdir(self.path):
+            if name.startswith(prefix + "-") and not name.endswith(".tmp"):
+                seq = int(name.split(".")[0].split("-")[1])
+                files.append((seq, os.path.join(self.path, name)))
+        return sorted(files)
+
+    def record(self, *record):
+        self.seq += 1
+        self._pending.append(("record", frame(record)))
+
+    def create(self, room: Room):
+        self.record("create", room.id, room.name, room.seed)
+
+    def delete(self, room: Room):
+        self.record("delete", room.id)
+
+    def rename(self, room: Room, old_id: str, new_id: str):
+        self.record("rename", room.id, old_id, new_id)
+
+    def transition(self, room: Room, event: str, **details):
+        if event == "join":
+            player = details["player"]
+            self.record("join", room.id, player.id, player.name, player.token)
+        elif event == "leave":
+            self.record("leave", room.id, details["player"].id)
+        elif event == "start":
+            self.record("start", room.id, room.seed)
+        elif event == "cut":
+            self.record(
+                "cut",
+                room.id,
+                details["from_player"].id,
+                details["to_player"].id,
+                details["card"],
+            )
+
+    def snapshot(self, rooms):
+        """Queue a snapshot of `rooms`, the next records go to a new segment."""
+        for _ in self.snapshot_chunks(rooms):
+            pass
+
+    def snapshot_chunks(self, rooms):
+        """Snapshot `rooms` by chunks of `chunk` rooms, yielding between them.
+
+        Only the ids are copied at once: a room changed before its chunk is
+        packed as it is then, and one deleted meanwhile is left out.
+
+        """
+        seq = self.seq
+        self._pending.append(("rotate", seq))
+        ids = [room.id for room in rooms]
+
+        packed = []
+        for start in range(0, len(ids), self.chunk):
+            end = start + self.chunk
+            with paused_gc():
+                for id in ids[start:end]:
+                    room = rooms.get(id)
+                    if room is not None:
+                        packed.append((self.seq, pack_room(room)))
+            yield
+
+        self._pending.append(("snapshot", seq, packed))
+        self._wakeup.set()
+
+    def restore(self) -> int:
+        """Load the latest snapshot and replay the segments written after it.
+
+        Must be called before the journal is set as `room_service.JOURNAL`,
+        so restoring does not record the events again.
+
+        Returns:
+            int: The number of restored records.
+
+        """
+        with paused_gc():
+            return self._restore()
+
+    def _restore(self) -> int:
+        seq = 0
+        # The records of a room before it was packed, by room id.
+        skipped = {}
+        snapshots = self.files("snapshot")
+        if snapshots:
+            seq, path = snapshots[-1]
+            with open(path, "rb") as file:
+                version, seq, rooms = marshal.loads(file.read())
+
+            for packed_at, data in rooms:
+                room = unpack_room(data)
+                if packed_at > seq:
+                    skipped[room.id] = packed_at
+                ROOMS.append(room)
+                for player in room.players:
+                    PLAYERS.append(player)
+                OPEN_ROOMS.update(room)
+
+        restored = 0
+        for start, path in self.files("journal"):
+            if start < seq:
+                continue
+
+            seq = start
+            records, _ = read_records(path)
+            for record in records:
+                if seq >= skipped.get(record[1], 0):
+                    apply_record(record)
+                seq += 1
+                restored += 1
+
+        self.seq = seq
+        return restored
+
+    def start(self):
+        self._stopped = False
+        self._open(self.seq)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def flush(self):
+        """Block until every queued record is written and fsync'd."""
+        done = threading.Event()
+        self._pending.append(("flush", done))
+        self._wakeup.set()
+        done.wait()
+
+    def close(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def run_snapshots(self, rooms, interval: float, sleep):
+        """Snapshot `rooms` every `interval` seconds, as a background task."""
+        while not self._stopped:
+            sleep(interval)
+            for _ in self.snapshot_chunks(rooms):
+                sleep(0)
+
+    async def run_snapshots_async(self, rooms, interval: float, sleep):
+        """Same as `run_snapshots`, with an awaitable `sleep`."""
+        while not self._stopped:
+            await sleep(interval)
+            for _ in self.snapshot_chunks(rooms):
+                await sleep(0)
+
+    def _open(self, seq: int):
+        path = self.segment_path(seq)
+        if os.path.exists(path):
+            _, length = read_records(path)
+            os.truncate(path, length)
+
+        self._file = open(path, "ab")
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            stopped = self._stopped
+            self._write()
+            if stopped:
+                self._file.close()
+                return
+
+    def _write(self):
+        buffer = []
+        while self._pending:
+            kind, *args = self._pending.popleft()
+            if kind == "record":
+                buffer.append(args[0])
+                continue
+
+            self._sync(buffer)
+            buffer = []
+            if kind == "rotate":
+                self._file.close()
+                self._open(*args)
+            elif kind == "snapshot":
+                self._write_snapshot(*args)
+            elif kind == "flush":
+                args[0].set()
+
+        self._sync(buffer)
+
+    def _sync(self, buffer: list):
+        if buffer:
+            self._file.write(b"".join(buffer))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _write_snapshot(self, seq: int, rooms: list):
+        data = marshal.dumps((SNAPSHOT_VERSION, seq, rooms))
+        path = self.snapshot_path(seq)
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+
+        directory = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        for prefix in ("journal", "snapshot"):
+            for old_seq, old_path in self.files(prefix):
+                if old_seq < seq:
+                    os.remove(old_path)
+
+
+def open_journal(path: str) -> Journal:
+    """Restore the rooms from `path` and journal the next events there."""
+    journal = Journal(path)
+    journal.restore()
+    journal.start()
+    journal.snapshot(room_service.ROOMS)
+    room_service.JOURNAL = journal
+    return journal
@@ -0,0 +1,158 @@
+import os
+
+from pytest import fixture
+
+import timebomb.room.service as room_service
+from timebomb.conftest import clear
+from timebomb.player.model import Player
+from timebomb.player.serializer import dump_player
+from timebomb.player.service import PLAYERS
+from timebomb.room.journal import Journal, pack_room, unpack_room
+from timebomb.room.serializer import dump_room
+from timebomb.room.service import RoomService, ROOMS, OPEN_ROOMS
+
+
+@fixture
+def journal(tmp_path, models, monkeypatch):
+    journal = Journal(str(tmp_path))
+    journal.start()
+    monkeypatch.setattr(room_service, "JOURNAL", journal)
+    yield journal
+    journal.close()
+
+
+def restore(path: str) -> Journal:
+    room_service.JOURNAL = None
+    clear()
+    journal = Journal(path)
+    journal.restore()
+    return journal
+
+
+def make_game(nb_players: int = 4, prefix: str = "id"):
+    room = RoomService.create("journal", seed=nb_players)
+    for i in range(nb_players):
+        player = Player(f"user_{i}", f"{prefix}_{i}")
+        PLAYERS.append(player)
+        RoomService.add_player(room, player)
+    RoomService.start(room)
+    return room
+
+
+def cut(room):
+    cutter = room.cutter
+    target = next(p for p in room.players if p is not cutter and sum(p.cards))
+    RoomService.cut_card(room, cutter, target)
+    if room.status != "ENDED":
+        RoomService.distribute_cards(room)
+
+
+def state() -> tuple:
+    return (
+        sorted((room.id, str(dump_room(room))) for room in ROOMS),
+        sorted(str(dump_player(player)) for player in PLAYERS),
+        sorted((player.room_id, player.token) for player in PLAYERS),
+        sorted(room.id for room in OPEN_ROOMS),
+    )
+
+
+def test_pack_room(models):
+    room = make_game()
+    cut(room)
+    unpacked = unpack_room(pack_room(room))
+
+    assert dump_room(unpacked) == dump_room(room)
+    assert unpacked.cutter is unpacked.players[room.players.index(room.cutter)]
+    assert unpacked.rng.integers(1 << 60) == room.rng.integers(1 << 60)
+
+
+def test_Journal_restore(journal: Journal):
+    room = make_game()
+    cut(room)
+    journal.snapshot(ROOMS)
+    cut(room)
+
+    other = make_game(5)
+    RoomService.rename_player(other, other.players[1], "id_new")
+    leaving = other.players[0]
+    RoomService.remove_player(other, leaving)
+    PLAYERS.remove(leaving)
+    waiting = RoomService.create("waiting")
+    PLAYERS.append(Player("user", "id_waiting"))
+    RoomService.add_player(waiting, PLAYERS.get("id_waiting"))
+    deleted = RoomService.create("deleted")
+    RoomService.delete(deleted)
+
+    journal.flush()
+    expected = state()
+    rng = room.rng.integers(1 << 60)
+
+    restored = restore(journal.path)
+    assert state() == expected
+    assert restored.seq == journal.seq
+    assert RoomService.get_by_id(room.id).rng.integers(1 << 60) == rng
+    assert RoomService.get_by_id(other.id).get_player("id_new") is PLAYERS.get("id_new")
+
+
+def test_Journal_snapshot(journal: Journal):
+    room = make_game()
+    journal.snapshot(ROOMS)
+    cut(room)
+    journal.snapshot(ROOMS)
+    journal.flush()
+
+    seq = journal.seq
+    assert sorted(os.listdir(journal.path)) == [
+        f"journal-{seq:020d}.log",
+        f"snapshot-{seq:020d}.bin",
+    ]
+
+    expected = state()
+    restored = restore(journal.path)
+    assert state() == expected and restored.seq == seq
+
+
+def test_Journal_snapshot_chunks(journal: Journal):
+    journal.chunk = 1
+    rooms = [make_game(4 + i, f"id{i}") for i in range(3)]
+    chunks = journal.snapshot_chunks(ROOMS)
+
+    next(chunks)
+    cut(rooms[0])
+    cut(rooms[1])
+    next(chunks)
+    for player in rooms[2].players:
+        PLAYERS.remove(player)
+    RoomService.delete(rooms[2])
+    for _ in chunks:
+        pass
+    cut(rooms[1])
+    journal.flush()
+
+    expected = state()
+    restored = restore(journal.path)
+    assert state() == expected and restored.seq == journal.seq
+    assert len(os.listdir(journal.path)) == 2
+
+
+def test_Journal_torn_tail(journal: Journal):
+    room = make_game()
+    cut(room)
+    journal.flush()
+    expected = state()
+
+    with open(journal.segment_path(0), "ab") as file:
+        file.write(b"\x10\x00\x00\x00torn")
+
+    restored = restore(journal.path)
+    assert state() == expected
+
+    restored.start()
+    room_service.JOURNAL = restored
+    cut(RoomService.get_by_id(room.id))
+    restored.close()
+    expected = state()
+
+    assert state() == expected
+    restore(journal.path)
+    assert state() == expected
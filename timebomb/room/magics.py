@@ -1,3 +1,5 @@
+CARDS = ("B", "D", "S")
+
 NBPLAYER_TO_DECK = {
     4: {"B": 1, "D": 4, "S": 15},
     5: {"B": 1, "D": 5, "S": 19},
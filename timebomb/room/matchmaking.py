@@ -0,0 +1,61 @@
+import timebomb.room.magics as magics
+
+
+class OpenRooms:
+    """Index of the rooms new players can join.
+
+    Open rooms are bucketed by their number of players, so finding the best
+    room to fill is a walk over at most `MAX_PLAYERS` buckets whatever the
+    number of rooms. Inside a bucket, rooms are kept in the order they
+    entered it.
+
+    The index is maintained incrementally: call `update` whenever a room
+    gains or loses a player or changes status, and `discard` when it is
+    deleted.
+
+    """
+
+    def __init__(self):
+        self._buckets = [{} for _ in range(magics.MAX_PLAYERS)]
+        self._locations = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __iter__(self):
+        for bucket in reversed(self._buckets):
+            yield from list(bucket.values())
+
+    def __contains__(self, room) -> bool:
+        return room.id in self._locations
+
+    def best(self):
+        """Return the fullest open room, or None if no room is open."""
+        for bucket in reversed(self._buckets):
+            if bucket:
+                return next(iter(bucket.values()))
+
+    def update(self, room):
+        location = self._locations.get(room.id)
+        target = room.nb_players if room.is_open else None
+
+        if location == target:
+            return
+
+        if location is not None:
+            del self._buckets[location][room.id]
+            del self._locations[room.id]
+
+        if target is not None:
+            self._buckets[target][room.id] = room
+            self._locations[room.id] = target
+
+    def discard(self, room):
+        location = self._locations.pop(room.id, None)
+        if location is not None:
+            del self._buckets[location][room.id]
+
+    def clear(self):
+        self._locations.clear()
+        for bucket in self._buckets:
+            bucket.clear()
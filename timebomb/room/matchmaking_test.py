@@ -0,0 +1,73 @@
+from pytest import fixture
+
+from timebomb.room.model import Room
+from timebomb.room.matchmaking import OpenRooms
+import timebomb.room.magics as magics
+
+
+def make_room(marker=None, nb_players=0):
+    room = Room(name=f"room_{marker}", id=f"id_{marker}")
+    room.players = list(range(nb_players))
+    return room
+
+
+@fixture
+def open_rooms() -> OpenRooms:
+    return OpenRooms()
+
+
+def test_OpenRooms_empty(open_rooms: OpenRooms):
+    assert len(open_rooms) == 0
+    assert open_rooms.best() is None
+    assert list(open_rooms) == []
+
+
+def test_OpenRooms_best_is_fullest(open_rooms: OpenRooms):
+    room1 = make_room(1, nb_players=1)
+    room2 = make_room(2, nb_players=3)
+    room3 = make_room(3, nb_players=3)
+
+    for room in (room1, room2, room3):
+        open_rooms.update(room)
+
+    assert len(open_rooms) == 3
+    assert open_rooms.best() is room2
+    assert list(open_rooms) == [room2, room3, room1]
+
+
+def test_OpenRooms_update_moves_room(open_rooms: OpenRooms):
+    room1 = make_room(1, nb_players=1)
+    room2 = make_room(2, nb_players=2)
+    open_rooms.update(room1)
+    open_rooms.update(room2)
+
+    room1.players.append(1)
+    open_rooms.update(room1)
+    assert open_rooms.best() is room2
+    assert list(open_rooms) == [room2, room1]
+
+    room2.players.pop()
+    open_rooms.update(room2)
+    assert open_rooms.best() is room1
+
+
+def test_OpenRooms_update_drops_closed_room(open_rooms: OpenRooms):
+    room = make_room(1, nb_players=magics.MAX_PLAYERS - 1)
+    open_rooms.update(room)
+    assert room in open_rooms
+
+    room.players.append(magics.MAX_PLAYERS)
+    open_rooms.update(room)
+    assert room not in open_rooms
+    assert open_rooms.best() is None
+
+
+def test_OpenRooms_discard(open_rooms: OpenRooms):
+    room = make_room(1, nb_players=2)
+    open_rooms.update(room)
+
+    open_rooms.discard(room)
+    open_rooms.discard(room)
+
+    assert room not in open_rooms
+    assert len(open_rooms) == 0
@@ -1,8 +1,56 @@
 from dataclasses import dataclass, field
+
+import numpy as np
+
 import timebomb.room.magics as magics
+from timebomb.room.cards import CardCounts
+from timebomb.room.seeds import make_rng, spawn_seed
+
+TRANSITIONS = {
+    "WAITING": ("join", "leave"),
+    "READY": ("join", "leave", "start"),
+    "PLAYING": ("leave", "cut"),
+    "ENDED": ("leave",),
+}
+
+TRANSITION_HOOKS = []
+
+WIN_REASONS = (
+    None,
+    ("Moriarty", "The bomb has been triggered."),
+    ("Sherlock", "The bomb has been fully defused."),
+    ("Moriarty", "The bomb has not been defused in time."),
+)
+
+
+def winning_code(bombs_found, defusers_found, nb_cards_left, nb_players):
+    """Return the index in `WIN_REASONS` of the game outcome.
+
+    Works on scalars as well as on numpy arrays of games, so the simulator
+    and `Room` share the same rules. Conditions are combined arithmetically
+    to keep their priority without branching: a triggered bomb wins over a
+    defused one, which wins over a timeout.
+
+    """
+    triggered = bombs_found > 0
+    defused = defusers_found == nb_players
+    timeout = nb_cards_left <= nb_players
+    return triggered * 1 + (1 - triggered) * (defused * 2 + (1 - defused) * timeout * 3)
+
+
+def on_transition(hook):
+    """Register a hook called after every room transition.
+
+    Hooks are called as `hook(room, event, previous, **details)` where
+    `previous` is the status before the transition and `details` are the
+    keyword arguments given to `Room.transition`.
+
+    """
+    TRANSITION_HOOKS.append(hook)
+    return hook
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     """Room Model.
 
@@ -13,8 +61,15 @@ class Room:
         players (list): List of Player in this room.
         cutter (Player): Current cutter player.
 
-        cards_found (dict): Counter dict of card found.
-        cards_left (dict): Counter dict of card left.
+        cards_found (CardCounts): Counter of the cards found.
+        cards_left (CardCounts): Counter of the cards left.
+
+        status (str): One of WAITING, READY, PLAYING or ENDED.
+        winning_team (tuple): Winning team and reason. None until the end.
+        version (int): Incremented on every transition.
+
+        seed (int): Seed of the room random generator. Spawned if None.
+        rng (Generator): The room random generator, created from the seed.
 
     """
 
@@ -22,42 +77,85 @@ class Room:
     id: str
 
     players: list = field(default_factory=list)
-    cutter = None
 
-    cards_found: dict = field(default_factory=dict)
-    cards_left: dict = field(default_factory=dict)
+    cards_found: CardCounts = field(default_factory=CardCounts)
+    cards_left: CardCounts = field(default_factory=CardCounts)
+
+    status: str = "WAITING"
+    winning_team: tuple = None
+    version: int = 0
+
+    seed: int = None
+    rng: np.random.Generator = field(default=None, repr=False, compare=False)
+    cutter: object = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.cards_found, CardCounts):
+            self.cards_found = CardCounts(self.cards_found)
+        if not isinstance(self.cards_left, CardCounts):
+            self.cards_left = CardCounts(self.cards_left)
+
+        if self.seed is None:
+            self.seed = spawn_seed()
+
+        if self.rng is None:
+            self.rng = make_rng(self.seed)
 
     @property
     def nb_players(self) -> int:
         return len(self.players)
 
+    def get_player(self, id: str):
+        for player in self.players:
+            if player.id == id:
+                return player
+
     @property
     def is_open(self) -> bool:
         return (
             self.status in ["WAITING", "READY"] and self.nb_players < magics.MAX_PLAYERS
         )
 
-    @property
-    def winning_team(self) -> str:
-        if self.cards_found.get("B", 0) > 0:
-            return "Moriarty", "The bomb has been triggered."
+    def compute_winning_team(self) -> tuple:
+        if not self.cards_left and not self.cards_found:
+            return
+
+        code = winning_code(
+            self.cards_found.get("B", 0),
+            self.cards_found.get("D", 0),
+            sum(self.cards_left.values()),
+            self.nb_players,
+        )
+        return WIN_REASONS[code]
 
-        if self.nb_players and self.cards_found.get("D", 0) == self.nb_players:
-            return "Sherlock", "The bomb has been fully defused."
+    def transition(self, event: str, **details) -> str:
+        """Update status and winning team after a join, leave, start or cut.
 
-        if self.cards_left and sum(self.cards_left.values()) <= self.nb_players:
-            return "Moriarty", "The bomb has not been defused in time."
+        Args:
+            event (str): The event which happened in the room.
+            **details: Event details forwarded to the transition hooks.
 
-    @property
-    def status(self) -> str:
-        if self.nb_players < magics.MIN_PLAYERS:
-            return "WAITING"
+        Raises:
+            ValueError: If the event is not allowed in the current status.
+
+        Returns:
+            str: The new room status.
+
+        """
+        previous = self.status
+        if event not in TRANSITIONS[previous]:
+            raise ValueError(f"Can not {event} a {previous} room.")
+
+        if previous in ["WAITING", "READY"] and event != "start":
+            enough = self.nb_players >= magics.MIN_PLAYERS
+            self.status = "READY" if enough else "WAITING"
 
-        if self.nb_players >= magics.MIN_PLAYERS and not self.cards_left:
-            return "READY"
+        elif event in ["start", "cut"]:
+            self.winning_team = self.compute_winning_team()
+            self.status = "ENDED" if self.winning_team else "PLAYING"
 
-        if self.winning_team:
-            return "ENDED"
+        self.version += 1
+        for hook in TRANSITION_HOOKS:
+            hook(self, event, previous, **details)
 
-        if self.cards_left:
-            return "PLAYING"
+        return self.status
@@ -1,5 +1,6 @@
-from pytest import fixture
-from timebomb.room.model import Room
+from pytest import fixture, raises
+from timebomb.room.cards import CardCounts
+from timebomb.room.model import Room, TRANSITION_HOOKS, on_transition
 import timebomb.room.magics as magics
 
 
@@ -16,8 +17,9 @@ def test_Room_create(room: Room):
     assert type(room.players) is list and not room.players
     assert room.cutter is None
 
-    assert type(room.cards_found) is dict and not room.cards_found
-    assert type(room.cards_left) is dict and not room.cards_left
+    assert type(room.cards_found) is CardCounts and not room.cards_found
+    assert type(room.cards_left) is CardCounts and not room.cards_left
+    assert not hasattr(room, "__dict__")
 
     assert room.status == "WAITING"
     assert room.nb_players == 0
@@ -25,27 +27,87 @@ def test_Room_create(room: Room):
     assert room.winning_team is None
 
 
-def test_Room_status(room: Room):
-    assert room.status == "WAITING"
-
-    room.players = list(range(magics.MIN_PLAYERS - 1))
-    assert room.status == "WAITING"
-
-    room.players.append(4)
-    assert room.status == "READY"
+def test_Room_compute_winning_team(room: Room):
+    room.players = list(range(4))
+    assert room.compute_winning_team() is None
 
     room.cards_left = {"card_value": 10}
-    assert room.status == "PLAYING"
+    assert room.compute_winning_team() is None
 
     room.cards_left = {"card_value": 4}
-    assert room.status == "ENDED"
+    assert room.compute_winning_team()[0] == "Moriarty"
 
     room.cards_left = {"card_value": 10}
     room.cards_found = {"B": 1}
-    assert room.status == "ENDED"
+    assert room.compute_winning_team()[0] == "Moriarty"
+
+    room.cards_found = {"D": 3}
+    assert room.compute_winning_team() is None
+
+    room.cards_found = {"D": 4}
+    assert room.compute_winning_team()[0] == "Sherlock"
+
+
+def test_Room_transition(room: Room):
+    for i in range(magics.MIN_PLAYERS - 1):
+        room.players.append(i)
+        assert room.transition("join") == "WAITING"
+
+    room.players.append(magics.MIN_PLAYERS)
+    assert room.transition("join") == "READY"
+
+    room.players.pop()
+    assert room.transition("leave") == "WAITING"
+
+    room.players.append(magics.MIN_PLAYERS)
+    assert room.transition("join") == "READY"
+
+    room.cards_left = {"card_value": 10}
+    assert room.transition("start") == "PLAYING"
+    assert not room.is_open
 
     room.cards_found = {"D": 3}
-    assert room.status == "PLAYING"
+    assert room.transition("cut") == "PLAYING"
+    assert room.winning_team is None
 
     room.cards_found = {"D": 4}
-    assert room.status == "ENDED"
+    assert room.transition("cut") == "ENDED"
+    assert room.winning_team[0] == "Sherlock"
+
+    room.players.pop()
+    assert room.transition("leave") == "ENDED"
+    assert not room.is_open
+
+    assert room.version == magics.MIN_PLAYERS + 6
+
+
+def test_Room_transition_not_allowed(room: Room):
+    with raises(ValueError):
+        room.transition("start")
+
+    with raises(ValueError):
+        room.transition("cut")
+
+    room.status = "PLAYING"
+    with raises(ValueError):
+        room.transition("join")
+
+    room.status = "ENDED"
+    with raises(ValueError):
+        room.transition("cut")
+
+
+def test_Room_transition_hooks(room: Room):
+    calls = []
+
+    @on_transition
+    def hook(room, event, previous, **details):
+        calls.append((room, event, previous, details))
+
+    try:
+        room.players = list(range(magics.MIN_PLAYERS))
+        room.transition("join", player="player")
+    finally:
+        TRANSITION_HOOKS.remove(hook)
+
+    assert calls == [(room, "join", "WAITING", {"player": "player"})]
@@ -0,0 +1,107 @@
+"""Expire finished and idle rooms.
+
+Every room has one timer in a `TimingWheel`, pushed back on each of its
+transitions: `ended_ttl` seconds once the room is ENDED, `idle_ttl`
+seconds otherwise. When the timer fires the room is deleted with its
+players, like when its last player disconnects, and `close` is called so
+the server can notify the clients and close the Socket.IO room.
+
+Timers are armed with the version of the room. With a store shared by
+several workers, the room may have been played on another worker since:
+when it fires, a room reloaded at another version is not reaped, its timer
+is armed again instead.
+
+"""
+
+import timebomb.room.service as room_service
+from timebomb.metrics import METRICS
+from timebomb.player.service import PlayerService
+from timebomb.room.model import Room
+from timebomb.room.service import RoomService
+from timebomb.timers import TimingWheel
+
+METRICS.describe("timebomb_reaped_rooms_total", "counter", "Rooms expired by reason.")
+METRICS.describe("timebomb_reaped_players_total", "counter", "Players of reaped rooms.")
+
+
+class Reaper:
+    """Schedule the expiry of every room.
+
+    Usage:
+        reaper = Reaper(wheel, close=namespace.close)
+        reaper.watch(ROOMS)
+        room_service.REAPER = reaper
+
+    Attributes:
+        wheel (TimingWheel): The scheduler of the timers.
+        ended_ttl (float): Seconds an ENDED room is kept.
+        idle_ttl (float): Seconds a room is kept without any transition.
+        close (callable): Called as `close(room, reason)` after a room is
+            reaped.
+        reclaimed (dict): Number of reaped rooms by reason, and of players.
+
+    """
+
+    def __init__(
+        self,
+        wheel: TimingWheel,
+        ended_ttl: float = 60,
+        idle_ttl: float = 1800,
+        close=None,
+    ):
+        self.wheel = wheel
+        self.ended_ttl = ended_ttl
+        self.idle_ttl = idle_ttl
+        self.close = close
+        self.reclaimed = {"ended": 0, "idle": 0, "players": 0}
+
+    def touch(self, room: Room):
+        """Push back the expiry of a room, after a transition."""
+        ttl = self.ended_ttl if room.status == "ENDED" else self.idle_ttl
+        room_id, version = room.id, room.version
+        self.wheel.schedule(
+            ("reap", room_id), ttl, lambda: self.expire(room_id, version)
+        )
+
+    def forget(self, room: Room):
+        self.wheel.cancel(("reap", room.id))
+
+    def watch(self, rooms):
+        """Schedule the expiry of existing rooms, restored on boot."""
+        for room in rooms:
+            self.touch(room)
+
+    def expire(self, room_id: str, version: int = None) -> Room:
+        """Reap a room, unless it changed since `version`."""
+        with RoomService.transaction(room_id) as room:
+            if not room:
+                return
+
+            if version is not None and room.version != version:
+                self.touch(room)
+                return
+
+            reason = "ended" if room.status == "ENDED" else "idle"
+            players = list(room.players)
+            for player in players:
+                RoomService.remove_player(room, player)
+                if PlayerService.get_by_id(player.id):
+                    PlayerService.delete(player)
+            RoomService.delete(room)
+
+        self.reclaimed[reason] += 1
+        self.reclaimed["players"] += len(players)
+        METRICS.inc("timebomb_reaped_rooms_total", (("reason", reason),))
+        METRICS.inc("timebomb_reaped_players_total", (), len(players))
+
+        if self.close:
+            self.close(room, reason)
+        return room
+
+
+def start_reaper(wheel: TimingWheel, **kwargs) -> Reaper:
+    """Reap the registered rooms and the next ones with `wheel`."""
+    reaper = Reaper(wheel, **kwargs)
+    reaper.watch(room_service.ROOMS)
+    room_service.REAPER = reaper
+    return reaper
@@ -0,0 +1,117 @@
+from pytest import fixture
+
+import timebomb.room.service as room_service
+from timebomb.conftest import Clock
+from timebomb.player.model import Player
+from timebomb.player.service import PLAYERS
+from timebomb.room.reaper import Reaper
+from timebomb.room.service import OPEN_ROOMS, ROOMS, RoomService
+from timebomb.timers import TimingWheel
+
+
+@fixture
+def reaper(clock: Clock, models, monkeypatch):
+    closed = []
+    wheel = TimingWheel(tick=1, slots=16, clock=clock)
+    reaper = Reaper(
+        wheel,
+        ended_ttl=10,
+        idle_ttl=100,
+        close=lambda room, reason: closed.append((room.id, reason)),
+    )
+    reaper.closed = closed
+    monkeypatch.setattr(room_service, "REAPER", reaper)
+    return reaper
+
+
+def wait(reaper: Reaper, clock: Clock, seconds: float):
+    for _ in range(int(seconds)):
+        clock.now += 1
+        for callback in reaper.wheel.advance():
+            callback()
+
+
+def make_room(name: str, nb_players: int) -> tuple:
+    room = RoomService.create(name)
+    for i in range(nb_players):
+        player = Player(f"user_{i}", f"{name}_{i}")
+        PLAYERS.append(player)
+        RoomService.add_player(room, player)
+    return room
+
+
+def test_Reaper_expires_ended_rooms(reaper: Reaper, clock: Clock):
+    room = make_room("ended", 4)
+    RoomService.start(room)
+    while room.status == "PLAYING":
+        target = next(p for p in room.players if p is not room.cutter and sum(p.cards))
+        RoomService.cut_card(room, room.cutter, target)
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+    wait(reaper, clock, 9)
+    assert room in ROOMS
+
+    wait(reaper, clock, 1)
+    assert room not in ROOMS and len(PLAYERS) == 0
+    assert reaper.closed == [(room.id, "ended")]
+    assert reaper.reclaimed == {"ended": 1, "idle": 0, "players": 4}
+    assert len(reaper.wheel) == 0
+
+
+def test_Reaper_expires_idle_rooms(reaper: Reaper, clock: Clock):
+    idle = make_room("idle", 1)
+    active = make_room("active", 1)
+
+    wait(reaper, clock, 60)
+    player = Player("user", "late")
+    PLAYERS.append(player)
+    RoomService.add_player(active, player)
+
+    wait(reaper, clock, 40)
+    assert idle not in ROOMS and idle not in OPEN_ROOMS
+    assert active in ROOMS and PLAYERS.get("active_0")
+
+    wait(reaper, clock, 60)
+    assert active not in ROOMS and len(PLAYERS) == 0
+    assert reaper.closed == [(idle.id, "idle"), (active.id, "idle")]
+    assert reaper.reclaimed == {"ended": 0, "idle": 2, "players": 3}
+
+
+def test_Reaper_forgets_deleted_rooms(reaper: Reaper, clock: Clock):
+    room = make_room("deleted", 0)
+    assert len(reaper.wheel) == 1
+
+    RoomService.delete(room)
+    assert len(reaper.wheel) == 0
+
+
+def test_Reaper_watch(reaper: Reaper, clock: Clock, monkeypatch):
+    monkeypatch.setattr(room_service, "REAPER", None)
+    rooms = [make_room(f"restored-{i}", 0) for i in range(3)]
+    assert len(reaper.wheel) == 0
+
+    reaper.watch(ROOMS)
+    wait(reaper, clock, 100)
+    assert len(ROOMS) == 0
+    assert [room_id for room_id, _ in reaper.closed] == [room.id for room in rooms]
+
+
+def test_Reaper_rearms_rooms_changed_elsewhere(
+    reaper: Reaper, clock: Clock, monkeypatch
+):
+    room = make_room("shared", 1)
+
+    # Another worker sharing the store joins the room, without this reaper.
+    monkeypatch.setattr(room_service, "REAPER", None)
+    player = Player("user", "remote")
+    PLAYERS.append(player)
+    RoomService.add_player(room, player)
+    monkeypatch.setattr(room_service, "REAPER", reaper)
+
+    wait(reaper, clock, 100)
+    assert room in ROOMS and not reaper.closed and len(reaper.wheel) == 1
+
+    wait(reaper, clock, 100)
+    assert room not in ROOMS
+    assert reaper.closed == [(room.id, "idle")]
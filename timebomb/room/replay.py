@@ -0,0 +1,43 @@
+from timebomb.player.model import Player
+from timebomb.room.model import Room
+from timebomb.room.service import RoomService
+
+
+def replay(seed: int, players: list, cuts: list, name: str = "replay") -> Room:
+    """Replay a game from the room seed and the ordered list of cuts.
+
+    The room is not registered, so replaying does not affect running games.
+    Cuts are applied like `MainNamespace.on_cut` does: cards are
+    redistributed after every cut which did not end the game.
+
+    Args:
+        seed (int): The room seed.
+        players (list): The (name, id) of each player, in join order.
+        cuts (list): The (from id, to id) of each cut, in play order.
+        name (str): The room name.
+
+    Raises:
+        ValueError: If the game can not be started or a cut is invalid.
+
+    Returns:
+        Room: The room after the last cut.
+
+    """
+    room = Room(name=name, id=f"replay-{seed:032X}", seed=seed)
+
+    for player_name, player_id in players:
+        RoomService.add_player(room, Player(player_name, player_id))
+
+    if not RoomService.start(room):
+        raise ValueError("Can not start the game.")
+
+    by_id = {player.id: player for player in room.players}
+    for from_id, to_id in cuts:
+        card = RoomService.cut_card(room, by_id.get(from_id), by_id.get(to_id))
+        if not card:
+            raise ValueError(f"Invalid cut from {from_id} to {to_id}.")
+
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+    return room
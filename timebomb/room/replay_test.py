@@ -0,0 +1,75 @@
+from timebomb.player.model import Player
+from timebomb.player.serializer import dump_player
+from timebomb.room.model import Room
+from timebomb.room.replay import replay
+from timebomb.room.serializer import dump_room, dump_ended_room
+from timebomb.room.service import RoomService, OPEN_ROOMS
+from timebomb.room.seeds import make_rng
+from pytest import raises
+
+
+def play(seed: int, nb_players: int) -> tuple:
+    room = Room(name="replay", id=f"replay-{seed:032X}", seed=seed)
+    players = [(f"user_{i}", f"id_{i}") for i in range(nb_players)]
+    for name, id in players:
+        RoomService.add_player(room, Player(name, id))
+
+    RoomService.start(room)
+
+    policy = make_rng(seed + 1)
+    cuts = []
+    while room.status == "PLAYING":
+        cutter = room.cutter
+        targets = [p for p in room.players if p is not cutter and sum(p.cards)]
+        target = targets[policy.integers(len(targets))]
+
+        RoomService.cut_card(room, cutter, target)
+        cuts.append((cutter.id, target.id))
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+    return room, players, cuts
+
+
+def test_replay():
+    for seed, nb_players in [(1, 4), (2, 6), (3, 8)]:
+        room, players, cuts = play(seed, nb_players)
+        replayed = replay(seed, players, cuts)
+
+        assert dump_room(replayed) == dump_room(room)
+        assert dump_ended_room(replayed) == dump_ended_room(room)
+        for player, replayed_player in zip(room.players, replayed.players):
+            assert dump_player(replayed_player) == dump_player(player)
+
+
+def test_replay_prefix():
+    room, players, cuts = play(4, 5)
+
+    replayed = replay(4, players, cuts[:2])
+
+    assert replayed.version == room.version - len(cuts) + 2
+    assert replayed.cutter.id == cuts[1][1]
+
+
+def test_replay_invalid_cut():
+    _, players, cuts = play(5, 4)
+
+    with raises(ValueError):
+        replay(5, players, [(cuts[0][1], cuts[0][0])])
+
+    with raises(ValueError):
+        replay(5, players[:3], cuts)
+
+
+def test_rooms_have_independent_seeds():
+    assert Room("name", "id1").seed != Room("name", "id2").seed
+
+
+def test_replay_leaves_open_rooms():
+    open_rooms = list(OPEN_ROOMS)
+    room, players, cuts = play(6, 5)
+
+    replay(6, players, cuts)
+    with raises(ValueError):
+        replay(6, players[:1], [])
+    assert list(OPEN_ROOMS) == open_rooms
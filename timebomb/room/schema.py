@@ -16,6 +16,7 @@ class RoomSchema(Schema):
     cards_left = fields.Dict(keys=fields.Str(), values=fields.Int())
 
     status = fields.String(attribute="status")
+    version = fields.Integer(attribute="version")
 
 
 class EndedRoomSchema(Schema):
@@ -32,6 +32,7 @@ def test_RoomSchema_dump():
         "cards_found": {},
         "cards_left": {},
         "status": "WAITING",
+        "version": 0,
     }
 
 
@@ -53,6 +54,7 @@ def test_RoomSchema_dump_with_player():
         "cards_found": {},
         "cards_left": {},
         "status": "WAITING",
+        "version": 0,
     }
 
 
@@ -63,6 +65,8 @@ def test_EndedRoomSchema_dump_with_player():
     player.team = "team1"
     room.players.append(player)
     room.cards_found = {"B": 1}
+    room.status = "PLAYING"
+    room.transition("cut")
 
     schema = EndedRoomSchema()
     room_json = schema.dump(room)
@@ -0,0 +1,19 @@
+import numpy as np
+
+ROOT_SEED = np.random.SeedSequence()
+
+
+def seed_root(entropy: int = None):
+    """Reset the root seed every room seed is spawned from."""
+    global ROOT_SEED
+    ROOT_SEED = np.random.SeedSequence(entropy)
+
+
+def spawn_seed() -> int:
+    """Spawn a new independent 128-bit seed from the root seed."""
+    state = ROOT_SEED.spawn(1)[0].generate_state(2, np.uint64)
+    return int(state[0]) | int(state[1]) << 64
+
+
+def make_rng(seed: int) -> np.random.Generator:
+    return np.random.Generator(np.random.PCG64(seed))
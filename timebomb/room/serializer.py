@@ -0,0 +1,85 @@
+from timebomb.player.serializer import to_str, dump_player_ref
+from timebomb.room.model import Room
+
+
+def dump_counter(counter: dict) -> dict:
+    if counter is None:
+        return None
+    return {str(card): int(count) for card, count in counter.items()}
+
+
+def dump_room(room: Room) -> dict:
+    """Serialize a room, same output as `RoomSchema().dump`."""
+    return {
+        "name": to_str(room.name),
+        "id": to_str(room.id),
+        "players": [dump_player_ref(player) for player in room.players],
+        "cutter": dump_player_ref(room.cutter),
+        "cards_found": dump_counter(room.cards_found),
+        "cards_left": dump_counter(room.cards_left),
+        "status": to_str(room.status),
+        "version": room.version,
+    }
+
+
+def dump_room_delta(room: Room, cards: tuple = (), previous_status: str = None):
+    """Serialize what changed in a room during its last transition.
+
+    Args:
+        room (Room): The room, after the transition.
+        cards (tuple): The cards whose counters changed.
+        previous_status (str): The status before the transition.
+
+    Returns:
+        dict: Room id and version, cutter, changed counters and new status.
+
+    """
+    delta = {
+        "id": to_str(room.id),
+        "version": room.version,
+        "cutter": dump_player_ref(room.cutter),
+    }
+
+    if cards:
+        delta["cards_found"] = {
+            str(card): int(room.cards_found[card]) for card in cards
+        }
+        delta["cards_left"] = {str(card): int(room.cards_left[card]) for card in cards}
+
+    if room.status != previous_status:
+        delta["status"] = to_str(room.status)
+
+    return delta
+
+
+def dump_ended_room(room: Room) -> dict:
+    """Serialize a room, same output as `EndedRoomSchema().dump`."""
+    winning_team = room.winning_team
+    return {
+        "name": to_str(room.name),
+        "id": to_str(room.id),
+        "players": [
+            {
+                "name": to_str(player.name),
+                "id": to_str(player.id),
+                "team": to_str(player.team),
+            }
+            for player in room.players
+        ],
+        "winning_team": (
+            None if winning_team is None else [to_str(item) for item in winning_team]
+        ),
+    }
+
+
+def dump_public_ended_room(room: Room) -> dict:
+    """Serialize an ended room for spectators, without the team of the players."""
+    winning_team = room.winning_team
+    return {
+        "name": to_str(room.name),
+        "id": to_str(room.id),
+        "players": [dump_player_ref(player) for player in room.players],
+        "winning_team": (
+            None if winning_team is None else [to_str(item) for item in winning_team]
+        ),
+    }
@@ -0,0 +1,100 @@
+from pytest import fixture
+
+from timebomb.player.model import Player
+from timebomb.room.model import Room
+from timebomb.room.schema import RoomSchema, EndedRoomSchema
+from timebomb.room.serializer import (
+    dump_room,
+    dump_ended_room,
+    dump_public_ended_room,
+    dump_room_delta,
+)
+from timebomb.room.service import RoomService
+
+
+def make_room(nb_players=0):
+    room = RoomService.create("roomname")
+    for i in range(nb_players):
+        RoomService.add_player(room, Player(f"user_{i}", f"id_{i}"))
+    return room
+
+
+def play_until_end(room: Room):
+    while room.status == "PLAYING":
+        target = next(p for p in room.players if p is not room.cutter and len(p.hand))
+        RoomService.cut_card(room, room.cutter, target)
+        RoomService.distribute_cards(room)
+
+
+@fixture
+def rooms(models):
+    waiting = make_room(2)
+    ready = make_room(4)
+
+    playing = make_room(5)
+    RoomService.start(playing)
+    RoomService.cut_card(playing, playing.cutter, playing.players[1])
+
+    ended = make_room(6)
+    RoomService.start(ended)
+    play_until_end(ended)
+
+    return [Room("name", "id"), waiting, ready, playing, ended]
+
+
+def test_dump_room_parity(rooms: list):
+    schema = RoomSchema()
+
+    for room in rooms:
+        assert dump_room(room) == schema.dump(room)
+
+
+def test_dump_ended_room_parity(rooms: list):
+    schema = EndedRoomSchema()
+
+    assert rooms[-1].status == "ENDED"
+    for room in rooms:
+        assert dump_ended_room(room) == schema.dump(room)
+
+
+def test_dump_public_ended_room(rooms: list):
+    for room in rooms:
+        json = dump_public_ended_room(room)
+        ended = dump_ended_room(room)
+
+        assert json["winning_team"] == ended["winning_team"]
+        assert json["players"] == [
+            {"name": player["name"], "id": player["id"]} for player in ended["players"]
+        ]
+
+
+def test_dump_room_native_types(rooms: list):
+    json = dump_room(rooms[3])
+
+    assert all(type(count) is int for count in json["cards_found"].values())
+    assert all(type(count) is int for count in json["cards_left"].values())
+
+
+def test_dump_room_delta(rooms: list):
+    room = make_room(4)
+    RoomService.start(room)
+
+    version = room.version
+    cutter = room.cutter
+    target = room.players[1]
+    target.hand = ["S"]
+
+    card = RoomService.cut_card(room, cutter, target)
+    delta = dump_room_delta(room, (card,), "PLAYING")
+
+    assert room.version == version + 1
+    assert delta == {
+        "id": room.id,
+        "version": room.version,
+        "cutter": {"name": target.name, "id": target.id},
+        "cards_found": {"S": 1},
+        "cards_left": {"S": 14},
+    }
+
+    delta = dump_room_delta(room, previous_status="READY")
+    assert delta["status"] == "PLAYING" and "cards_found" not in delta
@@ -1,57 +1,221 @@
+import functools
+import os
 import random
+import sys
+import time
 
 import numpy as np
 
-from timebomb.room.model import Room
+from timebomb.room.model import Room, on_transition
+from timebomb.room.cards import CardCounts, deal, draw, to_counts
+from timebomb.room.matchmaking import OpenRooms
 import timebomb.room.magics as magics
+from timebomb.store import MemoryStore, create_store
+from timebomb.store.aio import on_loop
+from timebomb.player.service import PLAYERS
 
-ROOMS = []
+ROOMS = create_store(os.environ.get("TIMEBOMB_STORE"), "rooms", indexes=("name",))
+OPEN_ROOMS = OpenRooms()
+SHARD = None
+JOURNAL = None
+REAPER = None
+TURNS = None
+OPEN_ROOMS_REFRESH = 5
+OPEN_ROOMS_REFRESHED = None
+
+
+@on_transition
+def update_open_rooms(room: Room, event: str, previous: str, **details):
+    if room in ROOMS:
+        on_loop(OPEN_ROOMS.update, room)
+
+
+@on_transition
+def journal_transition(room: Room, event: str, previous: str, **details):
+    if JOURNAL and room in ROOMS:
+        on_loop(functools.partial(JOURNAL.transition, room, event, **details))
+
+
+@on_transition
+def reaper_transition(room: Room, event: str, previous: str, **details):
+    if REAPER and room in ROOMS:
+        on_loop(REAPER.touch, room)
+
+
+@on_transition
+def turn_transition(room: Room, event: str, previous: str, **details):
+    if TURNS and room in ROOMS:
+        on_loop(TURNS.transition, room, event)
 
 
 class RoomService:
     @staticmethod
     def get_by_id(id: str) -> Room:
-        for room in ROOMS:
-            if room.id == id:
-                return room
+        return ROOMS.get(id)
 
     @staticmethod
     def get_by_name(name: str) -> Room:
-        for room in ROOMS:
-            if room.name == name:
-                return room
+        return ROOMS.first("name", name)
 
     @staticmethod
     def get_open_rooms() -> list:
-        return [room for room in ROOMS if room.is_open]
+        return list(OPEN_ROOMS)
+
+    @staticmethod
+    def get_open_room() -> Room:
+        """Return the fullest open room, checked against the store.
+
+        Other workers join and delete the rooms of a shared store behind the
+        index of this process. Indexed rooms missing from the store or changed
+        in it are fixed in the index until one is still open, and when none
+        is the index is rebuilt from the store.
+
+        """
+        room = RoomService.check_open_room()
+        if room is None and RoomService.load_open_rooms():
+            room = RoomService.check_open_room()
+        return room
+
+    @staticmethod
+    def check_open_room() -> Room:
+        while True:
+            room = OPEN_ROOMS.best()
+            if room is None:
+                return
+
+            room = RoomService.check_indexed(room, ROOMS.get(room.id))
+            if room:
+                return room
+
+    @staticmethod
+    def check_indexed(room: Room, stored: Room) -> Room:
+        """Return the `stored` version of an indexed room if it is still open.
+
+        Otherwise the index is fixed with `stored` and None is returned.
+
+        """
+        if stored is room:
+            return room
+        if stored and stored.is_open and stored.nb_players == room.nb_players:
+            return stored
+
+        OPEN_ROOMS.discard(room)
+        if stored:
+            OPEN_ROOMS.update(stored)
+
+    @staticmethod
+    def discard_open_room(room: Room):
+        """Drop a room which could not be joined from the open rooms."""
+        OPEN_ROOMS.discard(room)
+
+    @staticmethod
+    def load_open_rooms(force: bool = False) -> bool:
+        """Rebuild the open rooms from a shared store.
+
+        The store is read at most every `OPEN_ROOMS_REFRESH` seconds, unless
+        `force` is set. Memory stores are never read: every change of their
+        rooms goes through the index.
+
+        Returns:
+            bool: Whether the index was rebuilt.
+
+        """
+        rooms = RoomService.read_open_rooms(force)
+        if rooms is None:
+            return False
+
+        RoomService.index_open_rooms(rooms)
+        return True
+
+    @staticmethod
+    def read_open_rooms(force: bool = False) -> list:
+        """Return the rooms of the store to index, None if it is not due."""
+        global OPEN_ROOMS_REFRESHED
+
+        if isinstance(ROOMS, MemoryStore):
+            return None
+
+        now = time.monotonic()
+        last = OPEN_ROOMS_REFRESHED
+        if not force and last is not None and now - last < OPEN_ROOMS_REFRESH:
+            return None
+
+        OPEN_ROOMS_REFRESHED = now
+        return [room for room in ROOMS if not SHARD or SHARD.owns(room.id)]
+
+    @staticmethod
+    def index_open_rooms(rooms: list):
+        OPEN_ROOMS.clear()
+        for room in rooms:
+            OPEN_ROOMS.update(room)
+
+    @staticmethod
+    def transaction(id: str):
+        """Lock a room for a read-modify-write block, see `Store.atomic`."""
+        return ROOMS.atomic(id)
 
     @staticmethod
     def update(room: Room, changes: dict) -> Room:
-        room.__dict__.update(changes)
+        for attr, value in changes.items():
+            setattr(room, attr, value)
+        ROOMS.save(room)
+        if room in ROOMS:
+            on_loop(OPEN_ROOMS.update, room)
         return room
 
     @staticmethod
     def delete(room: Room) -> int:
         id = room.id
         ROOMS.remove(room)
+        on_loop(RoomService.forget, room)
         return id
 
     @staticmethod
-    def create(name: str) -> Room:
-        hash = random.getrandbits(128)
-        room_id = f"{hash:032X}"
+    def forget(room: Room):
+        """Drop a deleted room from the index, the journal and the timers."""
+        OPEN_ROOMS.discard(room)
+        if JOURNAL:
+            JOURNAL.delete(room)
+        if REAPER:
+            REAPER.forget(room)
+        if TURNS:
+            TURNS.forget(room)
 
-        new_room = Room(name=name, id=room_id)
+    @staticmethod
+    def create(name: str, seed: int = None, id: str = None) -> Room:
+        room_id = id
+        while room_id is None:
+            hash = random.getrandbits(64)
+            room_id = f"{hash:016X}"
+            if SHARD and not SHARD.owns(room_id):
+                room_id = None
+
+        new_room = Room(name=name, id=room_id, seed=seed)
         ROOMS.append(new_room)
-
+        on_loop(RoomService.track, new_room)
         return new_room
 
+    @staticmethod
+    def track(room: Room):
+        """Add a created room to the index, the journal and the timers."""
+        OPEN_ROOMS.update(room)
+        if JOURNAL:
+            JOURNAL.create(room)
+        if REAPER:
+            REAPER.touch(room)
+
     @staticmethod
     def create_random() -> Room:
-        noun = random.choice(magics.NOUNS)
-        adjective = random.choice(magics.ADJECTIVES)
+        name = None
+        # Named rooms are routed by name: the name must be owned as well.
+        while name is None:
+            noun = random.choice(magics.NOUNS)
+            adjective = random.choice(magics.ADJECTIVES)
+
+            name = f"{adjective}-{noun}"
+            if SHARD and not SHARD.owns(name):
+                name = None
 
-        name = f"{adjective}-{noun}"
         new_room = RoomService.create(name)
         return new_room
 
@@ -60,12 +224,12 @@ class RoomService:
         if room.status != "READY":
             return
 
-        cards_left = magics.NBPLAYER_TO_DECK[room.nb_players].copy()
-        cards_found = {"B": 0, "D": 0, "S": 0}
+        cards_left = CardCounts(magics.NBPLAYER_TO_DECK[room.nb_players])
+        cards_found = CardCounts(B=0, D=0, S=0)
 
         roles = magics.NBPLAYER_TO_ROLES[room.nb_players].copy()
         roles_lst = np.repeat(list(roles.keys()), list(roles.values()))
-        np.random.shuffle(roles_lst)
+        room.rng.shuffle(roles_lst)
 
         if len(roles_lst) > room.nb_players:
             roles_lst = roles_lst[1:]
@@ -84,8 +248,10 @@ class RoomService:
         RoomService.distribute_cards(room)
 
         for i, role in enumerate(roles_lst):
-            room.players[i].team = role
+            room.players[i].team = sys.intern(str(role))
 
+        room.transition("start")
+        ROOMS.save(room)
         return True
 
     @staticmethod
@@ -96,16 +262,12 @@ class RoomService:
         if sum(room.cards_left.values()) % room.nb_players != 0:
             return
 
-        left_lst = np.repeat(
-            list(room.cards_left.keys()), list(room.cards_left.values())
-        )
-
-        np.random.shuffle(left_lst)
-        hands = np.split(left_lst, room.nb_players)
+        hands = deal(to_counts(room.cards_left), room.nb_players, room.rng)
 
         for i, hand in enumerate(hands):
-            room.players[i].hand = hand
+            room.players[i].cards = hand
 
+        ROOMS.save(room)
         return True
 
     @staticmethod
@@ -113,20 +275,36 @@ class RoomService:
         if room.status != "PLAYING":
             return
 
+        if not from_player or not to_player:
+            return
+
+        from_player = room.get_player(from_player.id)
+        to_player = room.get_player(to_player.id)
+
+        if not from_player or not to_player:
+            return
+
         if from_player is not room.cutter:
             return
 
         if from_player is to_player:
             return
 
-        np.random.shuffle(to_player.hand)
-        cutted = to_player.hand[0]
-        to_player.hand = to_player.hand[1:]
+        index = draw(to_player.cards, room.rng)
+        if index is None:
+            return
+
+        cutted = magics.CARDS[index]
+        to_player.cards[index] -= 1
 
         room.cards_found[cutted] += 1
         room.cards_left[cutted] -= 1
 
         room.cutter = to_player
+        room.transition(
+            "cut", from_player=from_player, to_player=to_player, card=cutted
+        )
+        ROOMS.save(room)
 
         return cutted
 
@@ -140,5 +318,42 @@ class RoomService:
 
         room.players.append(player)
         player.room_id = room.id
+        PLAYERS.save(player)
+        room.transition("join", player=player)
+        ROOMS.save(room)
+
+        return True
+
+    @staticmethod
+    def remove_player(room: Room, player) -> bool:
+        player = room.get_player(player.id)
+        if not player:
+            return
+
+        room.players.remove(player)
+        if room.cutter is player:
+            room.cutter = None
+        room.transition("leave", player=player)
+        ROOMS.save(room)
+
+        return True
+
+    @staticmethod
+    def rename_player(room: Room, player, new_id: str) -> bool:
+        """Give a player of the room a new id, when resuming with a new socket."""
+        player = room.get_player(player.id)
+        if not player:
+            return
+
+        old_id = player.id
+        stored = PLAYERS.get(old_id)
+        if stored is not None:
+            PLAYERS.remove(stored)
+
+        player.id = new_id
+        PLAYERS.append(player)
+        ROOMS.save(room)
+        if JOURNAL:
+            on_loop(JOURNAL.rename, room, old_id, new_id)
 
         return True
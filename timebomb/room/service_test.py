@@ -1,9 +1,9 @@
-from unittest.mock import patch, PropertyMock
 from pytest import fixture
 
 from timebomb.room.model import Room
 from timebomb.player.model import Player
-from timebomb.room.service import RoomService, ROOMS
+from timebomb.room.service import RoomService, ROOMS, OPEN_ROOMS
+from timebomb.registry import Registry
 
 
 def make_player(marker=None):
@@ -18,9 +18,10 @@ def make_room(marker=None):
 def room_db():
     yield ROOMS
     ROOMS.clear()
+    OPEN_ROOMS.clear()
 
 
-def test_RoomService_get_by_id(room_db: list):
+def test_RoomService_get_by_id(room_db: Registry):
     room1: Room = make_room(1)
 
     room_db.append(room1)
@@ -30,7 +31,7 @@ def test_RoomService_get_by_id(room_db: list):
     assert result is room1
 
 
-def test_RoomService_get_by_name(room_db: list):
+def test_RoomService_get_by_name(room_db: Registry):
     room1: Room = make_room(1)
 
     room_db.append(room1)
@@ -40,36 +41,57 @@ def test_RoomService_get_by_name(room_db: list):
     assert result is room1
 
 
-def test_RoomService_get_open_rooms(room_db: list):
-    room1: Room = make_room(1)
-
-    room_db.append(room1)
+def test_RoomService_get_open_rooms(room_db: Registry):
+    room1: Room = RoomService.create("room_1")
 
     result: list = RoomService.get_open_rooms()
 
     assert len(result) == 1 and room1 in result
 
-    room1.players = [make_player(i) for i in range(8)]
+    for i in range(8):
+        RoomService.add_player(room1, make_player(i))
 
     result: list = RoomService.get_open_rooms()
 
     assert result == []
 
 
-def test_RoomService_update(room_db: list):
+def test_RoomService_get_open_room(room_db: Registry):
+    assert RoomService.get_open_room() is None
+
+    room1: Room = RoomService.create("room_1")
+    room2: Room = RoomService.create("room_2")
+    assert RoomService.get_open_room() is room1
+
+    RoomService.add_player(room2, make_player(1))
+    assert RoomService.get_open_room() is room2
+    assert RoomService.get_open_rooms() == [room2, room1]
+
+    for i in range(2, 5):
+        RoomService.add_player(room2, make_player(i))
+    RoomService.start(room2)
+    assert RoomService.get_open_room() is room1
+
+    RoomService.delete(room1)
+    assert RoomService.get_open_room() is None
+
+
+def test_RoomService_update(room_db: Registry):
     room1: Room = make_room(1)
 
     room_db.append(room1)
 
-    assert room_db[0].name == "room_1"
+    assert room_db.get("id_1").name == "room_1"
 
     updates = {"name": "newname"}
     RoomService.update(room1, updates)
 
-    assert room_db[0].name == "newname"
+    assert room_db.get("id_1").name == "newname"
+    assert RoomService.get_by_name("newname") is room1
+    assert RoomService.get_by_name("room_1") is None
 
 
-def test_RoomService_delete(room_db: list):
+def test_RoomService_delete(room_db: Registry):
     room1: Room = make_room(1)
     room2: Room = make_room(2)
 
@@ -83,7 +105,7 @@ def test_RoomService_delete(room_db: list):
     assert room1 not in room_db and room2 in room_db
 
 
-def test_RoomService_create(room_db: list):
+def test_RoomService_create(room_db: Registry):
     result: Room = RoomService.create("newroom")
 
     assert result.name == "newroom" and result.id
@@ -92,7 +114,7 @@ def test_RoomService_create(room_db: list):
     assert result in room_db
 
 
-def test_RoomService_create_random(room_db: list):
+def test_RoomService_create_random(room_db: Registry):
     result: Room = RoomService.create_random()
 
     assert result.name and "-" in result.name and result.id
@@ -101,7 +123,7 @@ def test_RoomService_create_random(room_db: list):
     assert result in room_db
 
 
-def test_RoomService_add_player(room_db: list):
+def test_RoomService_add_player(room_db: Registry):
     player1: Player = make_player(1)
     player2: Player = make_player(2)
 
@@ -111,11 +133,11 @@ def test_RoomService_add_player(room_db: list):
     assert not room1.players
     assert not room2.players
 
-    with patch.object(Room, "status", new_callable=PropertyMock) as status_prop:
-        status_prop.return_value = "PLAYING"
-        result: bool = RoomService.add_player(room1, player1)
-        assert not result
-        assert not room1.players
+    room1.status = "PLAYING"
+    result: bool = RoomService.add_player(room1, player1)
+    assert not result
+    assert not room1.players
+    room1.status = "WAITING"
 
     result: bool = RoomService.add_player(room1, player1)
 
@@ -130,7 +152,25 @@ def test_RoomService_add_player(room_db: list):
     assert len(room2.players) == 1 and player2 in room2.players
 
 
-def test_RoomService_cut_card(room_db: list):
+def test_RoomService_remove_player(room_db: Registry):
+    player1: Player = make_player(1)
+    player2: Player = make_player(2)
+    room1: Room = RoomService.create("room_1")
+
+    RoomService.add_player(room1, player1)
+    RoomService.add_player(room1, player2)
+
+    result: bool = RoomService.remove_player(room1, player1)
+
+    assert result
+    assert room1.players == [player2]
+    assert RoomService.get_open_rooms() == [room1]
+
+    result: bool = RoomService.remove_player(room1, player1)
+    assert not result
+
+
+def test_RoomService_cut_card(room_db: Registry):
     player1: Player = make_player(1)
     player2: Player = make_player(2)
     room: Room = make_room()
@@ -145,59 +185,59 @@ def test_RoomService_cut_card(room_db: list):
     result: bool = RoomService.cut_card(room, player1, player2)
     assert not result
 
-    with patch.object(Room, "status", new_callable=PropertyMock) as status_prop:
-        status_prop.return_value = "PLAYING"
-        assert room.status == "PLAYING"
+    room.status = "PLAYING"
 
-        result: str = RoomService.cut_card(room, player2, player1)
-        assert not result
+    result: str = RoomService.cut_card(room, player2, player1)
+    assert not result
 
-        result: str = RoomService.cut_card(room, player1, player1)
-        assert not result
+    result: str = RoomService.cut_card(room, player1, player1)
+    assert not result
 
-        result: str = RoomService.cut_card(room, player1, player2)
-        assert result == "D"
-        assert room.cutter is player2
-        assert room.cards_found == {"D": 1}
-        assert room.cards_left == {"D": 0}
-        assert player2.hand == []
+    result: str = RoomService.cut_card(room, player1, player2)
+    assert result == "D"
+    assert room.cutter is player2
+    assert room.cards_found == {"D": 1}
+    assert room.cards_left == {"D": 0}
+    assert player2.hand == []
+    assert room.status == "ENDED"
+    assert room.winning_team[0] == "Moriarty"
 
 
-def test_RoomService_distribute_cards(room_db: list):
+def test_RoomService_distribute_cards(room_db: Registry):
     room: Room = make_room()
 
-    with patch.object(Room, "status", new_callable=PropertyMock) as status_prop:
-        status_prop.return_value = "PLAYING"
-
-        room.players = [make_player(i) for i in range(3)]
-        room.cards_left = {"D": 4}
-        result: bool = RoomService.distribute_cards(room)
-        assert not result
+    room.status = "PLAYING"
+    room.players = [make_player(i) for i in range(3)]
+    room.cards_left = {"D": 4}
+    result: bool = RoomService.distribute_cards(room)
+    assert not result
 
-        room.players.append(make_player(3))
-        room.cards_left = {"D": 3}
-        result: bool = RoomService.distribute_cards(room)
-        assert not result
+    room.players.append(make_player(3))
+    room.cards_left = {"D": 3}
+    result: bool = RoomService.distribute_cards(room)
+    assert not result
 
-        room.cards_left = {"D": 4}
-        result: bool = RoomService.distribute_cards(room)
+    room.cards_left = {"D": 4}
+    result: bool = RoomService.distribute_cards(room)
 
-        assert result
-        for player in room.players:
-            assert player.hand == ["D"]
+    assert result
+    for player in room.players:
+        assert player.hand == ["D"]
 
+    room.status = "WAITING"
     result: bool = RoomService.distribute_cards(room)
     assert not result
 
 
-def test_RoomService_distribute_cards(room_db: list):
+def test_RoomService_start(room_db: Registry):
     room: Room = make_room()
     assert room.status == "WAITING"
 
     result: bool = RoomService.start(room)
     assert not result
 
-    room.players = [make_player(i) for i in range(4)]
+    for i in range(4):
+        RoomService.add_player(room, make_player(i))
     assert room.status == "READY"
 
     result: bool = RoomService.start(room)
@@ -0,0 +1,310 @@
+"""Vectorized Monte Carlo simulation of Time Bomb games.
+
+Plays batches of games at once with numpy arrays over a batch dimension,
+using the decks and roles of `magics` and the win conditions of `Room`.
+
+Usage:
+    python -m timebomb.room.simulation [--players N ...] [--games N]
+        [--policy NAME] [--seed N] [--workers N]
+
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+import timebomb.room.magics as magics
+from timebomb.room.model import WIN_REASONS, winning_code
+
+
+def random_policy(hands, cutter, moriarty, rng) -> np.ndarray:
+    """Cut a random player among the others having cards."""
+    return _pick(hands, cutter, rng.random(hands.shape[:2]))
+
+
+def largest_hand_policy(hands, cutter, moriarty, rng) -> np.ndarray:
+    """Cut the player having the most cards, ties broken at random."""
+    scores = hand_sizes(hands) + rng.random(hands.shape[:2]) * 0.5
+    return _pick(hands, cutter, scores)
+
+
+def teammate_policy(hands, cutter, moriarty, rng) -> np.ndarray:
+    """Cut a random teammate of the cutter if any, another player otherwise."""
+    teammates = moriarty == moriarty[np.arange(len(cutter)), cutter][:, None]
+    return _pick(hands, cutter, rng.random(hands.shape[:2]) + teammates)
+
+
+POLICIES = {
+    "random": random_policy,
+    "largest_hand": largest_hand_policy,
+    "teammate": teammate_policy,
+}
+
+
+def _pick(hands: np.ndarray, cutter: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    players = np.arange(hands.shape[1])
+    valid = (hand_sizes(hands) > 0) & (players != cutter[:, None])
+    return np.where(valid, scores, -1).argmax(axis=1)
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of simulated games.
+
+    Attributes:
+        nb_players (int): Number of players per game.
+        outcomes (np.ndarray): Number of games ended by each `WIN_REASONS`.
+        lengths (np.ndarray): Number of games ended after each number of cuts.
+
+    """
+
+    nb_players: int
+    outcomes: np.ndarray
+    lengths: np.ndarray
+
+    @property
+    def nb_games(self) -> int:
+        return int(self.outcomes.sum())
+
+    @property
+    def win_rates(self) -> dict:
+        rates = {}
+        for code, reason in enumerate(WIN_REASONS):
+            if reason:
+                rates[reason] = self.outcomes[code] / max(self.nb_games, 1)
+        return rates
+
+    @property
+    def team_win_rates(self) -> dict:
+        rates = {}
+        for (team, _), rate in self.win_rates.items():
+            rates[team] = rates.get(team, 0) + rate
+        return rates
+
+    @property
+    def mean_length(self) -> float:
+        total = (np.arange(len(self.lengths)) * self.lengths).sum()
+        return float(total / max(self.nb_games, 1))
+
+    def merge(self, other: "SimulationResult") -> "SimulationResult":
+        return SimulationResult(
+            self.nb_players,
+            self.outcomes + other.outcomes,
+            self.lengths + other.lengths,
+        )
+
+    def report(self) -> str:
+        lines = [f"{self.nb_players} players, {self.nb_games} games"]
+        for team, rate in self.team_win_rates.items():
+            lines.append(f"  {team:<9} {rate:7.2%}")
+        for (team, reason), rate in self.win_rates.items():
+            lines.append(f"    {reason:<40} {rate:7.2%}")
+
+        lines.append(f"  mean length {self.mean_length:.2f} cuts")
+        for length in np.flatnonzero(self.lengths):
+            share = self.lengths[length] / self.nb_games
+            lines.append(f"    {length:>3} cuts {share:7.2%}")
+
+        return "\n".join(lines)
+
+
+def deal(left: np.ndarray, nb_players: int, rng) -> np.ndarray:
+    """Split the decks left of a batch of games into random hands.
+
+    Hands are drawn one player at a time from what the previous players
+    left, each card type being an hypergeometric draw against the types
+    after it. This is a multivariate hypergeometric split of every deck,
+    vectorized over the games.
+
+    Args:
+        left (np.ndarray): (games, cards) counts of the deck of each game.
+            Every deck must have the same size, a multiple of `nb_players`.
+        nb_players (int): Number of hands per game.
+        rng (Generator): The random generator.
+
+    Returns:
+        np.ndarray: (games, players, cards) counts of each hand.
+
+    """
+    left = left.astype(np.int64)
+    hand_size = int(left[0].sum()) // nb_players
+    hands = np.zeros((len(left), nb_players, left.shape[1]), dtype=np.int8)
+
+    for player in range(nb_players - 1):
+        to_draw = np.full(len(left), hand_size)
+        rest = left.sum(axis=1)
+        for card in range(left.shape[1] - 1):
+            rest = rest - left[:, card]
+            drawn = rng.hypergeometric(left[:, card], rest, to_draw)
+            hands[:, player, card] = drawn
+            left[:, card] -= drawn
+            to_draw -= drawn
+
+        hands[:, player, -1] = to_draw
+        left[:, -1] -= to_draw
+
+    hands[:, -1] = left
+    return hands
+
+
+def hand_sizes(hands: np.ndarray) -> np.ndarray:
+    return hands[..., 0] + hands[..., 1] + hands[..., 2]
+
+
+def deal_roles(nb_players: int, nb_games: int, rng) -> np.ndarray:
+    """Return a (games, players) mask of the Moriarty players."""
+    roles = magics.NBPLAYER_TO_ROLES[nb_players]
+    roles = np.repeat([False, True], [roles["Sherlock"], roles["Moriarty"]])
+
+    roles = rng.permuted(np.tile(roles, (nb_games, 1)), axis=1)
+    first = len(roles[0]) - nb_players
+    return roles[:, first:]
+
+
+def simulate_batch(nb_players: int, nb_games: int, policy, seed) -> SimulationResult:
+    """Play `nb_games` games in a single batch.
+
+    Games follow `RoomService`: the first player cuts first, cards are
+    redistributed after every round of `nb_players` cuts and a game ends as
+    soon as `Room.compute_winning_team` would end it.
+
+    Policies are called as `policy(hands, cutter, moriarty, rng)` with the
+    (games, players, cards) hands, the cutter of each game and the
+    (games, players) Moriarty mask, and return the target of each game.
+
+    """
+    rng = np.random.default_rng(seed)
+    games = np.arange(nb_games)
+    moriarty = deal_roles(nb_players, nb_games, rng)
+
+    deck = magics.NBPLAYER_TO_DECK[nb_players]
+    deck = np.array([deck.get(card, 0) for card in magics.CARDS])
+    deck_size = int(deck.sum())
+
+    hands = deal(np.tile(deck, (nb_games, 1)), nb_players, rng)
+    found = np.zeros((nb_games, len(magics.CARDS)), dtype=np.int16)
+    cutter = np.zeros(nb_games, dtype=np.intp)
+
+    bomb, defuser = magics.CARDS.index("B"), magics.CARDS.index("D")
+    outcomes = np.zeros(len(WIN_REASONS), dtype=np.int64)
+    lengths = np.zeros(deck_size + 1, dtype=np.int64)
+
+    for cuts in range(1, deck_size + 1):
+        target = policy(hands, cutter, moriarty, rng)
+        hand = hands[games, target].astype(np.int64)
+
+        pick = rng.integers(0, hand_sizes(hand))
+        card = (pick >= hand[:, 0]) * 1 + (pick >= hand[:, 0] + hand[:, 1])
+
+        hands[games, target, card] -= 1
+        found[games, card] += 1
+        cutter = target
+
+        code = winning_code(
+            found[:, bomb],
+            found[:, defuser],
+            deck_size - cuts,
+            nb_players,
+        )
+
+        ended = code > 0
+        if ended.any():
+            outcomes += np.bincount(code[ended], minlength=len(WIN_REASONS))
+            lengths[cuts] += ended.sum()
+
+            keep = ~ended
+            games = np.arange(keep.sum())
+            hands, found, cutter = hands[keep], found[keep], cutter[keep]
+            moriarty = moriarty[keep]
+
+        if not len(games):
+            break
+
+        if cuts % nb_players == 0:
+            hands = deal(deck - found, nb_players, rng)
+
+    return SimulationResult(nb_players, outcomes, lengths)
+
+
+def simulate(
+    nb_players: int,
+    nb_games: int,
+    policy=random_policy,
+    seed: int = None,
+    batch_size: int = 100_000,
+    workers: int = None,
+) -> SimulationResult:
+    """Play `nb_games` games split into batches.
+
+    Each batch gets a seed spawned from `seed`, so results only depend on
+    the seed and the batch size, not on the number of workers.
+
+    Args:
+        nb_players (int): Number of players per game.
+        nb_games (int): Number of games to play.
+        policy (callable): Picks the target of each game, see
+            `simulate_batch`. Must be picklable to use workers.
+        seed (int): The root seed. Random if None.
+        batch_size (int): Maximum number of games per batch.
+        workers (int): Number of processes. Batches run in this process
+            if None.
+
+    Returns:
+        SimulationResult: The merged outcome of every batch.
+
+    Raises:
+        ValueError: If `nb_games` is not positive.
+
+    """
+    if nb_games < 1:
+        raise ValueError("At least one game must be simulated.")
+
+    sizes = [batch_size] * (nb_games // batch_size)
+    if nb_games % batch_size:
+        sizes.append(nb_games % batch_size)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(nb_players, size, policy, seed) for size, seed in zip(sizes, seeds)]
+
+    if workers:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(simulate_batch, *zip(*args)))
+    else:
+        results = [simulate_batch(*arg) for arg in args]
+
+    result = results[0]
+    for other in results[1:]:
+        result = result.merge(other)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--players", type=int, nargs="+", default=list(magics.NBPLAYER_TO_DECK)
+    )
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    for nb_players in args.players:
+        result = simulate(
+            nb_players,
+            args.games,
+            POLICIES[args.policy],
+            args.seed,
+            args.batch_size,
+            args.workers,
+        )
+        print(result.report())
+
+
+if __name__ == "__main__":
+    main()
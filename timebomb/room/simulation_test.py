@@ -0,0 +1,107 @@
+import numpy as np
+from pytest import raises
+
+from timebomb.player.model import Player
+from timebomb.room.model import Room, WIN_REASONS
+from timebomb.room.service import RoomService
+from timebomb.room.simulation import (
+    deal,
+    deal_roles,
+    largest_hand_policy,
+    teammate_policy,
+    random_policy,
+    simulate,
+    simulate_batch,
+    SimulationResult,
+)
+import timebomb.room.magics as magics
+
+
+def test_deal():
+    rng = np.random.default_rng(0)
+    left = np.array([[1, 4, 15], [0, 5, 15]])
+
+    hands = deal(left, 4, rng)
+
+    assert hands.shape == (2, 4, 3)
+    assert (hands.sum(axis=2) == 5).all()
+    assert (hands.sum(axis=1) == left).all()
+
+
+def test_deal_roles():
+    rng = np.random.default_rng(0)
+
+    for nb_players, roles in magics.NBPLAYER_TO_ROLES.items():
+        moriarty = deal_roles(nb_players, 100, rng)
+
+        assert moriarty.shape == (100, nb_players)
+        assert moriarty.sum(axis=1).max() <= roles["Moriarty"]
+        assert (~moriarty).sum(axis=1).max() <= roles["Sherlock"]
+
+
+def test_simulate_batch():
+    for nb_players in magics.NBPLAYER_TO_DECK:
+        result = simulate_batch(nb_players, 1000, random_policy, 0)
+
+        assert result.nb_games == 1000
+        assert result.lengths.sum() == 1000
+        assert abs(sum(result.win_rates.values()) - 1) < 1e-9
+        assert set(result.team_win_rates) == {"Moriarty", "Sherlock"}
+
+        deck_size = sum(magics.NBPLAYER_TO_DECK[nb_players].values())
+        longest = deck_size - nb_players + 1
+        assert result.lengths[longest:].sum() == 0
+        assert result.lengths[0] == 0
+
+
+def test_simulate_deterministic():
+    result1 = simulate(5, 2500, seed=42, batch_size=1000)
+    result2 = simulate(5, 2500, seed=42, batch_size=1000, workers=2)
+
+    assert result1.nb_games == 2500
+    assert (result1.outcomes == result2.outcomes).all()
+    assert (result1.lengths == result2.lengths).all()
+
+
+def test_simulate_no_game():
+    with raises(ValueError):
+        simulate(4, 0)
+
+    empty = SimulationResult(4, np.zeros(len(WIN_REASONS)), np.zeros(10))
+    assert all(rate == 0 for rate in empty.win_rates.values())
+    assert empty.mean_length == 0
+
+
+def test_simulate_policies():
+    for policy in [largest_hand_policy, teammate_policy]:
+        result = simulate(6, 2000, policy=policy, seed=0)
+
+        assert result.nb_games == 2000
+        assert "players" in result.report()
+
+
+def play_room(nb_players: int, rng) -> tuple:
+    room = Room("simulation", "id", seed=int(rng.integers(2**63)))
+    for i in range(nb_players):
+        RoomService.add_player(room, Player(f"user_{i}", f"id_{i}"))
+    RoomService.start(room)
+
+    while room.status == "PLAYING":
+        targets = [p for p in room.players if p is not room.cutter and sum(p.cards)]
+        target = targets[rng.integers(len(targets))]
+        RoomService.cut_card(room, room.cutter, target)
+        if room.status != "ENDED":
+            RoomService.distribute_cards(room)
+
+    return room.winning_team
+
+
+def test_simulate_matches_room_service():
+    rng = np.random.default_rng(0)
+    nb_games = 2000
+
+    outcomes = [play_room(4, rng) for _ in range(nb_games)]
+    result = simulate(4, 20000, seed=0)
+
+    for reason, rate in result.win_rates.items():
+        assert abs(outcomes.count(reason) / nb_games - rate) < 0.04
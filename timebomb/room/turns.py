@@ -0,0 +1,61 @@
+"""Deadline of the current cutter of every game.
+
+Each start or cut arms a timer of `timeout` seconds for the room in a
+`TimingWheel`, replacing the timer of the previous turn. When it fires
+while the room is still at the same version, `cut` is called so the
+server cuts a random card on behalf of the idle cutter.
+
+"""
+
+import timebomb.room.service as room_service
+from timebomb.metrics import METRICS
+from timebomb.room.model import Room
+from timebomb.timers import TimingWheel
+
+METRICS.describe("timebomb_auto_cuts_total", "counter", "Cuts made for idle cutters.")
+
+
+class TurnTimers:
+    """Arm a timer on every turn of the games.
+
+    Usage:
+        turns = TurnTimers(wheel, 60, cut=namespace.auto_cut)
+        room_service.TURNS = turns
+
+    Attributes:
+        wheel (TimingWheel): The scheduler of the timers.
+        timeout (float): Seconds a cutter has to cut.
+        cut (callable): Called as `cut(room_id, version)` when a turn times
+            out, `version` being the room version when the turn started.
+
+    """
+
+    def __init__(self, wheel: TimingWheel, timeout: float, cut):
+        self.wheel = wheel
+        self.timeout = timeout
+        self.cut = cut
+
+    def transition(self, room: Room, event: str):
+        if room.status != "PLAYING":
+            self.forget(room)
+        elif event in ("start", "cut"):
+            room_id, version = room.id, room.version
+            self.wheel.schedule(
+                ("turn", room_id), self.timeout, lambda: self.cut(room_id, version)
+            )
+
+    def forget(self, room: Room):
+        self.wheel.cancel(("turn", room.id))
+
+    def watch(self, rooms):
+        """Arm the turn of the games in progress, restored on boot."""
+        for room in rooms:
+            self.transition(room, "start")
+
+
+def start_turn_timers(wheel: TimingWheel, timeout: float, cut) -> TurnTimers:
+    """Arm the turns of the registered games and of the next ones."""
+    turns = TurnTimers(wheel, timeout, cut)
+    turns.watch(room_service.ROOMS)
+    room_service.TURNS = turns
+    return turns
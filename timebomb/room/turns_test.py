@@ -0,0 +1,96 @@
+from pytest import fixture
+
+import timebomb.room.service as room_service
+from timebomb.conftest import Clock
+from timebomb.room.service import ROOMS, RoomService
+from timebomb.room.turns import TurnTimers
+from timebomb.socket_app import MainNamespace
+from timebomb.timers import TimingWheel
+
+
+@fixture
+def turns(clock: Clock, namespace: MainNamespace, monkeypatch) -> TurnTimers:
+    wheel = TimingWheel(tick=1, slots=16, clock=clock)
+    turns = TurnTimers(wheel, 30, cut=namespace.auto_cut)
+    monkeypatch.setattr(room_service, "TURNS", turns)
+    return turns
+
+
+def wait(turns: TurnTimers, clock: Clock, seconds: float) -> list:
+    results = []
+    for _ in range(int(seconds)):
+        clock.now += 1
+        results.extend(callback() for callback in turns.wheel.advance())
+    return results
+
+
+def start_game(namespace: MainNamespace, nb_players: int = 4):
+    sids = [f"sid_{i}" for i in range(nb_players)]
+    for sid in sids:
+        namespace.on_login(sid, {"username": sid, "roomname": "turns"})
+    namespace.on_start(sids[0])
+    return RoomService.get_by_name("turns")
+
+
+def test_TurnTimers_arms_on_start(turns: TurnTimers, namespace: MainNamespace):
+    room = start_game(namespace)
+    assert ("turn", room.id) in turns.wheel
+    assert len(turns.wheel) == 1
+
+
+def test_TurnTimers_auto_cut(turns, namespace: MainNamespace, clock: Clock):
+    room = start_game(namespace)
+    cutter, version = room.cutter, room.version
+    namespace.emitted.clear()
+
+    assert wait(turns, clock, 29) == []
+    (res,) = wait(turns, clock, 1)
+
+    assert res["status"] == "SUCCESS"
+    assert room.version == version + 1 and room.cutter is not cutter
+    assert namespace.emitted[0][:2] == (
+        "notify",
+        {"message": f"{cutter.name} ran out of time."},
+    )
+    assert (("turn", room.id) in turns.wheel) == (room.status == "PLAYING")
+
+
+def test_TurnTimers_rearms_on_cut(turns, namespace: MainNamespace, clock: Clock):
+    room = start_game(namespace)
+    wait(turns, clock, 20)
+
+    target = next(p for p in room.players if p is not room.cutter and sum(p.cards))
+    namespace.on_cut(room.cutter.id, {"target": target.id})
+    if room.status == "ENDED":
+        assert len(turns.wheel) == 0
+        return
+
+    cutter = room.cutter
+    assert wait(turns, clock, 29) == []
+    (res,) = wait(turns, clock, 1)
+    assert res["status"] == "SUCCESS" and room.cutter is not cutter
+
+
+def test_TurnTimers_stale_turn(turns, namespace: MainNamespace, clock: Clock):
+    room = start_game(namespace)
+    assert namespace.auto_cut(room.id, room.version - 1) is None
+    assert namespace.auto_cut("unknown", room.version) is None
+
+
+def test_TurnTimers_forgets_deleted_rooms(turns, namespace: MainNamespace):
+    room = start_game(namespace)
+    namespace.on_disconnect(room.players[1].id)
+
+    assert room not in ROOMS
+    assert len(turns.wheel) == 0
+
+
+def test_TurnTimers_watch(turns, namespace: MainNamespace, monkeypatch):
+    monkeypatch.setattr(room_service, "TURNS", None)
+    room = start_game(namespace)
+    waiting = RoomService.create("waiting")
+    assert len(turns.wheel) == 0
+
+    turns.watch(ROOMS)
+    assert ("turn", room.id) in turns.wheel
+    assert ("turn", waiting.id) not in turns.wheel
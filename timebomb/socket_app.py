@@ -1,180 +1,305 @@
+import time
+from contextlib import contextmanager
+
 import socketio
 
+from timebomb import handlers
+from timebomb.batching import BATCH, TICKED, dedup
+from timebomb.handlers import Outbox, audience, spectators
+from timebomb.metrics import METRICS
+from timebomb.profiling import PROFILER
 from timebomb.player.service import PlayerService
-from timebomb.player.schema import PlayerSchema
+from timebomb.player.serializer import dump_player
 
 from timebomb.room.service import RoomService
-from timebomb.room.schema import RoomSchema, EndedRoomSchema
+from timebomb.room.model import Room
+from timebomb.room.serializer import (
+    dump_room,
+    dump_ended_room,
+    dump_public_ended_room,
+    dump_room_delta,
+)
 
 
 class MainNamespace(socketio.Namespace):
+    """Handlers of the game events.
+
+    The emits of a handler are batched and sent once it returns, see
+    `timebomb.batching`. With a `ticker`, room updates are sent by `tick`.
+
+    """
+
+    ticker = None
+
+    def trigger_event(self, event: str, *args):
+        with self.batched():
+            if PROFILER.deadline is not None and hasattr(self, f"on_{event}"):
+                return PROFILER.call(event, self.record_event, event, *args)
+            return self.record_event(event, *args)
+
+    def record_event(self, event: str, *args):
+        if not METRICS.enabled or not hasattr(self, f"on_{event}"):
+            return super().trigger_event(event, *args)
+
+        start = time.perf_counter()
+        try:
+            res = super().trigger_event(event, *args)
+        except Exception as error:
+            METRICS.exception(event, time.perf_counter() - start, error)
+            raise
+
+        METRICS.handler(event, time.perf_counter() - start, res)
+        return res
+
+    def emit(self, event: str, data=None, **kwargs):
+        if not METRICS.enabled:
+            return super().emit(event, data, **kwargs)
+
+        start = time.perf_counter()
+        res = super().emit(event, data, **kwargs)
+        METRICS.emit(event, time.perf_counter() - start, data)
+        return res
+
+    @contextmanager
+    def batched(self):
+        """Batch the emits of the block, and send them when it ends."""
+        token = BATCH.set([])
+        try:
+            yield
+        finally:
+            self.flush()
+            BATCH.reset(token)
+
+    def queue(self, event: str, data, to):
+        """Add an emit to the batch of the handler, or send it now."""
+        batch = BATCH.get()
+        if batch is None:
+            self.send([(event, data, to)])
+        else:
+            batch.append((event, data, to))
+
+    def send(self, batch: list):
+        for event, data, to in dedup(batch):
+            if self.ticker and event in TICKED:
+                self.ticker.defer(data["id"])
+                continue
+            if self.ticker and event == "end":
+                self.ticker.discard(data["id"])
+            self.emit(event, data, to=to)
+
+    def flush(self):
+        """Send the batch of the handler so far."""
+        batch = BATCH.get()
+        if batch:
+            self.send(batch[:])
+            batch.clear()
+
+    def tick(self):
+        """Send the rooms updated since the previous tick."""
+        for room_id in self.ticker.flush():
+            room = RoomService.get_by_id(room_id)
+            if room:
+                self.emit("room", dump_room(room), to=audience(room))
+
+    def enter_room(self, sid: str, room: str, namespace=None):
+        self.flush()
+        return super().enter_room(sid, room, namespace)
+
+    def leave_room(self, sid: str, room: str, namespace=None):
+        self.flush()
+        return super().leave_room(sid, room, namespace)
+
+    def close_room(self, room: str, namespace=None):
+        self.flush()
+        return super().close_room(room, namespace)
+
     def emit_room(self, room):
-        schema = RoomSchema()
-        json = schema.dump(room)
-        self.emit("room", json, room=room.id)
+        json = dump_room(room)
+        self.queue("room", json, audience(room))
+        return json
+
+    def emit_room_delta(self, room, cards=(), previous_status=None):
+        json = dump_room_delta(room, cards, previous_status)
+        self.queue("room_delta", json, audience(room))
         return json
 
     def emit_player(self, player):
-        schema = PlayerSchema()
-        json = schema.dump(player)
-        self.emit("player", json, room=player.id)
+        json = dump_player(player)
+        self.queue("player", json, player.id)
         return json
 
     def emit_end(self, room):
-        schema = EndedRoomSchema()
-        json = schema.dump(room)
-        self.emit("end", json, room=room.id)
+        json = dump_ended_room(room)
+        self.queue("end", json, room.id)
+        self.queue("end", dump_public_ended_room(room), spectators(room.id))
         return json
 
     def emit_chat(self, room, data):
-        self.emit("chat", data, room=room.id)
+        self.queue("chat", data, audience(room))
         return data
 
-    def emit_notify(self, room, data):
-        self.emit("notify", data, room=room.id)
+    def emit_notify(self, to, data):
+        """Notify a player, or the players and spectators of a room."""
+        self.queue("notify", data, audience(to) if isinstance(to, Room) else to.id)
         return data
 
+    def post(self, outbox: Outbox):
+        """Add the emits of an outbox to the batch of the handler."""
+        batch = BATCH.get()
+        if batch is None:
+            self.send(outbox)
+        else:
+            batch.extend(outbox)
+
+    def close(self, room, reason: str):
+        """Tell the clients of a deleted room and close its Socket.IO rooms."""
+        self.emit_notify(room, handlers.closed_message(reason))
+        self.close_room(room.id)
+        self.close_room(spectators(room.id))
+
+    def auto_cut(self, room_id: str, version: int) -> dict:
+        """Cut a random card for a cutter who let their turn time out."""
+        room = RoomService.get_by_id(room_id)
+        turn = handlers.auto_cut_target(room, version)
+        if not turn:
+            return
+
+        cutter, target = turn
+        METRICS.inc("timebomb_auto_cuts_total", ())
+        with self.batched():
+            self.emit_notify(room, {"message": f"{cutter.name} ran out of time."})
+            return self.on_cut(cutter.id, {"target": target.id})
+
     def on_login(self, sid: str, data: dict) -> dict:
-        player = PlayerService.get_by_id(sid)
+        error = handlers.check_login(PlayerService.get_by_id(sid), data)
+        if error:
+            return error
 
-        if player:
-            return {"status": "ERROR", "data": {"message": "Player already logged in."}}
+        player = PlayerService.create(handlers.new_player(sid, data))
 
-        username = data.get("username")
         room_name = data.get("roomname")
-
-        if not username:
-            return {"status": "ERROR", "data": {"message": "Invalid username."}}
-
-        player = PlayerService.create({"name": username[:11], "id": sid})
-
-        if not room_name:
-            open_rooms = RoomService.get_open_rooms()
-            if not len(open_rooms):
-                room = RoomService.create_random()
-            else:
-                room = open_rooms[0]
-        else:
+        if room_name:
             room = RoomService.get_by_name(room_name)
             if not room:
                 room = RoomService.create(room_name)
+            json = self.join(sid, room.id, player)
+        else:
+            room = RoomService.get_open_room()
+            json = self.join(sid, room.id, player) if room else None
+            if not json:
+                # The open room was deleted or filled by another worker.
+                if room:
+                    RoomService.discard_open_room(room)
+                json = self.join(sid, RoomService.create_random().id, player)
+
+        if not json:
+            PlayerService.delete(player)
+        return handlers.logged_in(player, json)
+
+    def join(self, sid: str, room_id: str, player) -> dict:
+        """Add a player to a room, None if it is gone or not open anymore."""
+        outbox = Outbox()
+        with RoomService.transaction(room_id) as room:
+            json = handlers.join(room, player, outbox)
+        if json:
+            self.enter_room(sid, room_id)
+            self.post(outbox)
+        return json
 
-        player = RoomService.add_player(room, player)
-        if not player:
-            return {
-                "status": "ERROR",
-                "data": {"message": "Impossible to join this room."},
-            }
+    def on_resume(self, sid: str, data: dict) -> dict:
+        player = PlayerService.get_by_id(data.get("id"))
+        connected = player and self.server.manager.is_connected(
+            player.id, self.namespace
+        )
+        error = handlers.check_resume(
+            PlayerService.get_by_id(sid), player, data, connected
+        )
+        if error:
+            return error
+
+        outbox = Outbox()
+        with RoomService.transaction(player.room_id) as room:
+            res = handlers.resume(room, player, sid, outbox)
+        if res["status"] == "SUCCESS":
+            self.enter_room(sid, player.room_id)
+            self.post(outbox)
+        return res
+
+    def on_watch(self, sid: str, data: dict) -> dict:
+        error = handlers.check_watch(PlayerService.get_by_id(sid), data)
+        if error:
+            return error
 
-        self.enter_room(sid, room.id)
-        json = self.emit_room(room)
-        return {"status": "SUCCESS", "data": json}
+        room_name = data.get("roomname")
+        room = RoomService.get_by_name(room_name) if room_name else None
+        res = handlers.watch(room)
+        if room:
+            self.enter_room(sid, spectators(room.id))
+        return res
 
-    def on_cut(self, sid: str, data: dict) -> dict:
-        target_id = data.get("target")
-        target_player = PlayerService.get_by_id(target_id)
+    def on_unwatch(self, sid: str) -> dict:
+        for room_id in handlers.unwatch(self.rooms(sid)):
+            self.leave_room(sid, room_id)
 
-        if not target_player:
-            return {"status": "ERROR", "data": {"message": "Invalid target id."}}
+        return {"status": "SUCCESS", "data": {"message": "Spectator left."}}
 
+    def on_cut(self, sid: str, data: dict) -> dict:
+        target_player = PlayerService.get_by_id(data.get("target"))
         src_player = PlayerService.get_by_id(sid)
-        if not src_player:
-            return {"status": "ERROR", "data": {"message": "Player not logged in."}}
-
-        if src_player.room_id != target_player.room_id:
-            return {
-                "status": "ERROR",
-                "data": {"message": "Can not cut player from other room."},
-            }
+        error = handlers.check_cut(src_player, target_player)
+        if error:
+            return error
 
-        room = RoomService.get_by_id(target_player.room_id)
-        if not room:
-            return {"status": "ERROR", "data": {"message": "Invalid room."}}
-
-        card = RoomService.cut_card(room, src_player, target_player)
-        if not card:
-            return {"status": "ERROR", "data": {"message": "Error while cutting."}}
-
-        if room.status == "ENDED":
-            json = self.emit_end(room)
-            return {"status": "SUCCESS", "data": json}
-
-        res = RoomService.distribute_cards(room)
-        if res:
-            for player in room.players:
-                self.emit_player(player)
-
-        self.emit_notify(target_player, {"message": "Your turn to cut a card!"})
-        self.emit_player(target_player)
-        json = self.emit_room(room)
-        return {"status": "SUCCESS", "data": json}
+        outbox = Outbox()
+        with RoomService.transaction(target_player.room_id) as room:
+            res = handlers.cut(room, src_player, target_player, outbox)
+        self.post(outbox)
+        return res
 
     def on_start(self, sid: str) -> dict:
         player = PlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
 
-        if not player:
-            return {"status": "ERROR", "data": {"message": "Player not logged in."}}
-
-        room = RoomService.get_by_id(player.room_id)
-        if not room:
-            return {"status": "ERROR", "data": {"message": "Invalid room."}}
-
-        res = RoomService.start(room)
-        if not res:
-            return {
-                "status": "ERROR",
-                "data": {"message": "Can not start game in this room."},
-            }
-
-        for player in room.players:
-            self.emit_player(player)
-
-        json = self.emit_room(room)
-        return {"status": "SUCCESS", "data": json}
+        outbox = Outbox()
+        with RoomService.transaction(player.room_id) as room:
+            res = handlers.start(room, outbox)
+        self.post(outbox)
+        return res
 
     def on_chat(self, sid: str, data: dict) -> dict:
         player = PlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
 
-        if not player:
-            return {"status": "ERROR", "data": {"message": "Player not logged in."}}
-
-        room = RoomService.get_by_id(player.room_id)
-        if not room:
-            return {"status": "ERROR", "data": {"message": "Invalid room."}}
+        outbox = Outbox()
+        res = handlers.chat(RoomService.get_by_id(player.room_id), player, data, outbox)
+        self.post(outbox)
+        return res
 
-        message = data.get("message", "").strip()
-        if not message:
-            return {"status": "ERROR", "data": {"message": "Invalid data."}}
+    def on_sync(self, sid: str) -> dict:
+        player = PlayerService.get_by_id(sid)
+        error = handlers.check_player(player)
+        if error:
+            return error
 
-        data = {"player": player.name, "message": message}
-        json = self.emit_chat(room, data)
-        return {"status": "SUCCESS", "data": json}
+        return handlers.sync(RoomService.get_by_id(player.room_id))
 
     def on_disconnect(self, sid: str) -> dict:
         player = PlayerService.get_by_id(sid)
-
         if not player:
-            return {"status": "SUCCESS", "data": {"message": "Player disconnect."}}
-
-        room = RoomService.get_by_id(player.room_id)
-        if not room:
-            return {"status": "SUCCESS", "data": {"message": "Player disconnect."}}
-
-        if room.status == "PLAYING":
-            self.emit_end(room)
-            self.emit_notify(room, {"message": f"{player.name} has left the game."})
-            for r_player in room.players:
-                self.leave_room(r_player.id, room.id)
-                room.players.remove(r_player)
-                PlayerService.delete(r_player)
-            RoomService.delete(room)
-
-        else:
-            self.leave_room(player.id, room.id)
-            room.players.remove(player)
-            if not len(room.players):
-                RoomService.delete(room)
-
-            PlayerService.delete(player)
-
-        return {"status": "SUCCESS", "data": {"message": "Player disconnect."}}
+            return handlers.disconnected()
+
+        outbox = Outbox()
+        deleted = []
+        with RoomService.transaction(player.room_id) as room:
+            leaving = handlers.disconnect(room, player, outbox, deleted)
+        self.post(outbox)
+        for r_player in leaving:
+            self.leave_room(r_player.id, player.room_id)
+        for room in deleted:
+            self.close(room, "empty")
+
+        return handlers.disconnected()
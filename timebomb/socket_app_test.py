@@ -153,8 +153,11 @@ def test_MainNamespace_login_error_if_full_room():
     client2.emit(
         "login", {"username": "player3", "roomname": "room1"}, callback=callback
     )
-
     client2.sleep(0.05)
+
+    res = client2.call("login", {"username": "player3", "roomname": "room2"})
+    assert res["status"] == "SUCCESS"
+
     client2.disconnect()
     for client in clients:
         client.disconnect()
@@ -339,3 +342,108 @@ def test_MainNamespace_chat():
 
     client.sleep(0.05)
     client.disconnect()
+
+
+def test_MainNamespace_sync():
+    client = socketio.Client()
+    client.connect("http://localhost:5000/", namespaces=["/"])
+
+    def callback(res):
+        assert res["status"] == "ERROR"
+        assert res["data"] == {"message": "Player not logged in."}
+
+    client.emit("sync", callback=callback)
+    client.emit("login", {"username": "player1", "roomname": "sync_room"})
+
+    def callback(res):
+        assert res["status"] == "SUCCESS"
+        room = res["data"]
+        assert room["name"] == "sync_room" and room["version"] == 1
+        assert len(room["players"]) == 1 and room["players"][0]["name"] == "player1"
+
+    client.emit("sync", callback=callback)
+    client.sleep(0.05)
+    client.disconnect()
+
+
+def test_MainNamespace_watch():
+    players = [socketio.Client() for i in range(4)]
+    spectator = socketio.Client()
+    received = []
+    for event in ("room", "room_delta", "player", "end", "chat", "notify"):
+        spectator.on(event, lambda data, event=event: received.append((event, data)))
+
+    for client in players + [spectator]:
+        client.connect("http://localhost:5000/", namespaces=["/"])
+
+    res = spectator.call("watch", {"roomname": "watch_room"})
+    assert res == {"status": "ERROR", "data": {"message": "Invalid room."}}
+
+    for client in players:
+        client.call("login", {"username": "player", "roomname": "watch_room"})
+
+    res = spectator.call("watch", {"roomname": "watch_room"})
+    assert res["status"] == "SUCCESS" and len(res["data"]["players"]) == 4
+
+    res = spectator.call("chat", {"message": "hello"})
+    assert res["data"] == {"message": "Player not logged in."}
+
+    players[0].call("start")
+    players[0].call("chat", {"message": "hello"})
+    res = players[0].call("cut", {"target": players[1].get_sid()})
+    assert res["status"] == "SUCCESS", res
+    for client in players:
+        client.disconnect()
+    spectator.sleep(0.1)
+
+    events = [event for event, _ in received]
+    assert events[:2] == ["room", "chat"] and events[2] in ("room_delta", "end")
+    assert "player" not in events
+    assert "Room closed." in [data.get("message") for _, data in received]
+
+    end = next(data for event, data in received if event == "end")
+    assert all(set(player) == {"name", "id"} for player in end["players"])
+
+    spectator.disconnect()
+
+
+def test_MainNamespace_broadcast_encoded_once():
+    sio = socketio.Server(async_mode="threading")
+    namespace = MainNamespace("/")
+    sio.register_namespace(namespace)
+    sent = []
+    sio.eio.send_packet = lambda eio_sid, pkt: sent.append(pkt)
+
+    player = sio.manager.connect("player", "/")
+    namespace.on_login(player, {"username": "player", "roomname": "encode_room"})
+    for i in range(100):
+        sid = sio.manager.connect(f"spectator_{i}", "/")
+        namespace.on_watch(sid, {"roomname": "encode_room"})
+
+    sent.clear()
+    namespace.trigger_event("chat", player, {"message": "hello"})
+
+    assert len(sent) == 101
+    assert len({id(pkt) for pkt in sent}) == 1
+
+
+def test_MainNamespace_resume():
+    sio = socketio.Server(async_mode="threading")
+    namespace = MainNamespace("/")
+    sio.register_namespace(namespace)
+    sio.eio.send_packet = lambda eio_sid, pkt: None
+
+    player = sio.manager.connect("resumed", "/")
+    res = namespace.on_login(player, {"username": "player", "roomname": "resume_room"})
+    token = res["token"]
+    sio.manager.disconnect(player, "/")
+
+    thief = sio.manager.connect("thief", "/")
+    for data in ({"id": player}, {"id": player, "token": "guess"}, {"token": token}):
+        res = namespace.on_resume(thief, data)
+        assert res["data"] == {"message": "Invalid player id or token."}
+
+    sid = sio.manager.connect("resuming", "/")
+    res = namespace.on_resume(sid, {"id": player, "token": token})
+    assert res["status"] == "SUCCESS"
+    assert [p["id"] for p in res["data"]["players"]] == [sid]
@@ -0,0 +1,50 @@
+"""Storage backends for rooms and players.
+
+Every store offers the `Registry` API, plus `save` to persist a changed
+model and `atomic` to run a read-modify-write block on a model exclusively:
+
+    with store.atomic(key) as model:
+        model.attr = value
+
+`MemoryStore` keeps live objects in the process, like the module lists used
+to. `SQLiteStore` and `RedisStore` persist pickled models so several worker
+processes can share them; models read from them are copies, so a room is
+the unit of consistency and its players are read from the room while it is
+being modified.
+
+"""
+
+from urllib.parse import urlparse
+
+from timebomb.store.memory import MemoryStore
+from timebomb.store.redis import RedisClient, RedisStore
+from timebomb.store.sqlite import SQLiteStore
+
+
+def create_store(url: str, name: str, key: str = "id", indexes: tuple = ()):
+    """Create a store from an URL.
+
+    Args:
+        url (str): `memory://` (or None), `sqlite:///relative/file.db`,
+            `sqlite:////absolute/file.db` or `redis://host:port/db`.
+        name (str): The store name, used as table or key prefix.
+        key (str): The attribute used as primary key.
+        indexes (tuple): The attributes indexed for lookups.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+
+    """
+    scheme = urlparse(url).scheme if url else "memory"
+
+    if scheme == "memory":
+        return MemoryStore(key=key, indexes=indexes)
+
+    if scheme == "sqlite":
+        path = urlparse(url).path[1:]
+        return SQLiteStore(path, name, key=key, indexes=indexes)
+
+    if scheme == "redis":
+        return RedisStore(RedisClient.from_url(url), name, key=key, indexes=indexes)
+
+    raise ValueError(f"Unsupported store URL {url}.")
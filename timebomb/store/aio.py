@@ -0,0 +1,70 @@
+"""Asyncio access to the stores.
+
+Memory stores only touch process memory, so they are called directly on
+the event loop. Other stores block on I/O, so their calls run in the
+default executor. Atomic blocks are given as plain functions and run in a
+single call: on the loop they can not be interleaved with other handlers,
+and in the executor the whole block, lock included, stays on one thread.
+
+Executor threads run the room hooks too, while the loop and other threads
+use the state of the process they change: the open rooms index, the timers
+and the journal. The services apply these changes with `on_loop`, which
+hands them to the event loop from an executor thread.
+
+"""
+
+import asyncio
+import threading
+
+from timebomb.store.memory import MemoryStore
+
+# The event loop of the store call running on this executor thread.
+LOOP = threading.local()
+
+
+def on_loop(fn, *args):
+    """Call `fn(*args)` now, or on the event loop from an executor thread.
+
+    Changes handed to the loop are applied in the order they were made, and
+    before the store call awaiting in the loop returns.
+
+    """
+    loop = getattr(LOOP, "loop", None)
+    if loop is None:
+        return fn(*args)
+    loop.call_soon_threadsafe(fn, *args)
+
+
+async def call(store, fn, *args, **kwargs):
+    """Call `fn(*args, **kwargs)`, which uses `store`, without blocking the loop."""
+    if isinstance(store, MemoryStore):
+        return fn(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+
+    def run():
+        LOOP.loop = loop
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            LOOP.loop = None
+
+    return await loop.run_in_executor(None, run)
+
+
+async def atomic(store, key, fn):
+    """Return `fn(model)` run in a `store.atomic(key)` block.
+
+    Args:
+        store: The store holding the model.
+        key: The model key.
+        fn (callable): Called with the model, or None if there is no model
+            with this key. Must not await.
+
+    """
+
+    def run():
+        with store.atomic(key) as model:
+            return fn(model)
+
+    return await call(store, run)
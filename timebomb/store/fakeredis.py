@@ -0,0 +1,171 @@
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """In-process server speaking the subset of Redis used by `RedisStore`.
+
+    Meant for tests and local runs without a Redis server. Commands are
+    executed one at a time under a lock, like Redis does.
+
+    Usage:
+        server = FakeRedisServer(("localhost", 0))
+        server.start()
+        client = RedisClient(*server.server_address)
+
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple = ("localhost", 0)):
+        super().__init__(address, FakeRedisHandler)
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def execute(self, command: str, *args):
+        with self.lock:
+            method = getattr(self, f"cmd_{command.lower()}", None)
+            if method is None:
+                raise ValueError(f"unknown command '{command}'")
+            return method(*args)
+
+    def _get(self, key, default=None):
+        expire = self.expires.get(key)
+        if expire is not None and expire <= time.monotonic():
+            self.data.pop(key, None)
+            del self.expires[key]
+        return self.data.get(key, default)
+
+    def _zset(self, key) -> dict:
+        return self._get(key, {})
+
+    def cmd_ping(self):
+        return "PONG"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    def cmd_get(self, key):
+        return self._get(key)
+
+    def cmd_mget(self, *keys):
+        return [self._get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        if b"NX" in options and self._get(key) is not None:
+            return None
+
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if b"PX" in options:
+            delay = int(options[options.index(b"PX") + 1]) / 1000
+            self.expires[key] = time.monotonic() + delay
+        return "OK"
+
+    def cmd_del(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self._get(key) is not None:
+                del self.data[key]
+                self.expires.pop(key, None)
+                deleted += 1
+        return deleted
+
+    def cmd_exists(self, *keys):
+        return sum(self._get(key) is not None for key in keys)
+
+    def cmd_incr(self, key):
+        value = int(self._get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        keys = [key for key in list(self.data) if self._get(key) is not None]
+        return [key for key in keys if fnmatch.fnmatchcase(key.decode(), pattern)]
+
+    def cmd_zadd(self, key, *pairs):
+        zset = self.data.setdefault(key, self._zset(key))
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def cmd_zrem(self, key, *members):
+        zset = self._zset(key)
+        removed = sum(zset.pop(member, None) is not None for member in members)
+        if key in self.data and not zset:
+            del self.data[key]
+        return removed
+
+    def cmd_zcard(self, key):
+        return len(self._zset(key))
+
+    def cmd_zscore(self, key, member):
+        score = self._zset(key).get(member)
+        if score is not None:
+            return repr(score).encode()
+
+    def cmd_zrange(self, key, start, stop):
+        members = sorted(self._zset(key).items(), key=lambda item: (item[1], item[0]))
+        start, stop = int(start), int(stop)
+        stop = len(members) if stop == -1 else stop + 1
+        return [member for member, _ in members[start:stop]]
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = self.read_command()
+            except ConnectionError:
+                return
+
+            try:
+                reply = self.server.execute(args[0].decode(), *args[1:])
+            except Exception as error:
+                self.wfile.write(b"-ERR %s\r\n" % str(error).encode())
+            else:
+                self.wfile.write(self.pack(reply))
+
+    def read_command(self) -> list:
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError()
+
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def pack(self, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, str):
+            return b"+%s\r\n" % reply.encode()
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(self.pack(item) for item in reply)
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from timebomb.registry import Registry
+
+
+class MemoryStore(Registry):
+    """In-process store, models are kept alive and shared by reference.
+
+    Saving only refreshes the indexes and atomic blocks need no lock, since
+    all the state lives in a single process.
+
+    """
+
+    def save(self, model):
+        self.reindex(model)
+
+    @contextmanager
+    def atomic(self, key):
+        model = self.get(key)
+        yield model
+        if model is not None:
+            self.save(model)
@@ -0,0 +1,257 @@
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class RedisError(Exception):
+    """Error reply of a Redis server."""
+
+
+class RedisClient:
+    """Minimal client speaking the Redis serialization protocol (RESP).
+
+    Only implements what the stores need, so Redis and protocol compatible
+    servers can be used without extra dependency.
+
+    Attributes:
+        host (str): The server host.
+        port (int): The server port.
+        db (int): The database number.
+
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0):
+        self.host = host
+        self.port = port
+        self.db = db
+
+        self._lock = threading.RLock()
+        self._socket = None
+        self._file = None
+        self._pid = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisClient":
+        url = urlparse(url)
+        db = int(url.path.strip("/") or 0)
+        return cls(url.hostname or "localhost", url.port or 6379, db)
+
+    def execute(self, *args):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._connect()
+
+            try:
+                self._socket.sendall(self._pack(args))
+                reply = self._read()
+            except OSError:
+                self._pid = None
+                raise
+
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    def close(self):
+        with self._lock:
+            if self._socket:
+                self._file.close()
+                self._socket.close()
+            self._socket = self._file = self._pid = None
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rb")
+        self._pid = os.getpid()
+        if self.db:
+            self.execute("SELECT", self.db)
+
+    @staticmethod
+    def _pack(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server.")
+
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            return RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            if int(rest) < 0:
+                return None
+            return self._file.read(int(rest) + 2)[:-2]
+        if kind == b"*":
+            if int(rest) < 0:
+                return None
+            return [self._read() for _ in range(int(rest))]
+
+        raise RedisError(f"Invalid reply {line!r}.")
+
+
+class RedisStore:
+    """Store models as pickles in a Redis-protocol server.
+
+    Keys are namespaced by store name: `<name>:item:<key>` holds the pickled
+    indexed values and model, `<name>:keys` and `<name>:index:<attr>:<value>`
+    are sorted sets of keys scored by insertion order.
+
+    Atomic blocks hold a lock key set with `NX` and an expiry, so
+    read-modify-write sequences of several processes on the same model are
+    serialized and a crashed holder does not block the others forever.
+
+    Attributes:
+        client (RedisClient): The server client.
+        name (str): The store name.
+        key (str): The attribute used as primary key.
+        indexes (tuple): The attributes indexed for lookups.
+
+    """
+
+    LOCK_TIMEOUT = 5000
+    LOCK_RETRY = 0.001
+
+    def __init__(
+        self, client: RedisClient, name: str, key: str = "id", indexes: tuple = ()
+    ):
+        self.client = client
+        self.name = name
+        self.key = key
+        self.indexes = tuple(indexes)
+
+        self._held = threading.local()
+
+    def __len__(self) -> int:
+        return self.client.execute("ZCARD", f"{self.name}:keys")
+
+    def __iter__(self):
+        keys = self.client.execute("ZRANGE", f"{self.name}:keys", 0, -1)
+        return iter(self._load_many(keys))
+
+    def __contains__(self, model) -> bool:
+        key = getattr(model, self.key)
+        return self.client.execute("EXISTS", self._item(key)) == 1
+
+    def get(self, key):
+        data = self.client.execute("GET", self._item(key))
+        if data is not None:
+            return pickle.loads(data)[1]
+
+    def first(self, attr: str, value):
+        keys = self.client.execute("ZRANGE", self._index(attr, value), 0, 0)
+        if keys:
+            return self.get(keys[0].decode())
+
+    def filter(self, attr: str, value) -> list:
+        keys = self.client.execute("ZRANGE", self._index(attr, value), 0, -1)
+        return self._load_many(keys)
+
+    def append(self, model):
+        key = getattr(model, self.key)
+        if model in self:
+            self.remove(model)
+
+        score = self.client.execute("INCR", f"{self.name}:seq")
+        self.client.execute("ZADD", f"{self.name}:keys", score, key)
+        self._write(model, score)
+
+    def remove(self, model):
+        key = getattr(model, self.key)
+        data = self.client.execute("GET", self._item(key))
+        if data is None:
+            raise ValueError("Model not in store.")
+
+        values, _ = pickle.loads(data)
+        for attr, value in values.items():
+            self.client.execute("ZREM", self._index(attr, value), key)
+        self.client.execute("ZREM", f"{self.name}:keys", key)
+        self.client.execute("DEL", self._item(key))
+
+    def save(self, model):
+        key = getattr(model, self.key)
+        data = self.client.execute("GET", self._item(key))
+        if data is None:
+            return
+
+        values, _ = pickle.loads(data)
+        for attr, value in values.items():
+            if getattr(model, attr) != value:
+                self.client.execute("ZREM", self._index(attr, value), key)
+
+        score = self.client.execute("ZSCORE", f"{self.name}:keys", key)
+        self._write(model, int(float(score)))
+
+    reindex = save
+
+    def clear(self):
+        keys = self.client.execute("KEYS", f"{self.name}:*")
+        if keys:
+            self.client.execute("DEL", *keys)
+
+    @contextmanager
+    def atomic(self, key):
+        held = self._held.__dict__.setdefault("keys", set())
+        if key in held:
+            model = self.get(key)
+            yield model
+            if model is not None:
+                self.save(model)
+            return
+
+        lock = f"{self.name}:lock:{key}"
+        token = uuid.uuid4().hex
+        while not self.client.execute(
+            "SET", lock, token, "NX", "PX", self.LOCK_TIMEOUT
+        ):
+            time.sleep(self.LOCK_RETRY)
+
+        held.add(key)
+        try:
+            model = self.get(key)
+            yield model
+            if model is not None:
+                self.save(model)
+        finally:
+            held.discard(key)
+            if self.client.execute("GET", lock) == token.encode():
+                self.client.execute("DEL", lock)
+
+    def _item(self, key) -> str:
+        return f"{self.name}:item:{key}"
+
+    def _index(self, attr: str, value) -> str:
+        if attr not in self.indexes:
+            raise KeyError(attr)
+        return f"{self.name}:index:{attr}:{value!r}"
+
+    def _write(self, model, score: int):
+        key = getattr(model, self.key)
+        values = {attr: getattr(model, attr) for attr in self.indexes}
+        for attr, value in values.items():
+            self.client.execute("ZADD", self._index(attr, value), score, key)
+
+        data = pickle.dumps((values, model), pickle.HIGHEST_PROTOCOL)
+        self.client.execute("SET", self._item(key), data)
+
+    def _load_many(self, keys: list) -> list:
+        if not keys:
+            return []
+
+        items = self.client.execute("MGET", *[self._item(k.decode()) for k in keys])
+        return [pickle.loads(data)[1] for data in items if data is not None]
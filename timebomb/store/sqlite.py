@@ -0,0 +1,158 @@
+import os
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+CONNECTIONS = {}
+
+
+def connect(path: str) -> tuple:
+    """Return the connection and lock shared by the stores of a database.
+
+    Stores of the same database share a connection, so nested atomic blocks
+    over several stores run in a single transaction.
+
+    """
+    key = (os.getpid(), path)
+    if key not in CONNECTIONS:
+        connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        CONNECTIONS[key] = (connection, threading.RLock(), [0])
+    return CONNECTIONS[key]
+
+
+class SQLiteStore:
+    """Store models as pickles in a SQLite table.
+
+    Every indexed attribute gets its own column, so lookups are index scans.
+    Atomic blocks run in `BEGIN IMMEDIATE` transactions, which take the
+    database write lock before reading: read-modify-write sequences of
+    several processes sharing the database file are serialized.
+
+    Attributes:
+        path (str): The database file path.
+        name (str): The table name.
+        key (str): The attribute used as primary key.
+        indexes (tuple): The attributes indexed for lookups.
+
+    """
+
+    def __init__(self, path: str, name: str, key: str = "id", indexes: tuple = ()):
+        self.path = path
+        self.name = name
+        self.key = key
+        self.indexes = tuple(indexes)
+
+        self._connection, self._lock, self._depth = connect(path)
+
+        columns = "".join(f", {attr}" for attr in self.indexes)
+        self._execute(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            f"(seq INTEGER PRIMARY KEY, key TEXT UNIQUE{columns}, data BLOB)"
+        )
+        for attr in self.indexes:
+            self._execute(
+                f"CREATE INDEX IF NOT EXISTS {name}_{attr} ON {name} ({attr}, seq)"
+            )
+
+    def __len__(self) -> int:
+        return self._execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def __iter__(self):
+        rows = self._execute(f"SELECT data FROM {self.name} ORDER BY seq").fetchall()
+        return iter([pickle.loads(data) for data, in rows])
+
+    def __contains__(self, model) -> bool:
+        row = self._execute(
+            f"SELECT 1 FROM {self.name} WHERE key = ?", (getattr(model, self.key),)
+        ).fetchone()
+        return row is not None
+
+    def get(self, key):
+        row = self._execute(
+            f"SELECT data FROM {self.name} WHERE key = ?", (key,)
+        ).fetchone()
+        if row:
+            return pickle.loads(row[0])
+
+    def first(self, attr: str, value):
+        models = self._filter(attr, value, " LIMIT 1")
+        if models:
+            return models[0]
+
+    def filter(self, attr: str, value) -> list:
+        return self._filter(attr, value)
+
+    def append(self, model):
+        columns = "".join(f", {attr}" for attr in self.indexes)
+        marks = ", ?" * len(self.indexes)
+        self._execute(
+            f"INSERT OR REPLACE INTO {self.name} (key{columns}, data) "
+            f"VALUES (?{marks}, ?)",
+            self._row(model),
+        )
+
+    def remove(self, model):
+        cursor = self._execute(
+            f"DELETE FROM {self.name} WHERE key = ?", (getattr(model, self.key),)
+        )
+        if not cursor.rowcount:
+            raise ValueError("Model not in store.")
+
+    def save(self, model):
+        columns = "".join(f"{attr} = ?, " for attr in self.indexes)
+        row = self._row(model)
+        self._execute(
+            f"UPDATE {self.name} SET {columns}data = ? WHERE key = ?",
+            row[1:] + row[:1],
+        )
+
+    reindex = save
+
+    def clear(self):
+        self._execute(f"DELETE FROM {self.name}")
+
+    @contextmanager
+    def atomic(self, key):
+        with self._lock:
+            outermost = not self._depth[0]
+            if outermost:
+                self._connection.execute("BEGIN IMMEDIATE")
+
+            self._depth[0] += 1
+            try:
+                model = self.get(key)
+                yield model
+                if model is not None:
+                    self.save(model)
+            except BaseException:
+                if outermost:
+                    self._connection.execute("ROLLBACK")
+                raise
+            else:
+                if outermost:
+                    self._connection.execute("COMMIT")
+            finally:
+                self._depth[0] -= 1
+
+    def _row(self, model) -> tuple:
+        values = tuple(getattr(model, attr) for attr in self.indexes)
+        data = pickle.dumps(model, pickle.HIGHEST_PROTOCOL)
+        return (getattr(model, self.key),) + values + (data,)
+
+    def _filter(self, attr: str, value, limit: str = "") -> list:
+        if attr not in self.indexes:
+            raise KeyError(attr)
+
+        rows = self._execute(
+            f"SELECT data FROM {self.name} WHERE {attr} IS ? ORDER BY seq{limit}",
+            (value,),
+        ).fetchall()
+        return [pickle.loads(data) for data, in rows]
+
+    def _execute(self, query: str, params: tuple = ()):
+        with self._lock:
+            return self._connection.execute(query, params)
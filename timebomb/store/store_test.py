@@ -0,0 +1,289 @@
+import asyncio
+import multiprocessing
+import threading
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+from pytest import fixture, raises
+
+import timebomb.player.service as player_service
+import timebomb.room.service as room_service
+from timebomb.room.async_service import AsyncRoomService
+from timebomb.room.model import Room
+from timebomb.socket_app import MainNamespace
+from timebomb.store import create_store, MemoryStore, SQLiteStore, RedisStore
+from timebomb.store.aio import atomic, call, on_loop
+from timebomb.store.fakeredis import FakeRedisServer
+
+
+@dataclass
+class Model:
+    id: str
+    name: str = None
+    counter: int = 0
+
+
+@fixture(scope="module")
+def redis_url():
+    server = FakeRedisServer()
+    server.start()
+    host, port = server.server_address
+    yield f"redis://{host}:{port}/0"
+    server.stop()
+
+
+@fixture(params=["memory", "sqlite", "redis"])
+def store_url(request, tmp_path, redis_url):
+    if request.param == "memory":
+        return "memory://"
+    if request.param == "sqlite":
+        return f"sqlite:///{tmp_path}/store.db"
+    return redis_url
+
+
+@fixture
+def store(store_url):
+    store = create_store(store_url, "models", indexes=("name",))
+    yield store
+    store.clear()
+
+
+def test_create_store(tmp_path, redis_url):
+    assert isinstance(create_store(None, "models"), MemoryStore)
+    assert isinstance(create_store("memory://", "models"), MemoryStore)
+    assert isinstance(create_store(f"sqlite:///{tmp_path}/a.db", "m"), SQLiteStore)
+    assert isinstance(create_store(redis_url, "models"), RedisStore)
+
+    with raises(ValueError):
+        create_store("unknown://", "models")
+
+
+def test_Store_append(store):
+    model = Model("id_1", "name_1")
+    store.append(model)
+
+    assert len(store) == 1
+    assert model in store
+    assert list(store) == [model]
+    assert store.get("id_1") == model
+    assert store.first("name", "name_1") == model
+    assert store.filter("name", "name_1") == [model]
+
+
+def test_Store_missing(store):
+    assert store.get("unknown") is None
+    assert store.first("name", "unknown") is None
+    assert store.filter("name", "unknown") == []
+    assert Model("unknown") not in store
+
+
+def test_Store_filter_keeps_insertion_order(store):
+    models = [Model(f"id_{i}", "same") for i in range(3)]
+    for model in models:
+        store.append(model)
+
+    assert store.filter("name", "same") == models
+    assert store.first("name", "same") == models[0]
+    assert list(store) == models
+
+
+def test_Store_remove(store):
+    model1 = Model("id_1", "name_1")
+    model2 = Model("id_2", "name_2")
+    store.append(model1)
+    store.append(model2)
+
+    store.remove(model1)
+
+    assert len(store) == 1
+    assert model1 not in store and model2 in store
+    assert store.first("name", "name_1") is None
+
+    with raises(ValueError):
+        store.remove(model1)
+
+
+def test_Store_save(store):
+    model = Model("id_1", "name_1")
+    store.append(model)
+
+    model.name = "name_2"
+    model.counter = 3
+    store.save(model)
+
+    assert store.get("id_1").counter == 3
+    assert store.first("name", "name_1") is None
+    assert store.first("name", "name_2") == model
+
+
+def test_Store_atomic(store):
+    store.append(Model("id_1", "name_1"))
+
+    with store.atomic("id_1") as model:
+        model.counter += 1
+        with store.atomic("id_1") as nested:
+            assert nested is not None
+
+    assert store.get("id_1").counter == 1
+
+    with store.atomic("unknown") as model:
+        assert model is None
+
+
+def increment(url: str, times: int):
+    store = create_store(url, "models", indexes=("name",))
+    for _ in range(times):
+        with store.atomic("id_1") as model:
+            model.counter += 1
+
+
+def test_aio_atomic(store):
+    store.append(Model("id_1"))
+
+    def increment(model):
+        model.counter += 1
+        return model.counter
+
+    async def run():
+        counters = await asyncio.gather(
+            *(atomic(store, "id_1", increment) for _ in range(20))
+        )
+        return counters, await call(store, store.get, "id_1")
+
+    counters, model = asyncio.run(run())
+    assert sorted(counters) == list(range(1, 21))
+    assert model.counter == 20
+
+
+def test_aio_on_loop(store):
+    threads = []
+
+    def record():
+        threads.append(threading.get_ident())
+
+    def change(model):
+        on_loop(record)
+        return threading.get_ident()
+
+    store.append(Model("id_1"))
+    worker = asyncio.run(atomic(store, "id_1", change))
+    assert threads == [threading.get_ident()]
+    assert (worker == threads[0]) == isinstance(store, MemoryStore)
+
+    on_loop(record)
+    assert threads == [threading.get_ident()] * 2
+
+
+def test_Store_atomic_across_processes(store, store_url):
+    if isinstance(store, MemoryStore):
+        return
+
+    store.append(Model("id_1", "name_1"))
+
+    processes = [
+        multiprocessing.Process(target=increment, args=(store_url, 50))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert store.get("id_1").counter == 150
+
+
+@fixture
+def shared_stores(store_url, monkeypatch):
+    rooms = create_store(store_url, "rooms", indexes=("name",))
+    players = create_store(store_url, "players", indexes=("room_id",))
+
+    monkeypatch.setattr(room_service, "ROOMS", rooms)
+    monkeypatch.setattr(room_service, "PLAYERS", players)
+    monkeypatch.setattr(player_service, "PLAYERS", players)
+
+    yield rooms, players
+    rooms.clear()
+    players.clear()
+    room_service.OPEN_ROOMS.clear()
+
+
+def test_game_through_store(shared_stores):
+    rooms, players = shared_stores
+
+    namespace = MainNamespace("/")
+    namespace.emit = MagicMock()
+    namespace.enter_room = MagicMock()
+    namespace.leave_room = MagicMock()
+    namespace.close_room = MagicMock()
+
+    sids = [f"sid_{i}" for i in range(4)]
+    for sid in sids:
+        res = namespace.on_login(sid, {"username": sid, "roomname": "room"})
+        assert res["status"] == "SUCCESS"
+
+    assert len(rooms) == 1 and len(players) == 4
+    room_id = rooms.first("name", "room").id
+    assert [p.id for p in players.filter("room_id", room_id)] == sids
+
+    res = namespace.on_start(sids[0])
+    assert res["status"] == "SUCCESS" and res["data"]["status"] == "PLAYING"
+
+    res = namespace.on_cut(sids[0], {"target": sids[1]})
+    assert res["status"] == "SUCCESS"
+
+    room = rooms.get(room_id)
+    assert room.cutter.id == sids[1]
+    assert sum(room.cards_found.values()) == 1
+    assert sum(sum(player.cards) for player in room.players) == 19 or room.winning_team
+
+    for sid in sids:
+        namespace.on_disconnect(sid)
+
+    assert len(rooms) == 0 and len(players) == 0
+
+
+def test_quick_join_through_store(shared_stores, store_url, monkeypatch):
+    rooms, players = shared_stores
+    if isinstance(rooms, MemoryStore):
+        return
+
+    monkeypatch.setattr(room_service, "OPEN_ROOMS_REFRESH", 0)
+    namespace = MainNamespace("/")
+    namespace.emit = MagicMock()
+    namespace.enter_room = MagicMock()
+
+    res = namespace.on_login("sid_0", {"username": "sid_0"})
+    assert res["status"] == "SUCCESS"
+
+    # Another worker deletes the room, then creates one, behind the index.
+    other = create_store(store_url, "rooms", indexes=("name",))
+    other.remove(other.get(res["data"]["id"]))
+    res = namespace.on_login("sid_1", {"username": "sid_1"})
+    assert res["status"] == "SUCCESS"
+    assert len(rooms) == 1
+
+    other.remove(other.get(res["data"]["id"]))
+    other.append(Room(name="other", id="other"))
+    res = namespace.on_login("sid_2", {"username": "sid_2"})
+    assert res["status"] == "SUCCESS" and res["data"]["id"] == "other"
+
+
+def test_async_open_room_through_store(shared_stores, store_url, monkeypatch):
+    rooms, players = shared_stores
+    if isinstance(rooms, MemoryStore):
+        return
+
+    monkeypatch.setattr(room_service, "OPEN_ROOMS_REFRESH", 0)
+
+    async def run():
+        room = await AsyncRoomService.create("room")
+        assert room.id in [r.id for r in room_service.OPEN_ROOMS]
+        assert (await AsyncRoomService.get_open_room()).id == room.id
+
+        rooms.remove(room)
+        rooms.append(Room(name="other", id="other"))
+        return await AsyncRoomService.get_open_room()
+
+    room = asyncio.run(run())
+    assert room.id == "other"
+    assert [r.id for r in room_service.OPEN_ROOMS] == ["other"]
@@ -0,0 +1,142 @@
+"""Hierarchical timing wheel, to run many timers from a single task.
+
+Time is cut in ticks of `tick` seconds. Level 0 has one slot per tick for
+the next `slots` ticks, level 1 one slot per `slots` ticks for the next
+`slots ** 2` ticks, and so on. Scheduling and cancelling a timer are O(1)
+whatever the number of timers; a timer moves down one level each time the
+wheel reaches its slot, and fires from level 0.
+
+Usage:
+    wheel = TimingWheel(tick=0.1)
+    wheel.schedule(room.id, 30, callback)
+    sio.start_background_task(wheel.run, sio.sleep)
+
+"""
+
+import math
+import time
+import traceback
+
+
+class TimingWheel:
+    """Timers keyed by an id, one per key, fired by `advance`.
+
+    Attributes:
+        tick (float): Resolution of the timers, in seconds.
+        clock (callable): Returns the current time, in seconds.
+
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 256,
+        levels: int = 4,
+        clock=time.monotonic,
+    ):
+        if slots & (slots - 1):
+            raise ValueError("Number of slots must be a power of two.")
+
+        self.tick = tick
+        self.clock = clock
+        self.stopped = False
+
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = levels
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._where = {}
+        self._current = int(clock() / tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key) -> bool:
+        return key in self._where
+
+    def schedule(self, key, delay: float, callback):
+        """Call `callback()` in `delay` seconds, replacing the timer of `key`."""
+        where = self._where.pop(key, None)
+        if where is not None:
+            del self._wheels[where[0]][where[1]][key]
+
+        expires = int(self.clock() / self.tick) + max(1, math.ceil(delay / self.tick))
+        self._place(key, max(expires, self._current + 1), callback)
+
+    def cancel(self, key) -> bool:
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+
+        del self._wheels[where[0]][where[1]][key]
+        return True
+
+    def _place(self, key, expires: int, callback):
+        # A timer goes to the lowest level where it shares the slot of the
+        # next level with the current tick.
+        level = max(0, (expires ^ self._current).bit_length() - 1) // self._bits
+        level = min(level, self._levels - 1)
+        shift = level * self._bits
+
+        index = expires >> shift
+        if index - (self._current >> shift) > self._mask:
+            # Beyond the horizon: park in the farthest slot, placed again
+            # when the wheel reaches it.
+            index = (self._current >> shift) + self._mask
+
+        slot = index & self._mask
+        self._wheels[level][slot][key] = (expires, callback)
+        self._where[key] = (level, slot)
+
+    def advance(self, now: float = None) -> list:
+        """Move the wheel to `now` and return the callbacks of the due timers.
+
+        Timers are removed before they are returned, so callbacks may
+        schedule their key again.
+
+        """
+        target = int((self.clock() if now is None else now) / self.tick)
+        due = []
+        while self._current < target:
+            self._current += 1
+            current = self._current
+
+            for level in range(len(self._wheels) - 1, 0, -1):
+                shift = level * self._bits
+                if current & ((1 << shift) - 1):
+                    continue
+
+                bucket = self._wheels[level][(current >> shift) & self._mask]
+                timers = list(bucket.items())
+                bucket.clear()
+                for key, (expires, callback) in timers:
+                    del self._where[key]
+                    self._place(key, max(expires, current), callback)
+
+            bucket = self._wheels[0][current & self._mask]
+            for key, (expires, callback) in bucket.items():
+                del self._where[key]
+                due.append(callback)
+            bucket.clear()
+
+        return due
+
+    def run(self, sleep):
+        """Fire the timers every tick until stopped, as a background task."""
+        while not self.stopped:
+            sleep(self.tick)
+            for callback in self.advance():
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
+
+    async def run_async(self, sleep):
+        """Same as `run`, with an awaitable `sleep`."""
+        while not self.stopped:
+            await sleep(self.tick)
+            for callback in self.advance():
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
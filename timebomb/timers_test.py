@@ -0,0 +1,79 @@
+import random
+
+from pytest import raises
+
+from timebomb.conftest import Clock
+from timebomb.timers import TimingWheel
+
+
+def run(wheel: TimingWheel, clock: Clock, until: float) -> list:
+    fired = []
+    while clock.now < until:
+        clock.now += wheel.tick
+        fired.extend((clock.now, callback()) for callback in wheel.advance())
+    return fired
+
+
+def test_TimingWheel_fires_on_time(clock: Clock):
+    wheel = TimingWheel(tick=1, slots=4, levels=3, clock=clock)
+    delays = {key: random.Random(key).randint(1, 200) for key in range(500)}
+    for key, delay in delays.items():
+        wheel.schedule(key, delay, lambda key=key: key)
+
+    assert len(wheel) == 500
+    fired = run(wheel, clock, 250)
+
+    # Delays beyond the 64 ticks horizon are parked and cascaded again.
+    assert sorted(fired) == sorted((delay, key) for key, delay in delays.items())
+    assert len(wheel) == 0
+
+
+def test_TimingWheel_schedule_replaces(clock: Clock):
+    wheel = TimingWheel(tick=0.5, slots=8, clock=clock)
+    wheel.schedule("room", 2, lambda: "first")
+    wheel.schedule("room", 5, lambda: "second")
+
+    assert "room" in wheel and len(wheel) == 1
+    assert run(wheel, clock, 10) == [(5, "second")]
+
+
+def test_TimingWheel_cancel(clock: Clock):
+    wheel = TimingWheel(tick=1, slots=4, clock=clock)
+    wheel.schedule("a", 3, lambda: "a")
+    wheel.schedule("b", 30, lambda: "b")
+
+    assert wheel.cancel("b")
+    assert not wheel.cancel("b")
+    assert run(wheel, clock, 40) == [(3, "a")]
+
+
+def test_TimingWheel_catches_up(clock: Clock):
+    wheel = TimingWheel(tick=1, slots=4, clock=clock)
+    wheel.schedule("a", 3, lambda: "a")
+    wheel.schedule("b", 20, lambda: "b")
+
+    clock.now = 100
+    assert [callback() for callback in wheel.advance()] == ["a", "b"]
+
+
+def test_TimingWheel_run(clock: Clock):
+    wheel = TimingWheel(tick=1, slots=4, clock=clock)
+    fired = []
+
+    def fail():
+        raise ValueError()
+
+    def sleep(seconds: float):
+        clock.now += seconds
+        wheel.stopped = clock.now >= 5
+
+    wheel.schedule("fail", 1, fail)
+    wheel.schedule("ok", 2, lambda: fired.append(clock.now))
+    wheel.run(sleep)
+
+    assert fired == [2]
+
+
+def test_TimingWheel_slots():
+    with raises(ValueError):
+        TimingWheel(slots=100)